@@ -0,0 +1,189 @@
+"""
+Synthetic users for benchmarks at production scale, see `manage.py generate_dataset`.
+
+Every user is drawn from an RNG seeded with the dataset seed and the
+user's index, so a dataset does not depend on the number of workers or
+the chunk size, and `--start` can grow it without changing earlier rows.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models.OTPCode import OTPCode
+from users.models.User import User
+from users.models.UserProfile import UserProfile
+
+EMAIL_PREFIX = 'synthetic'
+EMAIL_DOMAINS = {'gmail.com': 60, 'mail.ru': 15, 'yandex.ru': 10, 'outlook.com': 8, 'icloud.com': 5, 'inbox.uz': 2}
+FIRST_NAMES = ['Aziz', 'Dilnoza', 'Ivan', 'Olga', 'John', 'Emma', 'Timur', 'Malika', 'Sergey', 'Anna', 'Bekzod', 'Nodira']
+LAST_NAMES = ['Karimov', 'Yusupova', 'Petrov', 'Smirnova', 'Smith', 'Brown', 'Aliyev', 'Rashidova', 'Ivanov', 'Lee']
+
+# Users signed up over this period, more of them recently
+HISTORY_DAYS = 730
+VERIFIED_SHARE = 0.85
+PROFILE_SHARE = 0.95
+
+
+def get_email(index, rng):
+    domain = rng.choices(list(EMAIL_DOMAINS), weights=list(EMAIL_DOMAINS.values()))[0]
+    return f'{EMAIL_PREFIX}{index:09d}@{domain}'
+
+
+def zipf_weights(count):
+    """
+    Popularity of catalog entries, the first one is the most popular.
+    """
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def weighted_sample(rng, population, weights, k):
+    chosen = []
+    while len(chosen) < min(k, len(population)):
+        item = rng.choices(population, weights=weights)[0]
+        if item not in chosen:
+            chosen.append(item)
+    return chosen
+
+
+def build_user(index, seed, catalog, password, now, otp_codes=2.0):
+    """
+    Draw a user, their profile, interests and OTP history.
+
+    Returns:
+        A dict of model -> list of rows, rows are dicts of attname -> value
+    """
+    rng = random.Random(f'{seed}:{index}')
+    user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+    date_joined = now - timedelta(days=HISTORY_DAYS * rng.random() ** 2, seconds=rng.randrange(86400))
+    is_verified = rng.random() < VERIFIED_SHARE
+    rows = {
+        User: [{
+            'id': user_id,
+            'password': password,
+            'last_login': None,
+            'is_superuser': False,
+            'email': get_email(index, rng),
+            'is_active': rng.random() < 0.98,
+            'is_verified': is_verified,
+            'is_staff': False,
+            'date_joined': date_joined,
+            'token_version': 0,
+        }],
+        UserProfile: [],
+        UserProfile.interests.through: [],
+        OTPCode: [],
+    }
+
+    if rng.random() < PROFILE_SHARE:
+        rows[UserProfile].append({
+            'user_id': user_id,
+            'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'age': round(rng.triangular(13, 60, 17)),
+            'motivation_id': rng.choices(catalog['motivations'], weights=zipf_weights(len(catalog['motivations'])))[0],
+            'daily_goal_id': rng.choices(catalog['goals'], weights=zipf_weights(len(catalog['goals'])))[0],
+        })
+        # Profile ids are only known once inserted, see write_chunk()
+        rows[UserProfile.interests.through] = weighted_sample(
+            rng, catalog['domains'], zipf_weights(len(catalog['domains'])), rng.randint(1, 5)
+        )
+
+    # One verification code, and the user may have asked for new ones or reset their password since
+    history = 1 + (round(rng.expovariate(1 / (otp_codes - 1))) if otp_codes > 1 else 0)
+    created_at = date_joined
+    for number in range(history):
+        purpose = 'verify' if number == 0 or not is_verified and rng.random() < 0.5 else 'reset'
+        latest = number == history - 1
+        rows[OTPCode].append({
+            'user_id': user_id,
+            'code': f'{rng.randrange(10 ** 6):06d}',
+            'purpose': purpose,
+            'is_used': is_verified if purpose == 'verify' else not latest or rng.random() < 0.7,
+            'created_at': created_at,
+        })
+        created_at += timedelta(seconds=rng.randrange(60, 30 * 86400))
+        if created_at > now:
+            created_at = now
+    return rows
+
+
+def insert_rows(model, rows):
+    """
+    Insert rows with COPY on PostgreSQL and executemany() elsewhere.
+
+    Rows are written as given, unlike bulk_create() which would overwrite
+    the created_at of OTP codes (auto_now_add) with the current time.
+    """
+    if not rows:
+        return
+    quote_name = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in rows[0]]
+    table = quote_name(model._meta.db_table)
+    columns = ', '.join(quote_name(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            with cursor.cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(tuple(row.values()))
+        else:
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})",
+                [[field.get_db_prep_save(value, connection) for field, value in zip(fields, row.values())] for row in rows],
+            )
+
+
+def write_chunk(start, end, seed, catalog, password, otp_codes=2.0):
+    """
+    Generate and insert users [start, end) in one transaction.
+
+    Returns:
+        A dict of table -> rows inserted
+    """
+    now = timezone.now()
+    rows = {}
+    interests = {}
+    for index in range(start, end):
+        for model, model_rows in build_user(index, seed, catalog, password, now, otp_codes).items():
+            if model is UserProfile.interests.through:
+                if model_rows:
+                    interests[rows[User][-1]['id']] = model_rows
+            else:
+                rows.setdefault(model, []).extend(model_rows)
+
+    with transaction.atomic():
+        insert_rows(User, rows[User])
+        insert_rows(UserProfile, rows[UserProfile])
+        profile_ids = dict(
+            UserProfile.objects.filter(user_id__in=list(interests)).values_list('user_id', 'id')
+        )
+        rows[UserProfile.interests.through] = [
+            {'userprofile_id': profile_ids[user_id], 'learningdomain_id': domain_id}
+            for user_id, domain_ids in interests.items()
+            for domain_id in domain_ids
+        ]
+        insert_rows(UserProfile.interests.through, rows[UserProfile.interests.through])
+        insert_rows(OTPCode, rows[OTPCode])
+    return {model._meta.db_table: len(model_rows) for model, model_rows in rows.items()}
+
+
+def chunk_ranges(start, count, chunk_size):
+    """
+    Split users [start, start + count) into ranges of at most chunk_size.
+    """
+    end = start + count
+    return [(chunk_start, min(chunk_start + chunk_size, end)) for chunk_start in range(start, end, chunk_size)]
+
+
+def analyze_tables():
+    """
+    Refresh the planner statistics of the generated tables, so query plans reflect their new size.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    models = (User, UserProfile, UserProfile.interests.through, OTPCode)
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
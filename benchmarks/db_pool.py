@@ -0,0 +1,93 @@
+"""
+Load test /api/config/ against a real PostgreSQL database with the
+connection pool on, and with a new connection per request (the previous
+behaviour), and compare p50/p99 latencies.
+
+Threads stand in for the threads of one worker process, requests go
+through the full WSGI handler so connections are released as in
+production. Needs the DB_* settings of a migrated database.
+
+Usage:
+    python -m benchmarks.db_pool
+"""
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from wsgiref.util import setup_testing_defaults
+
+THREADS = 8
+REQUESTS_PER_THREAD = 250
+
+MODES = {
+    'pooled': {'DB_POOL': 'True'},
+    'connection per request': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '0'},
+}
+
+
+def run():
+    from benchmarks.utils import setup_django
+
+    setup_django()
+
+    from core.db import get_pool_stats
+    from steamup_platform.wsgi import application
+
+    def start_response(status, headers):
+        assert status.startswith('200'), status
+
+    def request():
+        environ = {'PATH_INFO': '/api/config/', 'HTTP_ACCEPT_LANGUAGE': 'ru'}
+        setup_testing_defaults(environ)
+        start = time.perf_counter()
+        response = application(environ, start_response)
+        b''.join(response)
+        response.close()
+        return time.perf_counter() - start
+
+    latencies = []
+
+    def worker():
+        timings = [request() for _ in range(REQUESTS_PER_THREAD)]
+        latencies.extend(timings)
+
+    # Warm up imports, URL resolvers and the pool
+    for _ in range(20):
+        request()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"p50 {percentiles[49] * 1000:7.2f} ms   p99 {percentiles[98] * 1000:7.2f} ms   "
+        f"{len(latencies) / elapsed:7.0f} req/s"
+    )
+    stats = get_pool_stats()
+    if stats:
+        print(f"  pool: {stats}")
+
+
+def main():
+    if '--run' in sys.argv:
+        return run()
+
+    # Pooling is configured at import time, so each mode runs in its own process
+    for name, env in MODES.items():
+        print(f"{name} ({THREADS} threads x {REQUESTS_PER_THREAD} requests)")
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.db_pool', '--run'],
+            env={**os.environ, **env},
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
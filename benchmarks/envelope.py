@@ -0,0 +1,46 @@
+"""
+Compare wrapping responses in the middleware (render, then json.dumps the
+envelope again) against wrapping them in the renderer (render once).
+
+Usage:
+    python -m benchmarks.envelope
+"""
+import json
+
+from benchmarks.payloads import onboarding_payload
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import StandardJSONRenderer
+from core.response import api_response
+
+
+class FakeResponse:
+    status_code = 200
+
+
+def main():
+    request = RequestFactory().get('/api/onboarding/options/')
+    context = {'request': request, 'response': FakeResponse()}
+
+    for size in (10, 100, 1000):
+        payload = onboarding_payload(size)
+
+        def wrap_in_middleware():
+            JSONRenderer().render(payload, renderer_context=context)
+            json.dumps(api_response(data=payload, code=200))
+
+        def wrap_in_renderer():
+            StandardJSONRenderer().render(payload, renderer_context=context)
+
+        number = max(10, 10000 // size)
+        report(f"middleware re-encode ({size} items)", measure(wrap_in_middleware, number))
+        report(f"renderer single encode ({size} items)", measure(wrap_in_renderer, number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare DRF's stdlib JSON renderer and parser against the orjson backed
+ones on onboarding and registration payloads.
+
+Usage:
+    python -m benchmarks.json_codec
+"""
+import io
+
+from benchmarks.payloads import onboarding_payload, registration_request, registration_response
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+
+
+def main():
+    if orjson is None:
+        print("orjson is not installed, the fast renderer falls back to the stdlib")
+    
+    payloads = {
+        'onboarding (100 items)': onboarding_payload(100),
+        'registration response': registration_response(),
+        'registration request': registration_request(),
+    }
+    
+    for name, payload in payloads.items():
+        body = JSONRenderer().render(payload)
+        number = 200 if 'onboarding' in name else 20000
+        
+        report(f"encode stdlib   {name}", measure(lambda: JSONRenderer().render(payload), number))
+        report(f"encode fast     {name}", measure(lambda: FastJSONRenderer().render(payload), number))
+        report(f"decode stdlib   {name}", measure(lambda: JSONParser().parse(io.BytesIO(body)), number))
+        report(f"decode fast     {name}", measure(lambda: FastJSONParser().parse(io.BytesIO(body)), number))
+
+
+if __name__ == '__main__':
+    main()
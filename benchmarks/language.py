@@ -0,0 +1,76 @@
+"""
+Measure the per-request cost of LanguageMiddleware.process_request on a
+realistic mix of Accept-Language headers, against the previous
+implementation that re-parsed the header on every request.
+
+Usage:
+    python -m benchmarks.language
+"""
+import itertools
+import logging
+
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.utils import translation
+
+from core.middlewares.LanguageMiddleware import LanguageMiddleware
+from core.utils.accept_language import negotiate_language
+
+logger = logging.getLogger('core.middlewares.LanguageMiddleware')
+
+# Roughly what mobile and browser clients send, most common first
+HEADERS = [
+    'en-US,en;q=0.9',
+    'en-US,en;q=0.9',
+    'en-US,en;q=0.9',
+    'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'uz-UZ,uz;q=0.9,ru;q=0.8,en;q=0.7',
+    'en',
+    'ru',
+    'de-DE,de;q=0.9,en;q=0.8',
+    'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+]
+
+
+def legacy_process_request(request):
+    """
+    The header handling of LanguageMiddleware before negotiation was memoized.
+    """
+    accept_language = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
+    languages = [lang.split(';')[0].strip() for lang in accept_language.split(',')]
+    for language in languages:
+        language = language.split('-')[0]
+        if language in [lang[0] for lang in settings.LANGUAGES]:
+            translation.activate(language)
+            request.LANGUAGE_CODE = language
+            logger.debug(f"Language set from Accept-Language header: {language}")
+            break
+
+
+def main():
+    factory = RequestFactory()
+    requests = [factory.get('/api/onboarding/options/', HTTP_ACCEPT_LANGUAGE=header) for header in HEADERS]
+    middleware = LanguageMiddleware(lambda request: None)
+
+    for name, process_request in (
+        ('legacy parsing', legacy_process_request),
+        ('memoized negotiation', middleware.process_request),
+    ):
+        cycle = itertools.cycle(requests)
+        report(name, measure(lambda: process_request(next(cycle)), 20000))
+
+    supported = frozenset(code for code, _ in settings.LANGUAGES)
+    negotiate_language.cache_clear()
+    report("negotiate_language (uncached)", measure(
+        lambda: negotiate_language.__wrapped__(HEADERS[3], supported), 20000
+    ))
+    report("negotiate_language (cached)", measure(lambda: negotiate_language(HEADERS[3], supported), 20000))
+
+
+if __name__ == '__main__':
+    main()
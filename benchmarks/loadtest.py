@@ -0,0 +1,509 @@
+"""
+Reproducible load tests of the API, run with `manage.py loadtest`.
+
+Scenarios are generators that yield a Request to send through the app or
+a Query to run against the database (e.g. to read an OTP code) and get
+the result back. That way the same scenario runs on the thread pool
+driving the WSGI app and on the asyncio tasks driving the ASGI app.
+
+The mix of scenarios and their data are drawn from a seeded RNG, so two
+runs with the same options send the same requests and their reports can
+be compared across commits.
+"""
+import asyncio
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+
+from core.handlers import PathDispatchASGIHandler, PathDispatchWSGIHandler
+from core.seed import read_spec, seed as seed_catalog
+from users.models.LearningDomain import LearningDomain
+from users.models.LearningMotivation import LearningMotivation
+from users.models.LearningPeriodTarget import LearningPeriodTarget
+from users.models.OTPCode import OTPCode
+from users.models.UserProfile import UserProfile
+from users.serializers.CustomTokenObtainPairSerializer import CustomTokenObtainPairSerializer
+
+User = get_user_model()
+
+# Users created by the load test, deleted before each run
+EMAIL_PREFIX = 'loadtest-'
+PASSWORD = 'loadtest-password'
+
+DEFAULT_MIX = {'catalog': 4, 'signup': 1, 'profile': 3, 'refresh': 2}
+
+
+class Request:
+    __slots__ = ('method', 'path', 'body', 'headers', 'name')
+
+    def __init__(self, method, path, data=None, token=None, language='en', name=None):
+        self.method = method
+        self.path = path
+        self.body = json.dumps(data).encode() if data is not None else b''
+        self.headers = {'Accept-Language': language}
+        if data is not None:
+            self.headers['Content-Type'] = 'application/json'
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+        self.name = name or f'{method} {path}'
+
+
+class Response:
+    __slots__ = ('status', 'data')
+
+    def __init__(self, status, content):
+        self.status = status
+        try:
+            self.data = json.loads(content).get('data')
+        except (ValueError, AttributeError):
+            self.data = None
+
+
+class Query:
+    """
+    A database call made by a scenario, it is not timed.
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+
+class Fixture:
+    """
+    Data the scenarios draw from, created by prepare_fixture().
+    """
+    def __init__(self, run_id, users, domain_ids, motivation_ids, goal_ids):
+        self.run_id = run_id
+        self.users = users
+        self.domain_ids = domain_ids
+        self.motivation_ids = motivation_ids
+        self.goal_ids = goal_ids
+        self.languages = [code for code, _ in settings.LANGUAGES]
+
+
+def get_otp_code(email, purpose):
+    return OTPCode.objects.filter(user__email=email, purpose=purpose).values_list('code', flat=True).first()
+
+
+def catalog(fixture, rng):
+    """
+    A fresh install loading the app configuration and onboarding options, without ETags.
+    """
+    language = rng.choice(fixture.languages)
+    for path in ('/api/config/', '/api/config/theme/', '/api/onboarding/options/'):
+        yield Request('GET', path, language=language)
+
+
+def signup(fixture, rng):
+    """
+    Register, request an OTP, verify the email with it and log in.
+    """
+    email = f'{EMAIL_PREFIX}{fixture.run_id}-{rng.getrandbits(48):012x}@example.com'
+    yield Request('POST', '/api/auth/register/', {
+        'email': email,
+        'password': PASSWORD,
+        'confirm_password': PASSWORD,
+        'full_name': 'Load Test',
+        'age': rng.randint(13, 70),
+        'interests': rng.sample(fixture.domain_ids, min(3, len(fixture.domain_ids))),
+        'motivation': rng.choice(fixture.motivation_ids),
+        'daily_goal': rng.choice(fixture.goal_ids),
+    })
+    yield Request('POST', '/api/auth/request-otp/', {'email': email, 'purpose': 'verify'})
+    code = yield Query(get_otp_code, email, 'verify')
+    yield Request('POST', '/api/auth/verify-otp/', {'email': email, 'code': code, 'purpose': 'verify'})
+    yield Request('POST', '/api/auth/login/', {'email': email, 'password': PASSWORD})
+
+
+def profile(fixture, rng):
+    """
+    A signed in user reading their profile and changing it.
+    """
+    user = rng.choice(fixture.users)
+    yield Request('GET', '/api/profile/', token=user['access'])
+    yield Request(
+        'PATCH', '/api/profile/me/', {'full_name': 'Load Test', 'age': rng.randint(13, 70)},
+        token=user['access'], name='PATCH /api/profile/{id}/',
+    )
+
+
+def refresh(fixture, rng):
+    """
+    A signed in user getting a new access token.
+    """
+    user = rng.choice(fixture.users)
+    yield Request('POST', '/api/auth/token/refresh/', {'refresh': user['refresh']})
+
+
+SCENARIOS = {
+    'catalog': catalog,
+    'signup': signup,
+    'profile': profile,
+    'refresh': refresh,
+}
+
+
+def prepare_fixture(users=50):
+    """
+    Seed the catalog and create `users` verified users with tokens.
+
+    Users of earlier runs are deleted first, so repeated runs on a kept
+    database see the same amount of data.
+    """
+    User.objects.filter(email__startswith=EMAIL_PREFIX).delete()
+
+    seed_catalog(read_spec(settings.SEED_SPEC))
+
+    domain_ids = list(LearningDomain.objects.values_list('pk', flat=True))
+    motivation_ids = list(LearningMotivation.objects.values_list('pk', flat=True))
+    goal_ids = list(LearningPeriodTarget.objects.values_list('pk', flat=True))
+
+    # One hash for everyone, hashing per user would make setup take minutes
+    password = make_password(PASSWORD)
+    created = User.objects.bulk_create([
+        User(email=f'{EMAIL_PREFIX}user-{number}@example.com', password=password, is_verified=True)
+        for number in range(users)
+    ])
+    UserProfile.objects.bulk_create([
+        UserProfile(user=user, full_name='Load Test', age=30, motivation_id=motivation_ids[0], daily_goal_id=goal_ids[0])
+        for user in created
+    ])
+    credentials = [CustomTokenObtainPairSerializer.get_creds(user) for user in created]
+    # Part of the signup emails, the OTP rate limit outlives the users of a previous run
+    return Fixture(uuid.uuid4().hex[:8], credentials, domain_ids, motivation_ids, goal_ids)
+
+
+def build_plan(mix, iterations, seed):
+    """
+    Draw the scenario of every iteration.
+
+    Returns:
+        A list of (scenario name, seed of its RNG)
+    """
+    rng = random.Random(seed)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=iterations)
+    return [(name, rng.getrandbits(64)) for name in names]
+
+
+class Recorder:
+    """
+    Latencies and errors of one worker, merged into a report at the end.
+    """
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.request_errors = Counter()
+        self.scenarios = defaultdict(list)
+        self.scenario_failures = Counter()
+
+    def add_request(self, name, seconds, ok):
+        self.requests[name].append(seconds)
+        if not ok:
+            self.request_errors[name] += 1
+
+    def add_scenario(self, name, seconds, ok):
+        self.scenarios[name].append(seconds)
+        if not ok:
+            self.scenario_failures[name] += 1
+
+    def merge(self, other):
+        for name, latencies in other.requests.items():
+            self.requests[name].extend(latencies)
+        for name, latencies in other.scenarios.items():
+            self.scenarios[name].extend(latencies)
+        self.request_errors.update(other.request_errors)
+        self.scenario_failures.update(other.scenario_failures)
+
+
+def wsgi_environ(request):
+    environ = {
+        'REQUEST_METHOD': request.method,
+        'PATH_INFO': request.path,
+        'QUERY_STRING': '',
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': 'testserver',
+        'CONTENT_LENGTH': str(len(request.body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(request.body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in request.headers.items():
+        if name == 'Content-Type':
+            environ['CONTENT_TYPE'] = value
+        else:
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def send_wsgi(application, request):
+    status = []
+
+    def start_response(status_line, headers, exc_info=None):
+        status.append(int(status_line.split(' ', 1)[0]))
+
+    result = application(wsgi_environ(request), start_response)
+    try:
+        content = b''.join(result)
+    finally:
+        # Fires request_finished, which returns the database connection
+        result.close()
+    return Response(status[0], content)
+
+
+async def send_asgi(application, request):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': request.method,
+        'scheme': 'http',
+        'path': request.path,
+        'raw_path': request.path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'content-length', str(len(request.body)).encode())] + [
+            (name.lower().encode(), value.encode()) for name, value in request.headers.items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    finished = asyncio.Event()
+    body_sent = False
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': request.body, 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                finished.set()
+
+    await application(scope, receive, send)
+    finished.set()
+    return Response(status, b''.join(chunks))
+
+
+def run_scenario(name, steps, send, recorder):
+    start = time.perf_counter()
+    ok = True
+    result = None
+    try:
+        while True:
+            step = steps.send(result)
+            if isinstance(step, Query):
+                result = step.func(*step.args)
+                continue
+            request_start = time.perf_counter()
+            try:
+                result = send(step)
+            except Exception:
+                result = None
+            ok = result is not None and result.status < 400
+            recorder.add_request(step.name, time.perf_counter() - request_start, ok)
+            if not ok:
+                break
+    except StopIteration:
+        pass
+    finally:
+        steps.close()
+    recorder.add_scenario(name, time.perf_counter() - start, ok)
+
+
+async def run_scenario_async(name, steps, send, recorder):
+    start = time.perf_counter()
+    ok = True
+    result = None
+    try:
+        while True:
+            step = steps.send(result)
+            if isinstance(step, Query):
+                result = await sync_to_async(step.func)(*step.args)
+                continue
+            request_start = time.perf_counter()
+            try:
+                result = await send(step)
+            except Exception:
+                result = None
+            ok = result is not None and result.status < 400
+            recorder.add_request(step.name, time.perf_counter() - request_start, ok)
+            if not ok:
+                break
+    except StopIteration:
+        pass
+    finally:
+        steps.close()
+    recorder.add_scenario(name, time.perf_counter() - start, ok)
+
+
+def run_wsgi(fixture, plan, concurrency):
+    """
+    Run the plan on `concurrency` threads calling the WSGI app.
+
+    Returns:
+        A tuple of (Recorder, seconds elapsed)
+    """
+    application = PathDispatchWSGIHandler()
+    queue = iter(plan)
+    lock = threading.Lock()
+
+    def worker():
+        recorder = Recorder()
+        try:
+            while True:
+                with lock:
+                    item = next(queue, None)
+                if item is None:
+                    return recorder
+                name, seed = item
+                steps = SCENARIOS[name](fixture, random.Random(seed))
+                run_scenario(name, steps, lambda request: send_wsgi(application, request), recorder)
+        finally:
+            # Queries outside of requests (OTP lookups) leave the connection open
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix='loadtest') as executor:
+        recorders = [future.result() for future in [executor.submit(worker) for _ in range(concurrency)]]
+    elapsed = time.perf_counter() - start
+
+    recorder = Recorder()
+    for worker_recorder in recorders:
+        recorder.merge(worker_recorder)
+    return recorder, elapsed
+
+
+def run_asgi(fixture, plan, concurrency):
+    """
+    Run the plan on `concurrency` asyncio tasks calling the ASGI app.
+
+    Returns:
+        A tuple of (Recorder, seconds elapsed)
+    """
+    application = PathDispatchASGIHandler()
+
+    async def worker(queue):
+        recorder = Recorder()
+        for name, seed in queue:
+            steps = SCENARIOS[name](fixture, random.Random(seed))
+            await run_scenario_async(name, steps, lambda request: send_asgi(application, request), recorder)
+        return recorder
+
+    async def main():
+        # A single iterator, each task takes the next item when it is free
+        queue = iter(plan)
+        start = time.perf_counter()
+        recorders = await asyncio.gather(*(worker(queue) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        # Sync code of the app and of queries runs on one thread, close its connections
+        await sync_to_async(connections.close_all)()
+        return recorders, elapsed
+
+    recorders, elapsed = asyncio.run(main())
+    recorder = Recorder()
+    for worker_recorder in recorders:
+        recorder.merge(worker_recorder)
+    return recorder, elapsed
+
+
+TRANSPORTS = {
+    'wsgi': run_wsgi,
+    'asgi': run_asgi,
+}
+
+
+def percentile(sorted_values, percent):
+    # Nearest rank
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'error_rate': round(errors / len(latencies), 4),
+        'throughput': round(len(latencies) / elapsed, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def build_report(recorder, elapsed, meta):
+    """
+    Summarize a run: throughput per second, latency percentiles and error rates.
+    """
+    all_requests = [seconds for latencies in recorder.requests.values() for seconds in latencies]
+    return {
+        'meta': dict(meta, elapsed_s=round(elapsed, 3)),
+        'total': summarize(all_requests, sum(recorder.request_errors.values()), elapsed),
+        'scenarios': {
+            name: summarize(latencies, recorder.scenario_failures[name], elapsed)
+            for name, latencies in sorted(recorder.scenarios.items())
+        },
+        'requests': {
+            name: summarize(latencies, recorder.request_errors[name], elapsed)
+            for name, latencies in sorted(recorder.requests.items())
+        },
+    }
+
+
+def compare_reports(baseline, report):
+    """
+    Describe the change of every request from a baseline report.
+
+    Yields:
+        One line per request, after a warning if the runs are not comparable
+    """
+    keys = ('transport', 'concurrency', 'iterations', 'mix', 'seed', 'users', 'database', 'password_hasher')
+    different = [key for key in keys if baseline['meta'].get(key) != report['meta'].get(key)]
+    if different:
+        yield f"Warning: the runs differ in {', '.join(different)}"
+    for name, current in report['requests'].items():
+        before = baseline['requests'].get(name)
+        if not before or not before.get('count') or not current.get('count'):
+            yield f"{name:<36} new"
+            continue
+        changes = []
+        for key in ('p50_ms', 'p99_ms', 'throughput'):
+            change = (current[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key} {before[key]:>9} -> {current[key]:>9} ({change:+6.1f}%)")
+        if current['errors'] != before['errors']:
+            changes.append(f"errors {before['errors']} -> {current['errors']}")
+        yield f"{name:<36} " + '  '.join(changes)
@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from benchmarks.dataset import EMAIL_PREFIX, analyze_tables, chunk_ranges, write_chunk
+from benchmarks.utils import setup_django
+from users.models.LearningDomain import LearningDomain
+from users.models.LearningMotivation import LearningMotivation
+from users.models.LearningPeriodTarget import LearningPeriodTarget
+from users.models.User import User
+
+
+class Command(BaseCommand):
+    help = "Bulk generate synthetic users, profiles, interests and OTP history for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help="Number of users to generate")
+        parser.add_argument('--start', type=int, default=0, help="Index of the first user, to grow an existing dataset")
+        parser.add_argument('--seed', type=int, default=1, help="Seed of the data, the same seed gives the same users")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help="Worker processes")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Users inserted per transaction")
+        parser.add_argument('--otp-codes', type=float, default=2.0, help="Average OTP codes per user")
+        parser.add_argument(
+            '--password', default='benchmark-password',
+            help="Password of every user, hashed once with the configured hasher",
+        )
+
+    def handle(self, *args, **options):
+        catalog = {
+            'domains': list(LearningDomain.objects.order_by('pk').values_list('pk', flat=True)),
+            'motivations': list(LearningMotivation.objects.order_by('pk').values_list('pk', flat=True)),
+            'goals': list(LearningPeriodTarget.objects.order_by('pk').values_list('pk', flat=True)),
+        }
+        if not all(catalog.values()):
+            raise CommandError("Learning domains, motivations and daily goals are missing, run `manage.py seed` first")
+        if User.objects.filter(email__startswith=f"{EMAIL_PREFIX}{options['start']:09d}@").exists():
+            raise CommandError(f"User {options['start']} was already generated, pass --start to add more users")
+
+        password = make_password(options['password'])
+        chunks = chunk_ranges(options['start'], options['users'], options['chunk_size'])
+        args = (options['seed'], catalog, password, options['otp_codes'])
+        totals = Counter()
+        start = time.perf_counter()
+
+        if options['workers'] <= 1:
+            results = (write_chunk(*chunk, *args) for chunk in chunks)
+            self.report_progress(results, totals, start, options['users'])
+        else:
+            # Workers open their own connections, they must not inherit ours
+            connections.close_all()
+            with ProcessPoolExecutor(
+                options['workers'], mp_context=multiprocessing.get_context('spawn'), initializer=setup_django,
+            ) as executor:
+                futures = [executor.submit(write_chunk, *chunk, *args) for chunk in chunks]
+                self.report_progress((future.result() for future in as_completed(futures)), totals, start, options['users'])
+
+        analyze_tables()
+        elapsed = time.perf_counter() - start
+        for table, rows in sorted(totals.items()):
+            self.stdout.write(f"{table:<32} {rows:>12,} rows  {rows / elapsed:>10,.0f} rows/s")
+        self.stdout.write(self.style.SUCCESS(f"Generated {options['users']:,} users in {elapsed:.1f}s"))
+
+    def report_progress(self, results, totals, start, users):
+        done = 0
+        for counts in results:
+            totals.update(counts)
+            done += counts[User._meta.db_table]
+            self.stdout.write(f"{done:,}/{users:,} users ({done / (time.perf_counter() - start):,.0f}/s)")
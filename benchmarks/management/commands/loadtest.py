@@ -0,0 +1,120 @@
+import json
+import platform
+import subprocess
+import sys
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+
+from benchmarks.loadtest import (
+    DEFAULT_MIX, SCENARIOS, TRANSPORTS, build_plan, build_report, compare_reports, prepare_fixture,
+)
+
+
+def parse_mix(value):
+    """
+    Parse a scenario mix such as 'catalog=4,signup=1' into weights.
+    """
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in SCENARIOS:
+            raise CommandError(f"Unknown scenario '{name}', choose from {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise CommandError(f"Invalid weight '{weight}' for scenario '{name}'")
+    return mix
+
+
+def get_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, cwd=settings.BASE_DIR,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+class Command(BaseCommand):
+    help = "Load test the API in process against a fresh test database and report the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transport', choices=list(TRANSPORTS), default='wsgi', help="Entry point to drive")
+        parser.add_argument('--concurrency', type=int, default=8, help="Threads (wsgi) or tasks (asgi) sending requests")
+        parser.add_argument('--iterations', type=int, default=500, help="Scenarios to run")
+        parser.add_argument('--warmup', type=int, default=50, help="Scenarios to run first, left out of the report")
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help=f"Scenario weights, e.g. catalog=4,signup=1 (scenarios: {', '.join(SCENARIOS)})",
+        )
+        parser.add_argument('--seed', type=int, default=1, help="Seed of the scenario mix and data")
+        parser.add_argument('--users', type=int, default=50, help="Signed in users of the profile and refresh scenarios")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database between runs")
+        parser.add_argument('--output', help="File to write the JSON report to (defaults to stdout)")
+        parser.add_argument('--compare', help="Report of an earlier run to compare with, e.g. of the parent commit")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            fixture = prepare_fixture(options['users'])
+            run = TRANSPORTS[options['transport']]
+            if options['warmup']:
+                self.stderr.write(f"Warming up with {options['warmup']} scenarios")
+                run(fixture, build_plan(options['mix'], options['warmup'], -options['seed']), options['concurrency'])
+
+            self.stderr.write(
+                f"Running {options['iterations']} scenarios on {options['concurrency']} {options['transport']} workers"
+            )
+            plan = build_plan(options['mix'], options['iterations'], options['seed'])
+            recorder, elapsed = run(fixture, plan, options['concurrency'])
+            report = build_report(recorder, elapsed, {
+                'commit': get_commit(),
+                'started_at': timezone.now().isoformat(),
+                'transport': options['transport'],
+                'concurrency': options['concurrency'],
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                'mix': options['mix'],
+                'users': options['users'],
+                'database': connection.vendor,
+                'password_hasher': settings.PASSWORD_HASHERS[0],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            })
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(content + '\n')
+        else:
+            self.stdout.write(content)
+
+        total = report['total']
+        self.stderr.write(
+            f"{total.get('count', 0)} requests, {total.get('throughput', 0)}/s, p50 {total.get('p50_ms')}ms, "
+            f"p99 {total.get('p99_ms')}ms, error rate {total.get('error_rate')}"
+        )
+        if baseline is not None:
+            for line in compare_reports(baseline, report):
+                self.stderr.write(line)
+        if total.get('errors'):
+            sys.exit(1)
@@ -0,0 +1,99 @@
+"""
+Measure what MetricsMiddleware adds to an /api/ request, in a single
+process and with the multiprocess (file backed) collector, and check
+that a scrape adds up the requests of several worker processes.
+
+Usage:
+    python -m benchmarks.metrics
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+WORKERS = 4
+REQUESTS_PER_WORKER = 2000
+
+
+def serve(count):
+    from benchmarks.utils import setup_django
+
+    setup_django()
+
+    from django.test import RequestFactory, override_settings
+
+    from core.handlers import PathDispatchWSGIHandler
+
+    factory = RequestFactory()
+    with override_settings(ROOT_URLCONF='benchmarks.middleware'):
+        handler = PathDispatchWSGIHandler()
+        for _ in range(count):
+            handler.get_response(factory.get('/api/ping/'))
+
+
+def run():
+    from benchmarks.utils import measure, report, setup_django
+
+    setup_django()
+
+    from django.conf import settings
+    from django.test import RequestFactory, override_settings
+
+    from core.handlers import PathDispatchWSGIHandler
+
+    factory = RequestFactory()
+    without_metrics = [name for name in settings.API_MIDDLEWARE if not name.endswith('MetricsMiddleware')]
+    mode = 'multiprocess' if 'PROMETHEUS_MULTIPROC_DIR' in os.environ else 'single process'
+    for name, middleware in (('no metrics middleware', without_metrics), (mode, settings.API_MIDDLEWARE)):
+        with override_settings(ROOT_URLCONF='benchmarks.middleware', API_MIDDLEWARE=middleware):
+            handler = PathDispatchWSGIHandler()
+            report(name, measure(lambda: handler.get_response(factory.get('/api/ping/')), 5000))
+
+
+def main():
+    if '--run' in sys.argv:
+        return run()
+
+    run()
+
+    # The multiprocess collector is picked when prometheus_client is imported
+    with tempfile.TemporaryDirectory() as directory:
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.metrics', '--run'],
+            env={**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory},
+            check=True,
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = directory
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=serve, args=(REQUESTS_PER_WORKER,)) for _ in range(WORKERS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        from benchmarks.utils import setup_django
+
+        setup_django()
+
+        from django.test.utils import setup_databases, teardown_databases
+
+        from core.metrics import generate_metrics
+
+        # The scrape also reads the email outbox depth
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            output = generate_metrics().decode()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        line = next(
+            line for line in output.splitlines()
+            if line.startswith('steamup_http_requests_total{') and 'api/ping/' in line
+        )
+        print(f"{WORKERS} workers x {REQUESTS_PER_WORKER} requests, scraped: {line}")
+
+
+if __name__ == '__main__':
+    main()
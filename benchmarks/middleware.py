@@ -0,0 +1,48 @@
+"""
+Measure the per-request middleware overhead of an /api/ request through
+the full MIDDLEWARE chain and through the lean API_MIDDLEWARE chain.
+
+The view is trivial, so the difference is the middleware alone.
+
+Usage:
+    python -m benchmarks.middleware
+"""
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+
+from core.handlers import PathDispatchWSGIHandler
+
+
+def ping(request):
+    return JsonResponse({'ok': True})
+
+
+urlpatterns = [
+    path('api/ping/', ping),
+]
+
+
+def main():
+    factory = RequestFactory()
+
+    with override_settings(ROOT_URLCONF=__name__):
+        for name, handler in (
+            ('full middleware', WSGIHandler()),
+            ('api middleware', PathDispatchWSGIHandler()),
+        ):
+            report(name, measure(lambda: handler.get_response(
+                factory.get('/api/ping/', HTTP_ACCEPT_LANGUAGE='ru-RU,ru;q=0.9,en;q=0.8')
+            ), 5000))
+        report("request construction only", measure(
+            lambda: factory.get('/api/ping/', HTTP_ACCEPT_LANGUAGE='ru-RU,ru;q=0.9,en;q=0.8'), 5000
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Compare serving /api/schema/ by generating the schema on every request
+against serving the artifact written by `manage.py build_openapi_schema`.
+
+Usage:
+    python -m benchmarks.openapi
+"""
+import tempfile
+
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.test import Client, override_settings
+
+from core.openapi import build_schema_artifacts, clear_schema_artifacts, load_schema_artifact
+
+
+def main():
+    client = Client()
+
+    with override_settings(DEBUG=True):
+        report("live generation", measure(lambda: client.get('/api/schema/'), 20, repeat=3))
+
+    with tempfile.TemporaryDirectory() as schema_dir, override_settings(DEBUG=False, OPENAPI_SCHEMA_DIR=schema_dir):
+        for language, seconds in build_schema_artifacts():
+            print(f"build '{language}': {seconds * 1000:.1f}ms")
+
+        clear_schema_artifacts()
+        report("prebuilt artifact", measure(lambda: client.get('/api/schema/'), 2000))
+        report("prebuilt artifact (304)", measure(
+            lambda: client.get('/api/schema/', HTTP_IF_NONE_MATCH=load_schema_artifact('en', 'yaml')[1]), 2000
+        ))
+
+
+if __name__ == '__main__':
+    main()
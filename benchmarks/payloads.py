@@ -0,0 +1,52 @@
+import uuid
+
+
+def onboarding_payload(size):
+    """
+    Build an onboarding-like payload with the given number of items per list.
+    """
+    item = {'id': 1, 'icon': 'http://localhost/media/icon/physics.png', 'title': 'Physics'}
+    return {
+        'motivations': [dict(item, id=i) for i in range(size)],
+        'daily_goals': [{'id': i, 'title': '1 / day', 'comment': 'Great', 'icon': None} for i in range(size)],
+        'learning_domains': [dict(item, id=i) for i in range(size)],
+    }
+
+
+def registration_request():
+    """
+    Build the body of a registration request.
+    """
+    return {
+        'email': 'user@example.com',
+        'password': 'newpassword123',
+        'confirm_password': 'newpassword123',
+        'full_name': 'John Doe',
+        'age': 25,
+        'interests': [1, 3, 5],
+        'motivation': 2,
+        'daily_goal': 3,
+    }
+
+
+def registration_response():
+    """
+    Build the data returned by a successful registration.
+    """
+    user_id = uuid.uuid4()
+    return {
+        'user': {
+            'id': str(user_id),
+            'email': 'user@example.com',
+            'full_name': 'John Doe',
+            'age': 25,
+            'interests': [1, 3, 5],
+            'motivation': 2,
+            'daily_goal': 3,
+        },
+        'creds': {
+            'user_id': user_id,
+            'email': 'user@example.com',
+            'is_verified': False,
+        },
+    }
@@ -0,0 +1,68 @@
+"""
+Measure how many throttled OTP and login requests a single process
+can reject per second while an attacker hammers one account.
+
+Rejected requests are answered from the cache, so no database is needed.
+
+Usage:
+    python -m benchmarks.ratelimit
+"""
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+import itertools
+
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from core.ratelimit import RateLimiter
+from core.views.token_views import CustomTokenObtainPairView
+from users.views.AuthViewSet import OTPRequestView
+
+
+def main():
+    limiter = RateLimiter('benchmark', limit=10, period=60)
+    identities = (f"user{i}" for i in itertools.count())
+    report("RateLimiter.hit (allowed)", measure(lambda: limiter.hit(next(identities)), 10000))
+    for _ in range(10):
+        limiter.hit('victim')
+    report("RateLimiter.hit (rejected)", measure(lambda: limiter.hit('victim'), 10000))
+
+    factory = APIRequestFactory()
+    otp_data = {'email': 'victim@example.com', 'purpose': 'verify'}
+    login_data = {'email': 'victim@example.com', 'password': 'guess'}
+
+    # Use up the limits so every measured request is rejected
+    OTPRequestView.rate_limiter.hit('victim@example.com:verify')
+    for _ in range(CustomTokenObtainPairView.rate_limiter.limit):
+        CustomTokenObtainPairView.rate_limiter.hit('victim@example.com')
+
+    otp_view = OTPRequestView.as_view()
+    login_view = CustomTokenObtainPairView.as_view()
+
+    def request_otp():
+        return otp_view(factory.post('/api/auth/request-otp/', otp_data, format='json'))
+
+    def login():
+        return login_view(factory.post('/api/auth/login/', login_data, format='json'))
+
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        assert request_otp().status_code == 400
+        assert login().status_code == 429
+    print(f"Queries per rejected request: {len(queries) / 2:.0f}")
+
+    for name, func in (("rejected OTP request", request_otp), ("rejected login", login)):
+        best, median = measure(func, 2000)
+        report(name, (best, median))
+        print(f"{'':<40} {1 / median:10.0f} requests/s per process")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare the CPU cost of minting registration credentials by
+re-authenticating with the plaintext password (old flow) against minting
+them directly for the created user (new flow).
+
+Both flows hash the password once with the configured hasher. The old one
+then verifies it again, which costs a second full PBKDF2 run. Database
+work is left out, so the numbers are pure CPU per signup.
+
+Usage:
+    python -m benchmarks.registration
+"""
+import uuid
+
+from benchmarks.payloads import registration_request
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.contrib.auth import get_user_model
+
+from users.serializers.CustomTokenObtainPairSerializer import CustomTokenObtainPairSerializer
+
+User = get_user_model()
+
+
+def main():
+    password = registration_request()['password']
+
+    def create_user():
+        user = User(id=uuid.uuid4(), email='user@example.com', is_verified=False)
+        user.set_password(password)
+        return user
+
+    def reauthenticate():
+        user = create_user()
+        assert user.check_password(password)
+        CustomTokenObtainPairSerializer.get_creds(user)
+
+    def mint_directly():
+        user = create_user()
+        CustomTokenObtainPairSerializer.get_creds(user)
+
+    for name, func in (('hash + re-authenticate', reauthenticate), ('hash + mint directly', mint_directly)):
+        timings = measure(func, number=5)
+        report(name, timings)
+        print(f"{'':<47}{1 / timings[0]:6.1f} signups/s per core")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure what ServerTimingMiddleware adds to an /api/ request that does
+a cache read and a query, at different sample rates.
+
+Usage:
+    python -m benchmarks.server_timing
+"""
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import path
+
+from core.handlers import PathDispatchWSGIHandler
+
+
+def ping(request):
+    cache.get('benchmark')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return JsonResponse({'ok': True})
+
+
+urlpatterns = [
+    path('api/ping/', ping),
+]
+
+
+def main():
+    old_config = setup_databases(verbosity=0, interactive=False)
+    factory = RequestFactory()
+    without_timing = [name for name in settings.API_MIDDLEWARE if not name.endswith('ServerTimingMiddleware')]
+
+    try:
+        cases = [('no timing middleware', {'API_MIDDLEWARE': without_timing})]
+        cases += [(f"sample rate {rate}", {'SERVER_TIMING_SAMPLE_RATE': rate}) for rate in (0.0, 0.01, 1.0)]
+        for name, overrides in cases:
+            with override_settings(ROOT_URLCONF=__name__, **overrides):
+                handler = PathDispatchWSGIHandler()
+                report(name, measure(lambda: handler.get_response(factory.get('/api/ping/')), 5000))
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import io
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from benchmarks.dataset import build_user
+from benchmarks.loadtest import (
+    DEFAULT_MIX, SCENARIOS, build_plan, build_report, compare_reports, prepare_fixture, run_asgi, run_wsgi,
+)
+from users.models.LearningDomain import LearningDomain
+from users.models.LearningMotivation import LearningMotivation
+from users.models.LearningPeriodTarget import LearningPeriodTarget
+from users.models.OTPCode import OTPCode
+from users.models.User import User
+from users.models.UserProfile import UserProfile
+
+
+class LoadTestPlanTestCase(SimpleTestCase):
+    def test_plan_is_reproducible(self):
+        """Test the same seed draws the same scenarios and data"""
+        self.assertEqual(build_plan(DEFAULT_MIX, 50, seed=3), build_plan(DEFAULT_MIX, 50, seed=3))
+        self.assertNotEqual(build_plan(DEFAULT_MIX, 50, seed=3), build_plan(DEFAULT_MIX, 50, seed=4))
+    
+    def test_plan_follows_mix(self):
+        """Test scenarios without weight are never drawn"""
+        names = {name for name, _ in build_plan({'catalog': 1, 'refresh': 0}, 20, seed=1)}
+        self.assertEqual(names, {'catalog'})
+
+
+class LoadTestRunTestCase(TransactionTestCase):
+    def setUp(self):
+        # Rate limits hit by earlier tests would reject the scenario requests
+        cache.clear()
+    
+    def run_plan(self, run):
+        fixture = prepare_fixture(users=3)
+        plan = [(name, number) for number, name in enumerate(SCENARIOS)]
+        recorder, elapsed = run(fixture, plan, 2)
+        return build_report(recorder, elapsed, {'transport': run.__name__})
+    
+    def test_wsgi_scenarios_succeed(self):
+        """Test every scenario runs through the WSGI app without errors"""
+        report = self.run_plan(run_wsgi)
+        self.assertEqual(set(report['scenarios']), set(SCENARIOS))
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(report['requests']['POST /api/auth/verify-otp/']['count'], 1)
+    
+    def test_asgi_scenarios_succeed(self):
+        """Test every scenario runs through the ASGI app without errors"""
+        report = self.run_plan(run_asgi)
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(report['total']['count'], 10)
+        
+        lines = list(compare_reports(self.run_plan(run_wsgi), report))
+        self.assertEqual(lines[0], "Warning: the runs differ in transport")
+        self.assertEqual(len(lines), len(report['requests']) + 1)
+
+
+class GenerateDatasetTestCase(TestCase):
+    def setUp(self):
+        for title in ('Physics', 'Chemistry', 'Biology'):
+            LearningDomain.objects.create(title=title)
+        self.motivation = LearningMotivation.objects.create(title='Career')
+        self.goal = LearningPeriodTarget.objects.create(repeat_count=1)
+        self.catalog = {
+            'domains': list(LearningDomain.objects.values_list('pk', flat=True)),
+            'motivations': [self.motivation.pk],
+            'goals': [self.goal.pk],
+        }
+    
+    def test_users_depend_on_seed_and_index_only(self):
+        """Test the same seed and index always draw the same user"""
+        now = timezone.now()
+        self.assertEqual(build_user(7, 1, self.catalog, 'hash', now), build_user(7, 1, self.catalog, 'hash', now))
+        self.assertNotEqual(build_user(7, 1, self.catalog, 'hash', now), build_user(7, 2, self.catalog, 'hash', now))
+    
+    def test_generate_dataset(self):
+        """Test users, profiles, interests and OTP history are inserted in chunks"""
+        call_command('generate_dataset', users=30, workers=1, chunk_size=8, stdout=io.StringIO())
+        
+        self.assertEqual(User.objects.filter(email__startswith='synthetic').count(), 30)
+        self.assertEqual(
+            UserProfile.interests.through.objects.values('userprofile').distinct().count(),
+            UserProfile.objects.count(),
+        )
+        self.assertGreaterEqual(OTPCode.objects.count(), 30)
+        # Histories keep their own dates
+        self.assertTrue(OTPCode.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).exists())
+        self.assertTrue(User.objects.first().check_password('benchmark-password'))
+        
+        with self.assertRaises(CommandError):
+            call_command('generate_dataset', users=5, workers=1, stdout=io.StringIO())
+        call_command('generate_dataset', users=5, workers=1, start=30, stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(email__startswith='synthetic').count(), 35)
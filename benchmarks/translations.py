@@ -0,0 +1,80 @@
+"""
+Compare serializing the onboarding catalog with per-object translation
+queries, with prefetched translations (with_translations()) and with the
+denormalized translations_cache column.
+
+The catalog is created in a throwaway test database on the configured
+database backend, which is destroyed afterwards.
+
+Usage:
+    python -m benchmarks.translations
+"""
+from benchmarks.utils import measure, report, setup_django
+
+setup_django()
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from core.translations import rebuild_translations_cache
+from users.models.LearningDomain import LearningDomain
+from users.serializers.onboarding.LearningDomainSerializer import LearningDomainSerializer
+
+LANGUAGES = ('en', 'ru', 'uz')
+
+
+def grow_catalog(size):
+    """
+    Add learning domains, translated in every language, until there are size of them.
+    """
+    start = LearningDomain.objects.count()
+    domains = LearningDomain.objects.bulk_create([LearningDomain(title=f'Domain {i}') for i in range(start, size)])
+    translation_model = LearningDomain._parler_meta.root_model
+    translation_model.objects.bulk_create([
+        translation_model(master=domain, language_code=language, name_translated=f'{domain.pk} {language}')
+        for domain in domains
+        for language in LANGUAGES
+    ])
+
+
+def serialize(queryset):
+    return LearningDomainSerializer(queryset, many=True, context={'language': 'en'}).data
+
+
+def main():
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        for size in (100, 500, 1000):
+            grow_catalog(size)
+            for name, get_queryset, denormalized in (
+                ('per-object queries', LearningDomain.objects.all, False),
+                ('with_translations()', LearningDomain.objects.with_translations, False),
+                ('translations_cache', LearningDomain.objects.with_translations, True),
+            ):
+                if denormalized:
+                    sum(rebuild_translations_cache(LearningDomain))
+                else:
+                    LearningDomain.objects.update(translations_cache=None)
+
+                def run():
+                    # Parler also caches translations, start cold every time
+                    cache.clear()
+                    serialize(get_queryset())
+
+                queries = []
+
+                def count_queries(execute, sql, params, many, context):
+                    queries.append(sql)
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count_queries):
+                    run()
+                report(f"{name} ({size} domains)", measure(run, number=3, repeat=3))
+                print(f"{'':<47}{len(queries):6d} queries")
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import os
+import statistics
+import sys
+import time
+
+import django
+
+
+def setup_django():
+    """
+    Set up the Django environment for standalone benchmark scripts.
+    """
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'steamup_platform.settings')
+    django.setup()
+
+
+def measure(func, number=1000, repeat=5):
+    """
+    Time a callable and return the best and median seconds per call.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings), statistics.median(timings)
+
+
+def report(name, timings):
+    """
+    Print a single benchmark result line.
+    """
+    best, median = timings
+    print(f"{name:<40} best {best * 1e6:10.1f} us   median {median * 1e6:10.1f} us")
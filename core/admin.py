@@ -1,5 +1,5 @@
 from django.contrib import admin
-from core.models import AppConfig, Image
+from core.models import AppConfig, EmailOutbox, Image
 
 
 @admin.register(AppConfig)
@@ -15,4 +15,11 @@ class ImageAdmin(admin.ModelAdmin):
     def get_image_url(self, obj):
         return obj.get_image_url()
     
-    get_image_url.short_description = 'Image URL'
\ No newline at end of file
+    get_image_url.short_description = 'Image URL'
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    ordering = ('-created_at',)
@@ -0,0 +1,88 @@
+"""
+Cache backends that count hits and misses in core.metrics and time
+reads for sampled requests in core.timing.
+
+Use them in CACHES instead of the Django backends of the same name.
+"""
+import time
+from contextvars import ContextVar
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.core.cache.backends.redis import RedisCache as BaseRedisCache
+
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.timing import get_timings, timed
+
+# Seconds version stamps and the entries keyed by them live in a per-process cache
+LOCAL_INVALIDATION_TIMEOUT = 30
+
+# Set while get_many() runs, some backends implement it with get()
+_in_get_many = ContextVar('cache_in_get_many', default=False)
+
+
+class InstrumentedCacheMixin:
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        if _in_get_many.get():
+            return super().get(key, default, version)
+
+        timings = get_timings()
+        start = time.perf_counter()
+        value = super().get(key, self._missing, version)
+        hit = value is not self._missing
+        (CACHE_HITS if hit else CACHE_MISSES).inc()
+        if timings is not None:
+            timings.add('cache', time.perf_counter() - start)
+            timings.add('cache_hit' if hit else 'cache_miss')
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        token = _in_get_many.set(True)
+        try:
+            with timed('cache'):
+                values = super().get_many(keys, version)
+        finally:
+            _in_get_many.reset(token)
+
+        CACHE_HITS.inc(len(values))
+        CACHE_MISSES.inc(len(keys) - len(values))
+        timings = get_timings()
+        if timings is not None:
+            timings.add('cache_hit', count=len(values))
+            timings.add('cache_miss', count=len(keys) - len(values))
+        return values
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    pass
+
+
+class RedisCache(InstrumentedCacheMixin, BaseRedisCache):
+    pass
+
+
+def is_shared_cache(backend):
+    """
+    Tell whether every worker process sees the writes to a cache backend.
+
+    Entries deleted to invalidate something in a local memory cache are
+    only dropped in the current process, so other workers keep them until
+    they expire.
+    """
+    return not isinstance(backend, (BaseLocMemCache, DummyCache))
+
+
+def bounded_timeout(backend, timeout=None):
+    """
+    Return the timeout of an entry other workers must see invalidated.
+
+    A bump in a per-process cache only reaches the current worker, so there
+    such entries expire after LOCAL_INVALIDATION_TIMEOUT at the latest and
+    the other workers catch up then.
+    """
+    if is_shared_cache(backend):
+        return timeout
+    return LOCAL_INVALIDATION_TIMEOUT if timeout is None else min(timeout, LOCAL_INVALIDATION_TIMEOUT)
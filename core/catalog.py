@@ -0,0 +1,93 @@
+import uuid
+
+from django.core.cache import cache, caches
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from core.cache import bounded_timeout
+from core.routers import primary_reads
+
+# How long a rendered payload may live in the cache. Entries are keyed by
+# catalog version, so stale ones simply age out after a bump. In a
+# per-process cache versions and payloads expire sooner, see core.cache.bounded_timeout
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(namespace):
+    return f"catalog:{namespace}:version"
+
+
+def get_catalog_version(namespace):
+    """
+    Return the current version stamp of a catalog namespace.
+
+    A random stamp rather than a counter: after a flush or eviction a
+    counter would start over, and an old ETag could match new content.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(key, version, timeout=bounded_timeout(caches['default']))
+        version = cache.get(key, version)
+    return version
+
+
+def bump_catalog_version(namespace):
+    """
+    Invalidate every cached payload of a catalog namespace.
+
+    Returns:
+        The new version stamp
+    """
+    version = uuid.uuid4().hex
+    cache.set(_version_key(namespace), version, timeout=bounded_timeout(caches['default']))
+    return version
+
+
+def get_cached_payload(namespace, variant, build):
+    """
+    Get a pre-encoded payload for the current catalog version.
+
+    Args:
+        namespace: Catalog namespace, e.g. 'onboarding'
+        variant: What the payload depends on besides the version (language, host, ...)
+        build: Callable returning the payload as bytes, called on a cache miss
+
+    Returns:
+        The payload bytes
+    """
+    version = get_catalog_version(namespace)
+    key = f"catalog:{namespace}:payload:{version}:{variant}"
+
+    payload = cache.get(key)
+    if payload is None:
+        # Cached for long, so never built from a replica that may lag behind the version
+        with primary_reads():
+            payload = build()
+        cache.set(key, payload, timeout=bounded_timeout(caches['default'], PAYLOAD_TIMEOUT))
+    return payload
+
+
+def catalog_etag(namespace, get_variant=None):
+    """
+    View decorator adding a strong ETag derived from the catalog version.
+
+    The tag also carries the variant of the response, the active language
+    by default, so each Content-Language gets its own validator. A matching
+    If-None-Match is answered with 304 before the view runs, so no ORM work
+    is done.
+
+    Args:
+        namespace: Catalog namespace, e.g. 'onboarding'
+        get_variant: Callable(request) returning what the response depends on besides the version
+
+    Usage on class-based views:
+        @method_decorator(catalog_etag('onboarding'))
+        def get(self, request): ...
+    """
+    def etag_func(request, *args, **kwargs):
+        variant = get_variant(request) if get_variant else get_language() or 'en'
+        return f"{namespace}-{get_catalog_version(namespace)}-{variant}"
+
+    return condition(etag_func=etag_func)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Error, Tags, register
+
+from core.cache import is_shared_cache
+
+
+@register(Tags.database, Tags.caches)
+def check_replica_pins(app_configs, **kwargs):
+    """
+    Read-your-writes pins of core.routers must be seen by every worker.
+    """
+    if settings.DATABASE_REPLICAS and not is_shared_cache(caches['default']):
+        return [Error(
+            "DB_REPLICA_HOSTS needs a cache shared by all workers.",
+            hint=(
+                "Users are pinned to the primary after a write through the default cache. With a "
+                "per-process cache the other workers read from the replicas, so set CACHE_BACKEND "
+                "to e.g. core.cache.RedisCache."
+            ),
+            id='core.E001',
+        )]
+    return []
@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from core.cache import bounded_timeout
+from core.models import AppConfig
+from core.routers import primary_reads
+
+# A random stamp rather than a counter, so a flushed cache can never
+# make an old snapshot look current again. In a per-process cache it also
+# expires, see core.cache.bounded_timeout
+STAMP_KEY = 'app_config:snapshot_stamp'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class ConfigSnapshot:
+    """
+    All AppConfig rows and their translations, as loaded at one stamp.
+    """
+    def __init__(self, stamp, values, translations):
+        self.stamp = stamp
+        self.values = values
+        self.translations = translations
+        self.checked_at = time.monotonic()
+
+
+def get_snapshot_stamp():
+    """
+    Return the shared snapshot stamp, creating one if the cache has none.
+    """
+    stamp = cache.get(STAMP_KEY)
+    if stamp is None:
+        cache.add(STAMP_KEY, uuid.uuid4().hex, timeout=bounded_timeout(caches['default']))
+        stamp = cache.get(STAMP_KEY)
+    return stamp
+
+
+def bump_snapshot_stamp():
+    """
+    Make every worker reload its AppConfig snapshot.
+    """
+    global _snapshot
+    cache.set(STAMP_KEY, uuid.uuid4().hex, timeout=bounded_timeout(caches['default']))
+    # This worker reloads right away instead of after the next check
+    _snapshot = None
+
+
+def load_snapshot(stamp):
+    """
+    Load every AppConfig row with its translations in a single query.
+    """
+    values = {}
+    translations = {}
+    rows = AppConfig.objects.values_list(
+        'key', 'value', 'translations__language_code', 'translations__value_translated'
+    )
+    # Kept until the next stamp, so it must not come from a lagging replica
+    with primary_reads():
+        rows = list(rows)
+    for key, value, language_code, value_translated in rows:
+        values[key] = value
+        if language_code is not None:
+            translations.setdefault(key, {})[language_code] = value_translated
+    return ConfigSnapshot(stamp, values, translations)
+
+
+def get_snapshot():
+    """
+    Return the current snapshot, reloading it if another worker bumped the stamp.
+
+    The shared stamp is read at most once per APP_CONFIG_SNAPSHOT_INTERVAL
+    seconds, so lookups in between are pure memory reads.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.checked_at < settings.APP_CONFIG_SNAPSHOT_INTERVAL:
+        return snapshot
+
+    stamp = get_snapshot_stamp()
+    if snapshot is not None and snapshot.stamp == stamp:
+        snapshot.checked_at = time.monotonic()
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.stamp != stamp:
+            _snapshot = load_snapshot(stamp)
+        return _snapshot
+
+
+def get_config(key, language=None, default=None):
+    """
+    Look up a config value from the in-process snapshot.
+
+    Args:
+        key: AppConfig key, e.g. 'primary_color'
+        language: Language of the value, the active language by default
+        default: Returned when the key does not exist or has no value
+
+    Returns:
+        The translated value, falling back to the default language
+        translation and then to the untranslated value
+    """
+    snapshot = get_snapshot()
+    if key not in snapshot.values:
+        return default
+
+    translations = snapshot.translations.get(key, {})
+    for code in (language or get_language(), settings.LANGUAGE_CODE):
+        if translations.get(code):
+            return translations[code]
+    return snapshot.values[key] or default
+
+
+def snapshot_etag():
+    """
+    View decorator adding a strong ETag derived from the config snapshot.
+
+    Views answering from get_config() must be tagged with the snapshot
+    they serve rather than a catalog version: the snapshot of each worker
+    follows an edit only after the commit, and up to
+    APP_CONFIG_SNAPSHOT_INTERVAL later, so a newer tag could otherwise be
+    paired with a stale body and then revalidated with 304s.
+    """
+    def etag_func(request, *args, **kwargs):
+        language = get_language() or 'en'
+        return f"config-{get_snapshot().stamp}-{language}"
+
+    return condition(etag_func=etag_func)
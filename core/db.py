@@ -0,0 +1,33 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def get_pool_stats(alias=DEFAULT_DB_ALIAS):
+    """
+    Return the connection pool stats of this worker process.
+
+    Counters (requests, wait_ms, timeouts) are totals since the pool was opened.
+
+    Returns:
+        A dict of pool stats, or None if the database is not pooled
+    """
+    connection = connections[alias]
+    if not connection.settings_dict.get('OPTIONS', {}).get('pool'):
+        return None
+
+    stats = connection.pool.get_stats()
+    size = stats.get('pool_size', 0)
+    idle = stats.get('pool_available', 0)
+    return {
+        'min_size': stats.get('pool_min', 0),
+        'max_size': stats.get('pool_max', 0),
+        'size': size,
+        'in_use': size - idle,
+        'idle': idle,
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': stats.get('requests_num', 0),
+        'queued': stats.get('requests_queued', 0),
+        'wait_ms': stats.get('requests_wait_ms', 0),
+        'timeouts': stats.get('requests_errors', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+        'bad_returns': stats.get('returns_bad', 0),
+    }
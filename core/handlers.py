@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.asgi import ASGIHandler
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+# Requests under this prefix run settings.API_MIDDLEWARE
+API_PATH_PREFIX = '/api/'
+
+
+class APIMiddlewareHandler(BaseHandler):
+    """
+    Handler whose middleware chain is built from settings.API_MIDDLEWARE.
+
+    The API authenticates with JWT, so sessions, CSRF, messages and the
+    admin's locale handling are skipped for its requests.
+    """
+    def load_middleware(self, is_async=False):
+        # Same as BaseHandler.load_middleware, for a different setting
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            middleware_is_async = is_async and getattr(middleware, 'async_capable', False)
+            adapted_handler = self.adapt_method_mode(middleware_is_async, handler, handler_is_async)
+            try:
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response)
+                )
+            if hasattr(mw_instance, 'process_exception'):
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class PathDispatchMixin:
+    """
+    Send API requests through the lean API_MIDDLEWARE chain and everything
+    else (admin, docs assets, static files) through the full MIDDLEWARE chain.
+    """
+    def load_middleware(self, is_async=False):
+        super().load_middleware(is_async)
+        self.api_handler = APIMiddlewareHandler()
+        self.api_handler.load_middleware(is_async)
+
+    def get_response(self, request):
+        if request.path.startswith(API_PATH_PREFIX):
+            return self.api_handler.get_response(request)
+        return super().get_response(request)
+
+    async def get_response_async(self, request):
+        if request.path.startswith(API_PATH_PREFIX):
+            return await self.api_handler.get_response_async(request)
+        return await super().get_response_async(request)
+
+
+class PathDispatchWSGIHandler(PathDispatchMixin, WSGIHandler):
+    pass
+
+
+class PathDispatchASGIHandler(PathDispatchMixin, ASGIHandler):
+    pass
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.openapi import build_schema_artifacts
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once per language for /api/schema/ to serve"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lang', action='append', dest='languages',
+            help="Language to build, may be repeated (defaults to every language in LANGUAGES)",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        for language, seconds in build_schema_artifacts(options['languages']):
+            self.stdout.write(f"Built schema for '{language}' in {seconds:.3f}s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Schema written to {settings.OPENAPI_SCHEMA_DIR} in {time.perf_counter() - start:.3f}s"
+        ))
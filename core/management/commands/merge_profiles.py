@@ -0,0 +1,51 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import MERGED_DIR, PROFILE_SUFFIX, merge_profiles
+
+
+class Command(BaseCommand):
+    help = "Add up the request profiles of each route into one flame graph ready file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help="Route directory to merge, e.g. api_auth_register, may be repeated (defaults to every route)",
+        )
+        parser.add_argument(
+            '--output', default=os.path.join(settings.PROFILING_DIR, MERGED_DIR),
+            help="Directory the merged profiles are written to",
+        )
+        parser.add_argument(
+            '--top', type=int, default=5,
+            help="Number of the most sampled functions to print per route",
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output'], exist_ok=True)
+        merged = 0
+
+        for name, route, count, stacks in merge_profiles(options['routes']):
+            path = os.path.join(options['output'], name + PROFILE_SUFFIX)
+            with open(path, 'w') as f:
+                for stack, samples in stacks.most_common():
+                    f.write(f"{stack} {samples}\n")
+            merged += 1
+
+            total = sum(stacks.values())
+            self.stdout.write(f"{route or name}: {count} profiles, {total} samples -> {path}")
+            leaves = {}
+            for stack, samples in stacks.items():
+                leaf = stack.rpartition(';')[2]
+                leaves[leaf] = leaves.get(leaf, 0) + samples
+            for leaf, samples in sorted(leaves.items(), key=lambda item: -item[1])[:options['top']]:
+                self.stdout.write(f"  {samples / total:6.1%}  {leaf}")
+
+        if not merged:
+            self.stdout.write(self.style.WARNING(f"No profiles found in {settings.PROFILING_DIR}"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {merged} routes, render them with flamegraph.pl or speedscope"
+        ))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import make_profiling_token
+
+
+class Command(BaseCommand):
+    help = "Print an X-Profile header value that profiles the API requests sending it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of the staff user the token is issued to")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['email'], is_staff=True)
+        except User.DoesNotExist:
+            raise CommandError(f"No staff user with email {options['email']}")
+
+        self.stdout.write(make_profiling_token(user))
+        self.stderr.write(
+            f"Valid for {settings.PROFILING_TOKEN_MAX_AGE}s, send it as the X-Profile header. "
+            f"Profiles are only taken with PROFILING_ENABLED=True."
+        )
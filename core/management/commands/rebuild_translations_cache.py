@@ -0,0 +1,42 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.translations import has_translations_cache, rebuild_translations_cache
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized translations_cache column of translatable models"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.ModelName',
+            help="Models to rebuild, all models with a translations_cache column by default",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Maximum number of rows updated per statement",
+        )
+
+    def handle(self, *args, **options):
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            models = [
+                model for model in apps.get_models()
+                if hasattr(model, '_parler_meta') and has_translations_cache(model)
+            ]
+
+        for model in models:
+            if not has_translations_cache(model):
+                raise CommandError(f"{model._meta.label} has no translations_cache column")
+
+            start = time.perf_counter()
+            total = sum(rebuild_translations_cache(model, options['batch_size']))
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.label}: rebuilt {total} rows in {time.perf_counter() - start:.3f}s"
+            ))
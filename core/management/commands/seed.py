@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seed import SeedError, read_spec, seed
+
+
+class Command(BaseCommand):
+    help = "Create or update the catalog rows of the seed spec and add missing translations, skipped if it did not change"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spec', default=settings.SEED_SPEC, help="Seed spec to apply (defaults to SEED_SPEC)")
+        parser.add_argument(
+            '--force', action='store_true',
+            help=(
+                "Compare with the database even if this spec was applied already, and overwrite "
+                "translations and app config values edited in the admin"
+            ),
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Show the changes without committing them")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            results = seed(read_spec(options['spec']), force=options['force'], dry_run=options['dry_run'])
+        except (OSError, SeedError) as e:
+            raise CommandError(str(e))
+
+        if results is None:
+            self.stdout.write(self.style.SUCCESS(
+                f"Seed spec unchanged, skipped in {time.perf_counter() - start:.3f}s"
+            ))
+            return
+        for changes in results:
+            self.stdout.write(str(changes))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run of the seed spec' if options['dry_run'] else 'Seed spec applied'} "
+            f"in {time.perf_counter() - start:.3f}s"
+        ))
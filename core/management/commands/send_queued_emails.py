@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.utils.email_outbox import prune_outbox, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver emails from the outbox in batches over a reused mail connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Maximum number of emails sent per batch",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            '--prune-interval', type=float, default=3600.0,
+            help="Seconds between deletions of messages older than EMAIL_OUTBOX_RETENTION_DAYS, 0 never prunes",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Send the emails that are due and exit",
+        )
+
+    def prune(self):
+        try:
+            deleted = prune_outbox()
+        except Exception as e:
+            self.stderr.write(f"Pruning failed: {e}")
+            return
+        if deleted:
+            self.stdout.write(f"Pruned {deleted} old messages")
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        pruned_at = None
+        try:
+            while True:
+                try:
+                    sent, failed = send_queued_emails(connection, options['batch_size'])
+                except Exception as e:
+                    # Keep the worker alive when the mail server is unreachable
+                    self.stderr.write(f"Sending failed: {e}")
+                    connection.close()
+                    sent = failed = 0
+
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                    continue
+
+                # Pruned while idle, so it never delays sending
+                interval = options['prune_interval']
+                if interval and (pruned_at is None or time.monotonic() - pruned_at >= interval):
+                    self.prune()
+                    pruned_at = time.monotonic()
+
+                if options['once']:
+                    break
+                # Close idle connections so the server does not time us out
+                connection.close()
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
@@ -0,0 +1,76 @@
+from django.db import models
+from django.db.models import prefetch_related_objects
+from parler.managers import TranslatableManager, TranslatableQuerySet
+
+from core.translations import TRANSLATIONS_CACHE_FIELD
+
+
+def prime_translations(objects):
+    """
+    Fill parler's per-instance translation cache from prefetched translations.
+
+    Parler already reads prefetched rows, but only on first access, and it
+    writes every translation it finds to the shared cache again. Priming the
+    cache up front skips both.
+    """
+    for obj in objects:
+        meta = obj._parler_meta.root
+        local_cache = obj._translations_cache[meta.model]
+        for translation in obj._prefetched_objects_cache.get(meta.rel_name, ()):
+            local_cache.setdefault(translation.language_code, translation)
+
+
+def load_translations(objects):
+    """
+    Prefetch and prime the translations of rows that have no translations_cache yet.
+    """
+    missing = [obj for obj in objects if getattr(obj, TRANSLATIONS_CACHE_FIELD, None) is None]
+    if missing:
+        prefetch_related_objects(missing, missing[0]._parler_meta.root_rel_name)
+        prime_translations(missing)
+
+
+class TranslatedQuerySet(TranslatableQuerySet):
+    """
+    TranslatableQuerySet that can load all translations in at most one extra query.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prime_translations = False
+
+    def _clone(self):
+        c = super()._clone()
+        c._prime_translations = self._prime_translations
+        return c
+
+    def with_translations(self):
+        """
+        Make every translation of the selected rows available without a query per object.
+
+        Rows with a built translations_cache column already carry them.
+        The translations of the other rows are prefetched in one extra
+        query and primed into parler's cache.
+
+        Usage:
+            LearningDomain.objects.with_translations()
+        """
+        clone = self._chain()
+        clone._prime_translations = True
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if (
+            not fetched
+            and self._prime_translations
+            and self._result_cache
+            and isinstance(self._result_cache[0], models.Model)
+        ):
+            load_translations(self._result_cache)
+
+
+class TranslatedManager(TranslatableManager.from_queryset(TranslatedQuerySet)):
+    """
+    Manager for translatable models that adds with_translations().
+    """
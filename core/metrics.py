@@ -0,0 +1,85 @@
+"""
+Prometheus metrics, served at /metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set (as under gunicorn), every worker
+writes its values to memory-mapped files in that directory and a scrape
+aggregates the files of all workers, so any worker can answer it.
+"""
+import os
+
+from django.db.models import Count
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+# Route label of requests that did not resolve, keeps the label set bounded
+UNMATCHED_ROUTE = 'unmatched'
+
+# Method label of requests with any other verb, clients can send arbitrary ones
+OTHER_METHOD = 'other'
+KNOWN_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+registry = CollectorRegistry()
+
+REQUESTS = Counter(
+    'steamup_http_requests_total',
+    "API requests by route, method and status code",
+    ['route', 'method', 'status'],
+    registry=registry,
+)
+REQUEST_LATENCY = Histogram(
+    'steamup_http_request_duration_seconds',
+    "API request latency by route",
+    ['route', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=registry,
+)
+DB_QUERIES = Counter(
+    'steamup_db_queries_total',
+    "Database queries run by API requests, by route",
+    ['route'],
+    registry=registry,
+)
+CACHE_READS = Counter(
+    'steamup_cache_reads_total',
+    "Cache key reads by result (hit or miss)",
+    ['result'],
+    registry=registry,
+)
+CACHE_HITS = CACHE_READS.labels(result='hit')
+CACHE_MISSES = CACHE_READS.labels(result='miss')
+
+
+class EmailOutboxCollector:
+    """
+    Report the email outbox depth, read from the database at scrape time.
+
+    Sent messages are left out, counting them would scan the whole table.
+    """
+    statuses = ('pending', 'failed')
+
+    def collect(self):
+        # Imported here, the cache backends load this module while models are being imported
+        from core.models import EmailOutbox
+
+        depth = GaugeMetricFamily(
+            'steamup_email_outbox_messages', "Unsent email outbox messages by status", labels=['status']
+        )
+        counts = dict(
+            EmailOutbox.objects.filter(status__in=self.statuses).values_list('status').annotate(Count('pk')).order_by()
+        )
+        for status in self.statuses:
+            depth.add_metric([status], counts.get(status, 0))
+        yield depth
+
+
+def generate_metrics():
+    """
+    Render every metric in the Prometheus text format.
+    """
+    scrape_registry = CollectorRegistry()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.MultiProcessCollector(scrape_registry)
+    else:
+        scrape_registry.register(registry)
+    scrape_registry.register(EmailOutboxCollector())
+    return generate_latest(scrape_registry)
@@ -1,48 +1,53 @@
 from django.utils import translation
+from django.utils.cache import patch_vary_headers
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 import logging
 
+from core.utils.accept_language import negotiate_language
+
 logger = logging.getLogger(__name__)
 
 class LanguageMiddleware(MiddlewareMixin):
     """
     Middleware that sets the language based on the Accept-Language header in API requests.
-    This middleware should run after Django's LocaleMiddleware but before any processing.
+    API requests do not run Django's LocaleMiddleware (see core.handlers), so
+    this is the only place their language is chosen.
     """
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Computed once per process, settings.LANGUAGES does not change at runtime
+        self.supported_languages = frozenset(code.lower() for code, _ in settings.LANGUAGES)
+
     def process_request(self, request):
         # Check if this is an API request
         if request.path.startswith('/api/'):
             # First check for an explicit language parameter
             lang_param = request.GET.get('lang')
             
-            if lang_param and lang_param in [lang[0] for lang in settings.LANGUAGES]:
+            if lang_param and lang_param in self.supported_languages:
                 # Set the language from query parameter
                 translation.activate(lang_param)
                 request.LANGUAGE_CODE = lang_param
-                logger.debug(f"Language set from query parameter: {lang_param}")
+                logger.debug("Language set from query parameter: %s", lang_param)
                 return None
                 
             # Then check the Accept-Language header
             accept_language = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
-            if accept_language:
-                # Parse the Accept-Language header to get the preferred language
-                languages = [lang.split(';')[0].strip() for lang in accept_language.split(',')]
-                # Find the first language that is supported by our application
-                for language in languages:
-                    language = language.split('-')[0]  # Remove country code if present (e.g., en-US -> en)
-                    if language in [lang[0] for lang in settings.LANGUAGES]:
-                        # Set the language for this request
-                        translation.activate(language)
-                        request.LANGUAGE_CODE = language
-                        logger.debug(f"Language set from Accept-Language header: {language}")
-                        break
+            # Pick the supported language with the highest q-value
+            language = accept_language and negotiate_language(accept_language, self.supported_languages)
+            if language:
+                # Set the language for this request
+                translation.activate(language)
+                request.LANGUAGE_CODE = language
+                logger.debug("Language set from Accept-Language header: %s", language)
             else:
-                # Default to settings.LANGUAGE_CODE if no header is present
+                # Default to settings.LANGUAGE_CODE, API requests skip LocaleMiddleware
+                # so the language of the previous request would stay active
                 lang = settings.LANGUAGE_CODE
                 translation.activate(lang)
                 request.LANGUAGE_CODE = lang
-                logger.debug(f"Language set to default: {lang}")
+                logger.debug("Language set to default: %s", lang)
                     
         return None
         
@@ -50,4 +55,7 @@ class LanguageMiddleware(MiddlewareMixin):
         # Add a header to inform which language was used
         if hasattr(request, 'LANGUAGE_CODE'):
             response['Content-Language'] = request.LANGUAGE_CODE
+        # Responses (and their ETags) differ per negotiated language
+        if request.path.startswith('/api/'):
+            patch_vary_headers(response, ('Accept-Language',))
         return response
\ No newline at end of file
@@ -0,0 +1,62 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from core.metrics import DB_QUERIES, KNOWN_METHODS, OTHER_METHOD, REQUEST_LATENCY, REQUESTS, UNMATCHED_ROUTE
+
+
+class QueryCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def get_route(request):
+    """
+    Return the URL pattern a request resolved to, e.g. 'api/auth/login/'.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    # Router URLs are regexes such as '^config/theme/$'
+    return match.route.replace('^', '').replace('$', '')
+
+
+def get_method(request):
+    """
+    Return the HTTP method of a request, or OTHER_METHOD for unknown verbs.
+    """
+    if request.method in KNOWN_METHODS:
+        return request.method
+    return OTHER_METHOD
+
+
+class MetricsMiddleware:
+    """
+    Count API requests and their queries and time them per route, see core.metrics.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        route = get_route(request)
+        method = get_method(request)
+        REQUESTS.labels(route, method, str(response.status_code)).inc()
+        REQUEST_LATENCY.labels(route, method).observe(duration)
+        if queries.count:
+            DB_QUERIES.labels(route).inc(queries.count)
+        return response
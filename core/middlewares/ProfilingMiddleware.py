@@ -0,0 +1,54 @@
+import logging
+import os
+import random
+import threading
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.middlewares.MetricsMiddleware import get_route
+from core.profiling import StackSampler, check_profiling_token, write_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Profile a PROFILING_SAMPLE_RATE share of API requests, and requests whose
+    X-Profile header holds a token from `manage.py profiling_token`.
+
+    Profiled requests are sampled by a core.profiling.StackSampler and
+    written per route to PROFILING_DIR. Leave PROFILING_ENABLED off and the
+    middleware is not loaded at all.
+    """
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def should_profile(self, request):
+        token = request.headers.get('X-Profile')
+        if token:
+            return check_profiling_token(token)
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+
+        if stacks:
+            try:
+                path = write_profile(get_route(request), stacks)
+            except OSError:
+                logger.exception("Could not write the profile of %s %s", request.method, request.path)
+            else:
+                response['X-Profile-Id'] = os.path.relpath(path, settings.PROFILING_DIR)
+        return response
@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.routers import pin_users, primary_reads, replica_reads
+
+# The auth flows (register, verify, login, password reset) read what their
+# previous request wrote before the client has a token to be pinned by
+PRIMARY_PATH_PREFIXES = ('/api/auth/',)
+
+
+def get_token_user_id(request):
+    """
+    Return the user id of a valid Bearer access token, or None.
+    """
+    prefix, _, raw_token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if prefix not in api_settings.AUTH_HEADER_TYPES or not raw_token:
+        return None
+    try:
+        return AccessToken(raw_token).get(api_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let API reads go to the read replicas, see core.routers.
+
+    Users whose request wrote something read from the primary for the
+    next REPLICA_PIN_SECONDS, so they see their own changes. Requests to
+    PRIMARY_PATH_PREFIXES always read from the primary.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        user_id = get_token_user_id(request)
+        with replica_reads(user_id) as routing:
+            if request.path.startswith(PRIMARY_PATH_PREFIXES):
+                with primary_reads():
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+
+        if routing.wrote and request.method not in SAFE_METHODS:
+            pin_users(routing.user_ids | {user_id} - {None})
+        return response
@@ -0,0 +1,59 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.timing import record, start_timings, stop_timings
+
+logger = logging.getLogger(__name__)
+
+
+def time_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record('db', time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """
+    Report where the time of a sampled API request went.
+
+    A SERVER_TIMING_SAMPLE_RATE share of requests records DB time and query
+    count, cache hits and misses, serializer, password hashing and email
+    enqueue time (see core.timing). They are sent in a Server-Timing header
+    and logged. Other requests only pay for the random draw.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        token = start_timings()
+        try:
+            start = time.perf_counter()
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(time_query))
+                response = self.get_response(request)
+            record('total', time.perf_counter() - start)
+        finally:
+            timings = stop_timings(token)
+
+        response['Server-Timing'] = timings.server_timing()
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            ' '.join(f'{key}={value}' for key, value in timings.as_dict().items()),
+            extra={'timings': timings.as_dict()},
+        )
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appconfig',
+            name='translations_cache',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_translations_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Content Hash')),
+                ('applied_at', models.DateTimeField(auto_now=True, verbose_name='Applied At')),
+            ],
+        ),
+    ]
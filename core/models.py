@@ -1,8 +1,11 @@
 # Step 1: Transitional model with both original and translated fields
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from parler.models import TranslatableModel, TranslatedFields
 
+from core.managers import TranslatedManager
+
 
 class AppConfig(TranslatableModel):
     # Keep the original field temporarily during migration
@@ -13,6 +16,10 @@ class AppConfig(TranslatableModel):
     translations = TranslatedFields(
         value_translated=models.CharField(_('Value'), max_length=255)
     )
+    # All translations as {language: {field: value}}, kept in sync by core.translations
+    translations_cache = models.JSONField(null=True, blank=True, editable=False)
+
+    objects = TranslatedManager()
 
     def __str__(self):
         translated_value = self.safe_translation_getter('value_translated', any_language=True)
@@ -29,4 +36,44 @@ class Image(models.Model):
     def get_image_url(self):
         if self.image:
             return self.image.url
-        return None
\ No newline at end of file
+        return None
+
+
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+    ]
+
+    subject = models.CharField(_('Subject'), max_length=255)
+    body = models.TextField(_('Body'))
+    from_email = models.CharField(_('From'), max_length=254, blank=True)
+    recipient = models.EmailField(_('Recipient'))
+    status = models.CharField(_('Status'), max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(_('Attempts'), default=0)
+    last_error = models.TextField(_('Last Error'), blank=True)
+    next_attempt_at = models.DateTimeField(_('Next Attempt At'), default=timezone.now)
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+    sent_at = models.DateTimeField(_('Sent At'), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} to {self.recipient} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='emailoutbox_due_idx'),
+        ]
+
+
+class SeedState(models.Model):
+    """
+    Content hash of the last seed spec applied by `manage.py seed`.
+    """
+    name = models.CharField(_('Name'), max_length=100, unique=True)
+    content_hash = models.CharField(_('Content Hash'), max_length=64)
+    applied_at = models.DateTimeField(_('Applied At'), auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.content_hash[:12]})"
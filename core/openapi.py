@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+logger = logging.getLogger(__name__)
+
+# Artifact format -> renderer used to write it
+SCHEMA_RENDERERS = {
+    'yaml': OpenApiYamlRenderer,
+    'json': OpenApiJsonRenderer,
+}
+
+
+def get_schema_path(language, format):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f"schema.{language}.{format}")
+
+
+def build_schema_artifacts(languages=None):
+    """
+    Generate the OpenAPI schema once per language and write it in every format.
+
+    Yields:
+        A tuple of (language, seconds spent generating and writing it)
+    """
+    os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+    generator_class = spectacular_settings.DEFAULT_GENERATOR_CLASS
+
+    for language in languages or [code for code, _ in settings.LANGUAGES]:
+        start = time.perf_counter()
+        with translation.override(language):
+            schema = generator_class().get_schema(request=None, public=True)
+            for format, renderer_class in SCHEMA_RENDERERS.items():
+                content = renderer_class().render(schema, renderer_context={})
+                with open(get_schema_path(language, format), 'wb') as f:
+                    f.write(content)
+        yield language, time.perf_counter() - start
+
+
+# Artifacts read so far, by (language, format)
+_artifacts = {}
+
+
+def load_schema_artifact(language, format):
+    """
+    Read a prebuilt schema into memory, once per process.
+
+    Only languages of settings.LANGUAGES are looked up, so the memory used
+    stays bounded whatever clients ask for. Missing artifacts are not
+    remembered, so one built after the worker started is picked up.
+
+    Returns:
+        A tuple of (content, etag), or None if the artifact was not built
+    """
+    if language not in dict(settings.LANGUAGES) or format not in SCHEMA_RENDERERS:
+        return None
+
+    key = (language, format)
+    if key not in _artifacts:
+        try:
+            with open(get_schema_path(language, format), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        _artifacts[key] = content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    return _artifacts[key]
+
+
+def clear_schema_artifacts():
+    """
+    Forget the artifacts read so far, e.g. after rebuilding them.
+    """
+    _artifacts.clear()
+
+
+class PrecomputedSchemaView(SpectacularAPIView):
+    """
+    Serve the schema written by `manage.py build_openapi_schema` with an ETag.
+
+    Generating the schema introspects every view and serializer, so it is
+    only done live in DEBUG, where the code changes between requests.
+    """
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+
+        format = 'json' if request.accepted_renderer.format == 'json' else 'yaml'
+        language = request.GET.get('lang')
+        if language not in dict(settings.LANGUAGES):
+            language = translation.get_language() or settings.LANGUAGE_CODE
+        artifact = load_schema_artifact(language, format) or load_schema_artifact(settings.LANGUAGE_CODE, format)
+        if artifact is None:
+            logger.error("OpenAPI schema has not been built, run `manage.py build_openapi_schema`")
+            return HttpResponse("Schema is not available.", status=503, content_type='text/plain')
+
+        content, etag = artifact
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=request.accepted_renderer.media_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,219 @@
+"""
+Sampling profiler for live API requests, see ProfilingMiddleware.
+
+Profiles are written in the collapsed stack format ("frame;frame;frame count"
+per line) that flamegraph.pl, speedscope and inferno read, one file per
+request in a directory per route.
+"""
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+PROFILE_SUFFIX = '.folded'
+# Directory of `manage.py merge_profiles` output, ignored by the rotation
+MERGED_DIR = 'merged'
+
+_signer = signing.TimestampSigner(salt='core.profiling')
+
+
+def make_profiling_token(user):
+    """
+    Sign a value for the X-Profile header that profiles the requests carrying it.
+    """
+    return _signer.sign(str(user.pk))
+
+
+def check_profiling_token(value):
+    """
+    Check an X-Profile header value, it is valid for PROFILING_TOKEN_MAX_AGE seconds
+    and only while the user it was issued to is still active staff.
+    """
+    try:
+        user_id = _signer.unsign(value, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return get_user_model().objects.filter(pk=user_id, is_staff=True, is_active=True).exists()
+
+
+def frame_name(frame):
+    code = frame.f_code
+    # co_qualname is only there from Python 3.11
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Count the stacks of a thread, sampled from a background thread every `interval` seconds.
+
+    Unlike cProfile, the profiled code runs at full speed between samples
+    and the result keeps whole stacks, which is what a flame graph needs.
+
+    Usage:
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        ...
+        stacks = sampler.stop()
+    """
+    def __init__(self, thread_id, interval=None):
+        self.thread_id = thread_id
+        self.interval = interval or settings.PROFILING_INTERVAL
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling.
+
+        Returns:
+            A Counter of collapsed stack -> number of samples
+        """
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+
+def get_route_dir(route):
+    """
+    Return the directory of a route's profiles, e.g. 'api_auth_login' for 'api/auth/login/'.
+    """
+    name = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+    return os.path.join(settings.PROFILING_DIR, name)
+
+
+def write_profile(route, stacks):
+    """
+    Write the stacks of one request and rotate the profiles.
+
+    Returns:
+        The path of the profile
+    """
+    directory = get_route_dir(route)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.time_ns()}-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}")
+    # Written next to it and renamed, so merge_profiles never reads a partial file
+    with open(path + '.tmp', 'w') as f:
+        f.write(f"# route: {route}\n")
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(path + '.tmp', path)
+    rotate_profiles()
+    return path
+
+
+def list_profiles():
+    """
+    Return the paths of the written profiles by route directory, oldest first.
+    """
+    profiles = {}
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return profiles
+    for entry in os.scandir(settings.PROFILING_DIR):
+        if not entry.is_dir() or entry.name == MERGED_DIR:
+            continue
+        # File names start with the time they were written at
+        profiles[entry.name] = sorted(
+            os.path.join(entry.path, name) for name in os.listdir(entry.path) if name.endswith(PROFILE_SUFFIX)
+        )
+    return profiles
+
+
+def rotate_profiles():
+    """
+    Delete the oldest profiles over PROFILING_MAX_FILES_PER_ROUTE per route and over PROFILING_MAX_BYTES in total.
+    """
+    kept = []
+    for paths in list_profiles().values():
+        excess = len(paths) - settings.PROFILING_MAX_FILES_PER_ROUTE
+        for path in paths[:max(excess, 0)]:
+            _remove(path)
+        kept.extend(paths[max(excess, 0):])
+
+    sizes = {}
+    for path in kept:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except FileNotFoundError:  # Rotated by another worker
+            pass
+    total = sum(sizes.values())
+    for path in sorted(sizes, key=os.path.basename):
+        if total <= settings.PROFILING_MAX_BYTES:
+            break
+        _remove(path)
+        total -= sizes[path]
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_profile(path):
+    """
+    Read a collapsed stack file.
+
+    Returns:
+        A tuple of (route, Counter of collapsed stack -> number of samples)
+    """
+    route = None
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('# route: '):
+                route = line[len('# route: '):]
+            elif line:
+                stack, _, count = line.rpartition(' ')
+                stacks[stack] += int(count)
+    return route, stacks
+
+
+def merge_profiles(directory_names=None):
+    """
+    Add up the profiles of every route.
+
+    Yields:
+        A tuple of (route directory name, route, number of profiles, Counter of stacks)
+    """
+    for name, paths in sorted(list_profiles().items()):
+        if directory_names and name not in directory_names:
+            continue
+        route = None
+        stacks = Counter()
+        merged = 0
+        for path in paths:
+            try:
+                route, profile = read_profile(path)
+            except FileNotFoundError:  # Rotated while merging
+                continue
+            stacks.update(profile)
+            merged += 1
+        if merged:
+            yield name, route, merged, stacks
@@ -0,0 +1,129 @@
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+# Used when the shared cache is unreachable, limits are then per process
+_fallback_cache = LocMemCache('ratelimit-fallback', {})
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter stored in Django's cache.
+
+    The window is split into buckets that are counted with atomic
+    increments, so concurrent workers sharing the cache agree on the
+    limit. Nothing is read from or written to the database.
+
+    Usage:
+        limiter = RateLimiter.from_settings('login')
+        allowed, retry_after = limiter.hit(email)
+    """
+    def __init__(self, scope, limit, period, buckets=6):
+        self.scope = scope
+        self.limit = limit
+        self.period = period
+        self.buckets = buckets
+        self.bucket_size = period / buckets
+
+    @classmethod
+    def from_settings(cls, scope):
+        """
+        Build a limiter from the (limit, period) pair in settings.RATE_LIMITS.
+        """
+        limit, period = settings.RATE_LIMITS[scope]
+        return cls(scope, limit, period)
+
+    def _keys(self, identity, now):
+        current = int(now // self.bucket_size)
+        prefix = f"ratelimit:{self.scope}:{identity}"
+        return [(index, f"{prefix}:{index}") for index in range(current - self.buckets + 1, current + 1)]
+
+    def check(self, identity, now=None):
+        """
+        Tell whether a request for the identity would be allowed, without counting it.
+
+        Pair it with hit() to only count some requests, e.g. failed logins.
+
+        Returns:
+            A tuple of (allowed, retry_after) like hit()
+        """
+        try:
+            return self._check(cache, identity, now)
+        except Exception:
+            logger.warning("Rate limit cache unavailable, using the local fallback", exc_info=True)
+            return self._check(_fallback_cache, identity, now)
+
+    def hit(self, identity, now=None):
+        """
+        Count a request for the identity if it is within the limit.
+
+        Rejected requests are not counted, so retrying early does not
+        extend the wait.
+
+        Returns:
+            A tuple of (allowed, retry_after) where retry_after is the
+            number of seconds until the next request is allowed
+        """
+        try:
+            return self._hit(cache, identity, now)
+        except Exception:
+            logger.warning("Rate limit cache unavailable, using the local fallback", exc_info=True)
+            return self._hit(_fallback_cache, identity, now)
+
+    def _hit(self, backend, identity, now):
+        now = time.time() if now is None else now
+        keys = self._keys(identity, now)
+        current_key = keys[-1][1]
+
+        backend.add(current_key, 0, timeout=math.ceil(self.period + self.bucket_size))
+        current = backend.incr(current_key)
+        counts = backend.get_many([key for _, key in keys[:-1]])
+
+        total = current + sum(counts.values())
+        if total <= self.limit:
+            return True, 0
+
+        backend.decr(current_key)
+        return False, self._retry_after(keys, counts, current - 1, now)
+
+    def _check(self, backend, identity, now):
+        now = time.time() if now is None else now
+        keys = self._keys(identity, now)
+
+        counts = backend.get_many([key for _, key in keys])
+        current = counts.pop(keys[-1][1], 0)
+        if current + sum(counts.values()) < self.limit:
+            return True, 0
+        return False, self._retry_after(keys, counts, current, now)
+
+    def _retry_after(self, keys, counts, current, now):
+        # Wait until enough of the oldest hits have left the window
+        excess = sum(counts.values()) + current - self.limit + 1
+        for index, key in keys:
+            excess -= current if key == keys[-1][1] else counts.get(key, 0)
+            if excess <= 0:
+                return max(math.ceil((index + self.buckets) * self.bucket_size - now), 1)
+        return math.ceil(self.period)
+
+
+def get_client_ip(request):
+    """
+    Return the IP address of the client behind settings.NUM_PROXIES reverse proxies.
+
+    Every proxy appends the address it got the request from to
+    X-Forwarded-For, so the client is the entry added by the outermost
+    trusted proxy. Entries before it are sent by the client and ignored.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    if not settings.NUM_PROXIES:
+        return remote_addr
+    forwarded = [addr.strip() for addr in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if addr.strip()]
+    if not forwarded:
+        return remote_addr
+    return forwarded[-min(settings.NUM_PROXIES, len(forwarded))]
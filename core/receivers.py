@@ -0,0 +1,27 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.catalog import bump_catalog_version
+from core.config import bump_snapshot_stamp
+from core.models import AppConfig
+from core.translations import connect_translations_cache
+
+
+def invalidate_app_config(sender, **kwargs):
+    """
+    Invalidate cached config responses whenever a config row or translation changes.
+    """
+    # Not before the commit, or the old rows could be cached under the new
+    # version, and other workers could reload a snapshot without the change
+    transaction.on_commit(partial(bump_catalog_version, 'config'))
+    transaction.on_commit(bump_snapshot_stamp)
+
+
+# Sync translations_cache before invalidating, like the onboarding catalog
+connect_translations_cache(AppConfig)
+
+for sender in (AppConfig, AppConfig._parler_meta.root_model):
+    post_save.connect(invalidate_app_config, sender=sender)
+    post_delete.connect(invalidate_app_config, sender=sender)
@@ -0,0 +1,61 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+from .response import api_response, is_standard_response, uses_standard_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+
+# Types orjson does not know about (lazy translations, Decimal, ...)
+# are encoded the same way DRF's JSONEncoder does
+encode_default = encoders.JSONEncoder().default
+
+# Non-string keys are allowed and UTC datetimes end with 'Z', as with DRF
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed.
+    
+    UUIDs and datetimes are encoded natively, anything else goes through
+    DRF's encoder. Falls back to the stdlib renderer when orjson is not
+    available or indented output is requested.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        
+        # Keep the output a strict javascript subset, like the stdlib renderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StandardJSONRenderer(FastJSONRenderer):
+    """
+    JSON renderer that wraps response data in our standard format
+    before encoding, so every response is serialized exactly once.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        request = renderer_context.get('request')
+        response = renderer_context.get('response')
+        
+        if (
+            request is not None
+            and response is not None
+            and uses_standard_response(request.path)
+            and not is_standard_response(data)
+        ):
+            data = api_response(data=data, error=None, code=response.status_code)
+        
+        return super().render(data, accepted_media_type, renderer_context)
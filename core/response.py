@@ -21,6 +21,25 @@ def api_response(data=None, error=None, code=None):
     
     return result
 
+def is_standard_response(data):
+    """
+    Check whether the data is already in the standardized structure.
+    """
+    return isinstance(data, dict) and all(key in data for key in ['data', 'error', 'code'])
+
+def uses_standard_response(path):
+    """
+    Check whether responses for the given path are wrapped in the standardized structure.
+    
+    Authentication endpoints and the API documentation are returned as is.
+    """
+    return (
+        path.startswith('/api/')
+        and not path.startswith('/api/auth/')
+        and not path.startswith('/api/docs/')
+        and not path.startswith('/api/schema/')
+    )
+
 class APIResponse(Response):
     """
     Custom Response class that wraps the response data in our standard format.
@@ -0,0 +1,128 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+class ReadRouting:
+    """
+    Where the reads of the current request go.
+
+    Once the request writes, its remaining reads stay on the primary and
+    the users it wrote for are remembered so they can be pinned.
+    """
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.wrote = False
+        self.user_ids = set()
+
+
+def pin_cache_key(user_id):
+    return f'db:replica_pin:{user_id}'
+
+
+def is_pinned(user_id):
+    """
+    Check whether a user wrote recently and must read from the primary.
+    """
+    return user_id is not None and cache.get(pin_cache_key(user_id)) is not None
+
+
+def pin_users(user_ids):
+    """
+    Send the reads of these users to the primary for REPLICA_PIN_SECONDS.
+    """
+    cache.set_many({pin_cache_key(user_id): True for user_id in user_ids}, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """
+    Let reads in this block go to a replica, unless the user is pinned.
+
+    Yields:
+        The ReadRouting of the block
+    """
+    routing = ReadRouting(use_primary=is_pinned(user_id))
+    token = _routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads of this block to the primary, even inside replica_reads().
+
+    Use it for reads that fill long-lived caches: read from a lagging
+    replica right after an edit, stale rows would be cached under the new
+    version. Writes in the block still pin the request as usual.
+    """
+    outer = _routing.get()
+    routing = ReadRouting(use_primary=True)
+    token = _routing.set(routing)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+        if outer is not None and routing.wrote:
+            outer.use_primary = outer.wrote = True
+            outer.user_ids |= routing.user_ids
+
+
+def get_owner_id(instance):
+    """
+    Return the id of the user a model instance belongs to, if any.
+    """
+    if isinstance(instance, get_user_model()):
+        return instance.pk
+    return getattr(instance, 'user_id', None)
+
+
+class ReplicaRouter:
+    """
+    Send the reads of API requests to DATABASE_REPLICAS and everything else to the primary.
+
+    Reads go to the primary outside of replica_reads() (admin, management
+    commands, workers), inside transactions, after the request wrote, and
+    for users pinned by a recent write of their own.
+    """
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or routing.use_primary or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects are read from where the instance came from
+            return instance._state.db
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.use_primary = True
+            routing.wrote = True
+            owner_id = get_owner_id(hints.get('instance'))
+            if owner_id is not None:
+                routing.user_ids.add(owner_id)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
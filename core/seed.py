@@ -0,0 +1,245 @@
+"""
+Declarative catalog seeding from seed.yaml, see `manage.py seed`.
+
+The spec maps model labels to the rows they must contain. Applying it
+diffs every row and translation against the database and writes only
+the differences, with bulk queries in a single transaction. The hash of
+the applied spec is kept in SeedState, so an unchanged spec is skipped
+after a single query.
+
+Translations and app config values are edited in the admin, so existing
+ones are only overwritten with force. Missing ones are always created.
+
+Bulk queries send no model signals, so the translations_cache column
+and the cached catalog payloads are refreshed here instead.
+"""
+import hashlib
+import json
+from functools import partial
+
+import yaml
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+
+from core.catalog import bump_catalog_version
+from core.config import bump_snapshot_stamp
+from core.models import AppConfig, SeedState
+from core.translations import TRANSLATIONS_CACHE_FIELD, build_translations_cache, has_translations_cache
+
+# SeedState row of the catalog spec
+SEED_NAME = 'catalog'
+
+# Models whose existing values belong to the admin, the spec only adds missing rows
+ADMIN_EDITED_MODELS = (AppConfig,)
+
+
+class SeedError(Exception):
+    """
+    The seed spec does not match the models.
+    """
+
+
+class ModelChanges:
+    """
+    What applying the spec changed in one model.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.created = 0
+        self.updated = 0
+        self.translations_created = 0
+        self.translations_updated = 0
+
+    def __bool__(self):
+        return bool(self.created or self.updated or self.translations_created or self.translations_updated)
+
+    def __str__(self):
+        return (
+            f"{self.label}: {self.created} created, {self.updated} updated, "
+            f"{self.translations_created} translations created, {self.translations_updated} translations updated"
+        )
+
+
+def read_spec(path):
+    with open(path, encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def get_field_values(model, row):
+    """
+    Convert the untranslated values of a spec row to Python values of their fields.
+    """
+    values = {}
+    for name, value in row.items():
+        if name == 'translations':
+            continue
+        try:
+            values[name] = model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            raise SeedError(f"{model._meta.label} has no field '{name}'")
+        except ValidationError as e:
+            raise SeedError(f"{model._meta.label}.{name}: {'; '.join(e.messages)}")
+    return values
+
+
+def seed_model(model, key_fields, rows, force=False):
+    """
+    Create or update the rows of one model and their translations.
+
+    Args:
+        model: The model
+        key_fields: Fields identifying a row, e.g. ['title']
+        rows: Spec rows, field values plus an optional 'translations' dict of {language: {field: value}}
+        force: Also overwrite existing translations and rows of ADMIN_EDITED_MODELS
+
+    Returns:
+        A ModelChanges
+    """
+    changes = ModelChanges(model._meta.label)
+    manager = model._base_manager
+    update_rows = force or model not in ADMIN_EDITED_MODELS
+
+    def get_key(obj):
+        return tuple(getattr(obj, name) for name in key_fields)
+
+    existing = {get_key(obj): obj for obj in manager.all()}
+    translations_by_key = {}
+    to_create = []
+    created_keys = []
+    to_update = []
+    update_fields = set()
+    for row in rows:
+        values = get_field_values(model, row)
+        try:
+            key = tuple(values[name] for name in key_fields)
+        except KeyError as e:
+            raise SeedError(f"{model._meta.label} row {row} has no key field {e}")
+        if key in translations_by_key:
+            raise SeedError(f"{model._meta.label} has more than one row with key {key}")
+        translations_by_key[key] = row.get('translations') or {}
+
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(model(**values))
+            created_keys.append(key)
+            continue
+        if not update_rows:
+            continue
+        changed = [name for name, value in values.items() if getattr(obj, name) != value]
+        if changed:
+            for name in changed:
+                setattr(obj, name, values[name])
+            to_update.append(obj)
+            update_fields.update(changed)
+
+    if to_create:
+        manager.bulk_create(to_create)
+        changes.created = len(to_create)
+        # Not every backend returns the new primary keys
+        existing = {get_key(obj): obj for obj in manager.all()}
+    if to_update:
+        manager.bulk_update(to_update, sorted(update_fields))
+        changes.updated = len(to_update)
+
+    parler_meta = getattr(model, '_parler_meta', None)
+    if parler_meta is None:
+        if any(translations_by_key.values()):
+            raise SeedError(f"{model._meta.label} has no translations")
+        return changes
+
+    translation_model = parler_meta.root_model
+    translated_fields = set(parler_meta.root.get_translated_fields())
+    master_ids = [existing[key].pk for key in translations_by_key]
+    current = {
+        (translation.master_id, translation.language_code): translation
+        for translation in translation_model._base_manager.filter(master_id__in=master_ids)
+    }
+    # Created rows need their translations_cache filled in, even without translations
+    touched = {existing[key].pk for key in created_keys}
+    new_translations = []
+    changed_translations = []
+    changed_fields = set()
+    for key, translations in translations_by_key.items():
+        master_id = existing[key].pk
+        for language, values in translations.items():
+            unknown = set(values) - translated_fields
+            if unknown:
+                raise SeedError(f"{model._meta.label} has no translated field {', '.join(sorted(unknown))}")
+
+            translation = current.get((master_id, language))
+            if translation is None:
+                new_translations.append(translation_model(master_id=master_id, language_code=language, **values))
+                touched.add(master_id)
+                continue
+            if not force:
+                continue
+            changed = [name for name, value in values.items() if getattr(translation, name) != value]
+            if changed:
+                for name in changed:
+                    setattr(translation, name, values[name])
+                changed_translations.append(translation)
+                changed_fields.update(changed)
+                touched.add(master_id)
+
+    if new_translations:
+        translation_model._base_manager.bulk_create(new_translations)
+        changes.translations_created = len(new_translations)
+    if changed_translations:
+        translation_model._base_manager.bulk_update(changed_translations, sorted(changed_fields))
+        changes.translations_updated = len(changed_translations)
+
+    if touched and has_translations_cache(model):
+        caches = build_translations_cache(model, list(touched))
+        manager.bulk_update(
+            [model(pk=pk, **{TRANSLATIONS_CACHE_FIELD: caches[pk]}) for pk in touched], [TRANSLATIONS_CACHE_FIELD]
+        )
+    return changes
+
+
+def seed(spec, force=False, dry_run=False):
+    """
+    Apply a seed spec to the database in one transaction.
+
+    Args:
+        spec: The parsed spec, {model label: {'key': [...], 'catalog': ..., 'rows': [...]}}
+        force: Diff the database even if this spec was applied already, and overwrite
+            translations and app config values edited in the admin
+        dry_run: Roll back the changes instead of committing them
+
+    Returns:
+        A list of ModelChanges per model, or None if the spec was applied already
+    """
+    content_hash = get_spec_hash(spec)
+    with transaction.atomic():
+        # Locked, so concurrent deploys apply the spec once
+        state, _ = SeedState.objects.select_for_update().get_or_create(name=SEED_NAME, defaults={'content_hash': ''})
+        if state.content_hash == content_hash and not force:
+            return None
+
+        results = []
+        for label, model_spec in spec.items():
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as e:
+                raise SeedError(str(e))
+            if not model_spec.get('key'):
+                raise SeedError(f"{label} has no key fields")
+
+            changes = seed_model(model, model_spec['key'], model_spec.get('rows') or [], force=force)
+            results.append(changes)
+            if changes and model_spec.get('catalog'):
+                transaction.on_commit(partial(bump_catalog_version, model_spec['catalog']))
+            if changes and model is AppConfig:
+                transaction.on_commit(bump_snapshot_stamp)
+
+        if dry_run:
+            transaction.set_rollback(True)
+            return results
+        state.content_hash = content_hash
+        state.save()
+    return results
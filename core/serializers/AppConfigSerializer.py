@@ -1,9 +1,11 @@
-from parler_rest.serializers import TranslatableModelSerializer, TranslatedFieldsField
+from parler_rest.serializers import TranslatableModelSerializer
 
 from core.models import AppConfig
+from core.serializers.serializers import CachedTranslatedFieldsField
+from core.timing import TimedSerializerMixin
 
-class AppConfigSerializer(TranslatableModelSerializer):
-    translations = TranslatedFieldsField(shared_model=AppConfig)
+class AppConfigSerializer(TimedSerializerMixin, TranslatableModelSerializer):
+    translations = CachedTranslatedFieldsField(shared_model=AppConfig)
     
     class Meta:
         model = AppConfig
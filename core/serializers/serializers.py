@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError as DRFValidationError
+from parler_rest.serializers import TranslatedFieldsField
+
+from core.translations import TRANSLATIONS_CACHE_FIELD
 
 class BaseAPISerializer(serializers.Serializer):
     """
@@ -63,4 +66,27 @@ class UserSerializer(BaseModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'password']
-"""
\ No newline at end of file
+"""
+
+
+class CachedTranslatedFieldsField(TranslatedFieldsField):
+    """
+    TranslatedFieldsField that reads the denormalized translations_cache column.
+
+    Rows whose cache is not built yet fall back to parler's translation
+    rows, so the output is the same either way.
+    """
+    def get_attribute(self, instance):
+        translations = getattr(instance, TRANSLATIONS_CACHE_FIELD, None)
+        if translations is None:
+            return super().get_attribute(instance)
+        return translations
+
+    def to_representation(self, value):
+        if not isinstance(value, dict):
+            return super().to_representation(value)
+
+        languages = self.context.get('languages')
+        if languages:
+            return {language: fields for language, fields in value.items() if language in languages}
+        return value
@@ -1,3 +1,1123 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+import uuid
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from core.cache import LOCAL_INVALIDATION_TIMEOUT, bounded_timeout
+from core.catalog import get_catalog_version
+from core.checks import check_replica_pins
+from core.config import STAMP_KEY, bump_snapshot_stamp, get_config
+from core.db import get_pool_stats
+from core.handlers import PathDispatchWSGIHandler
+from core.metrics import registry as metrics_registry
+from core.middlewares.ProfilingMiddleware import ProfilingMiddleware
+from core.models import AppConfig, EmailOutbox
+from core.openapi import build_schema_artifacts, clear_schema_artifacts, get_schema_path, load_schema_artifact
+from core.parsers import FastJSONParser
+from core.profiling import list_profiles, make_profiling_token, read_profile, write_profile
+from core.ratelimit import RateLimiter
+from core.routers import ReplicaRouter, pin_cache_key, pin_users, primary_reads, replica_reads
+from core.seed import SeedError, seed
+from core.timing import start_timings, stop_timings, timed
+from core.renderers import FastJSONRenderer, StandardJSONRenderer
+from core.serializers.AppConfigSerializer import AppConfigSerializer
+from core.utils.accept_language import MAX_HEADER_LENGTH, negotiate_language, parse_accept_language
+from core.utils.email_outbox import enqueue_email, send_queued_emails
+from users.models.LearningDomain import LearningDomain
+from users.models.LearningMotivation import LearningMotivation
+from users.models.LearningPeriodTarget import LearningPeriodTarget
+from users.models.OTPCode import OTPCode
+from users.models.UserProfile import UserProfile
+from users.serializers.CustomTokenObtainPairSerializer import CustomTokenObtainPairSerializer
+from rest_framework.response import Response
+
+
+class CatalogETagTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.config_theme_url = reverse('config-theme')
+        AppConfig.objects.create(key='primary_color', value='#12D18E')
+        bump_snapshot_stamp()
+    
+    def test_matching_etag_returns_not_modified(self):
+        """Test a matching If-None-Match is answered with 304 without queries"""
+        response = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Accept-Language', response['Vary'])
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.config_theme_url,
+                HTTP_ACCEPT_LANGUAGE='en',
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Content-Language'], 'en')
+    
+    def test_etag_varies_by_language_and_version(self):
+        """Test the ETag changes with the language and after config edits"""
+        english = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='en')['ETag']
+        russian = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='ru')['ETag']
+        self.assertNotEqual(english, russian)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            AppConfig.objects.create(key='platform_name', value='SteamUp')
+        response = self.client.get(
+            self.config_theme_url,
+            HTTP_ACCEPT_LANGUAGE='en',
+            HTTP_IF_NONE_MATCH=english
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], english)
+    
+    @override_settings(APP_CONFIG_SNAPSHOT_INTERVAL=60)
+    def test_etag_follows_served_snapshot(self):
+        """Test a worker whose snapshot is not reloaded yet keeps tagging the body it serves"""
+        response = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='en')
+        etag = response['ETag']
+        
+        # Bumped by another worker, this one reloads after the interval
+        AppConfig.objects.filter(key='primary_color').update(value='#000000')
+        cache.set(STAMP_KEY, uuid.uuid4().hex)
+        response = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['data']['primary_color'], '#12D18E')
+        
+        with override_settings(APP_CONFIG_SNAPSHOT_INTERVAL=0):
+            response = self.client.get(self.config_theme_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['data']['primary_color'], '#000000')
+
+
+class StandardJSONRendererTestCase(SimpleTestCase):
+    def render(self, path, data, code=200):
+        context = {
+            'request': RequestFactory().get(path),
+            'response': Response(status=code),
+        }
+        return json.loads(StandardJSONRenderer().render(data, renderer_context=context))
+    
+    def test_wraps_api_data(self):
+        """Test API payloads are wrapped in the standard format while rendering"""
+        rendered = self.render('/api/onboarding/options/', {'motivations': []}, code=201)
+        self.assertEqual(rendered, {'data': {'motivations': []}, 'error': None, 'code': 201})
+    
+    def test_leaves_wrapped_and_excluded_responses(self):
+        """Test standard responses and auth endpoints are not wrapped again"""
+        wrapped = {'data': None, 'error': 'Invalid', 'code': 400}
+        self.assertEqual(self.render('/api/profile/', wrapped, code=400), wrapped)
+        self.assertEqual(self.render('/api/auth/login/', {'access': 'token'}), {'access': 'token'})
+
+
+class FastJSONCodecTestCase(SimpleTestCase):
+    def test_renders_like_stdlib_renderer(self):
+        """Test UUIDs, datetimes and lazy translations are encoded like DRF does"""
+        data = {'id': uuid.uuid4(), 'created_at': timezone.now(), 'name': _('English'), 'items': (1, 2)}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_parses_json_body(self):
+        """Test request bodies are decoded and invalid JSON raises a parse error"""
+        parsed = FastJSONParser().parse(io.BytesIO('{"email": "тест@example.com"}'.encode()))
+        self.assertEqual(parsed, {'email': 'тест@example.com'})
+        
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"email": '))
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("Mail server unavailable")
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("Connection refused")
+
+
+class EmailOutboxTestCase(TestCase):
+    def test_worker_sends_queued_emails(self):
+        """Test queued emails are delivered by the worker and marked as sent"""
+        enqueue_email('Subject', 'Body', 'user@example.com', from_email='noreply@example.com')
+        self.assertEqual(len(mail.outbox), 0)
+        
+        call_command('send_queued_emails', '--once', stdout=io.StringIO())
+        
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        message = EmailOutbox.objects.get()
+        self.assertEqual(message.status, 'sent')
+        self.assertIsNotNone(message.sent_at)
+        self.assertEqual(mail.outbox[0].body, 'Body')
+        self.assertEqual(message.body, '')
+    
+    @override_settings(EMAIL_OUTBOX_RETENTION_DAYS=7)
+    def test_worker_prunes_old_messages(self):
+        """Test sent and failed messages are deleted after the retention period, pending ones are kept"""
+        for status in ('sent', 'failed', 'pending'):
+            EmailOutbox.objects.create(subject='Old', body='', recipient='old@example.com', status=status)
+        EmailOutbox.objects.update(created_at=timezone.now() - timedelta(days=8), next_attempt_at=timezone.now() + timedelta(hours=1))
+        EmailOutbox.objects.create(subject='Recent', body='', recipient='new@example.com', status='sent')
+        
+        out = io.StringIO()
+        call_command('send_queued_emails', '--once', stdout=out)
+        self.assertIn('Pruned 2 old messages', out.getvalue())
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('subject', 'status')), [('Old', 'pending'), ('Recent', 'sent')]
+        )
+        
+        EmailOutbox.objects.update(created_at=timezone.now() - timedelta(days=8))
+        call_command('send_queued_emails', '--once', '--prune-interval', '0', stdout=io.StringIO())
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+    
+    @override_settings(
+        EMAIL_BACKEND='core.tests.FailingEmailBackend',
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    )
+    def test_failed_emails_are_retried_with_backoff(self):
+        """Test failed sends are rescheduled and given up after the maximum attempts"""
+        message = enqueue_email('Subject', 'Body', 'user@example.com')
+        
+        self.assertEqual(send_queued_emails(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'pending')
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertEqual(send_queued_emails(), (0, 0))  # Not due yet
+        
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+        self.assertIn('Mail server unavailable', message.last_error)
+        self.assertEqual(message.body, '')
+    
+    @override_settings(EMAIL_BACKEND='core.tests.UnreachableEmailBackend')
+    def test_unreachable_server_counts_attempts(self):
+        """Test a connection failure is recorded on every claimed message so it backs off"""
+        enqueue_email('Subject', 'Body', 'first@example.com')
+        enqueue_email('Subject', 'Body', 'second@example.com')
+        
+        self.assertEqual(send_queued_emails(), (0, 2))
+        for message in EmailOutbox.objects.all():
+            self.assertEqual(message.status, 'pending')
+            self.assertEqual(message.attempts, 1)
+            self.assertIn('Connection refused', message.last_error)
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = RateLimiter('test', limit=2, period=60)
+    
+    def test_limits_requests_within_window(self):
+        """Test requests over the limit are rejected until old hits leave the window"""
+        self.assertEqual(self.limiter.hit('user', now=1000), (True, 0))
+        self.assertEqual(self.limiter.hit('user', now=1030), (True, 0))
+        
+        allowed, retry_after = self.limiter.hit('user', now=1040)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 20)  # The first hit leaves the window at 1060
+        
+        self.assertTrue(self.limiter.hit('other', now=1040)[0])
+        self.assertFalse(self.limiter.hit('user', now=1059)[0])
+        self.assertTrue(self.limiter.hit('user', now=1060)[0])
+    
+    def test_rejected_requests_are_not_counted(self):
+        """Test hammering the limiter does not extend the wait"""
+        self.limiter.hit('user', now=1000)
+        self.limiter.hit('user', now=1000)
+        for _ in range(10):
+            self.assertFalse(self.limiter.hit('user', now=1050)[0])
+        self.assertTrue(self.limiter.hit('user', now=1060)[0])
+    
+    def test_check_does_not_count(self):
+        """Test checking a limit leaves the count alone and agrees with hit()"""
+        for _ in range(5):
+            self.assertEqual(self.limiter.check('user', now=1000), (True, 0))
+        self.limiter.hit('user', now=1000)
+        self.limiter.hit('user', now=1030)
+        self.assertEqual(self.limiter.check('user', now=1040), (False, 20))
+        self.assertEqual(self.limiter.check('user', now=1060), (True, 0))
+    
+    def test_falls_back_to_local_cache(self):
+        """Test limits still apply when the shared cache is unavailable"""
+        with mock.patch('core.ratelimit.cache.incr', side_effect=ConnectionError), \
+                self.assertLogs('core.ratelimit', 'WARNING'):
+            self.assertTrue(self.limiter.hit('fallback', now=1000)[0])
+            self.assertTrue(self.limiter.hit('fallback', now=1000)[0])
+            self.assertFalse(self.limiter.hit('fallback', now=1000)[0])
+
+
+class TranslationsCacheTestCase(TestCase):
+    def setUp(self):
+        self.config = AppConfig(key='platform_name', value='SteamUp')
+        self.config.set_current_language('en')
+        self.config.value_translated = 'SteamUp'
+        self.config.set_current_language('ru')
+        self.config.value_translated = 'СтимАп'
+        self.config.save()
+    
+    def get_cache(self):
+        return AppConfig.objects.values_list('translations_cache', flat=True).get(pk=self.config.pk)
+    
+    def test_cache_follows_translation_writes(self):
+        """Test saving and deleting translations keeps the column in sync"""
+        expected = {'en': {'value_translated': 'SteamUp'}, 'ru': {'value_translated': 'СтимАп'}}
+        self.assertEqual(self.get_cache(), expected)
+        self.assertEqual(self.config.translations_cache, expected)
+        
+        self.config.set_current_language('en')
+        self.config.value_translated = 'SteamUp Platform'
+        self.config.save()
+        self.assertEqual(self.get_cache()['en'], {'value_translated': 'SteamUp Platform'})
+        
+        self.config.delete_translation('ru')
+        self.assertEqual(self.get_cache(), {'en': {'value_translated': 'SteamUp Platform'}})
+        
+        # Saving a row loaded before the change must not restore the old value
+        AppConfig.objects.get(pk=self.config.pk).save()
+        self.assertEqual(self.get_cache(), {'en': {'value_translated': 'SteamUp Platform'}})
+    
+    def test_serializer_reads_cache_from_one_query(self):
+        """Test serializers give the same output from the cache, without translation queries"""
+        AppConfig.objects.update(translations_cache=None)
+        expected = AppConfigSerializer(AppConfig.objects.with_translations(), many=True).data
+        
+        call_command('rebuild_translations_cache', 'core.AppConfig', stdout=io.StringIO())
+        self.assertIsNotNone(self.get_cache())
+        with self.assertNumQueries(1):
+            data = AppConfigSerializer(AppConfig.objects.with_translations(), many=True).data
+        self.assertEqual(json.loads(json.dumps(data)), json.loads(json.dumps(expected)))
+        
+        data = AppConfigSerializer(self.config, context={'languages': ['ru']}).data
+        self.assertEqual(list(data['translations']), ['ru'])
+    
+    def test_rebuild_command_fills_every_model(self):
+        """Test the command rebuilds rows written without signals"""
+        AppConfig.objects.bulk_create([AppConfig(key=f'key_{i}', value=str(i)) for i in range(5)])
+        out = io.StringIO()
+        call_command('rebuild_translations_cache', batch_size=2, stdout=out)
+        
+        self.assertFalse(AppConfig.objects.filter(translations_cache__isnull=True).exists())
+        self.assertEqual(AppConfig.objects.get(key='key_0').translations_cache, {})
+        self.assertIn('core.AppConfig: rebuilt 6 rows', out.getvalue())
+        self.assertIn('users.LearningDomain', out.getvalue())
+
+
+class AcceptLanguageTestCase(SimpleTestCase):
+    supported = frozenset({'en', 'uz', 'ru'})
+    
+    def test_negotiation_respects_q_values(self):
+        """Test the highest weighted supported range wins, not the first one"""
+        self.assertEqual(negotiate_language('en;q=0.5, ru;q=0.9', self.supported), 'ru')
+        self.assertEqual(negotiate_language('de-DE,de;q=0.9,uz;q=0.8,en;q=0.7', self.supported), 'uz')
+        self.assertEqual(negotiate_language('ru, en', self.supported), 'ru')
+        self.assertEqual(negotiate_language('ru;q=0, en;q=0.1', self.supported), 'en')
+    
+    def test_negotiation_uses_rfc4647_lookup(self):
+        """Test ranges are shortened subtag by subtag until they match"""
+        self.assertEqual(negotiate_language('RU-ru', self.supported), 'ru')
+        self.assertEqual(negotiate_language('uz-Latn-UZ', self.supported), 'uz')
+        self.assertEqual(negotiate_language('en-a-bbb-x-ccc', self.supported), 'en')
+        self.assertIsNone(negotiate_language('de-DE, *;q=0.5', self.supported))
+        self.assertIsNone(negotiate_language('ru;q=abc, uz;q=0', self.supported))
+    
+    def test_q_value_is_found_among_parameters(self):
+        """Test other parameters neither drop a range nor hide its q-value"""
+        self.assertEqual(negotiate_language('en;level=1;q=0.5, ru;q=0.6', self.supported), 'ru')
+        self.assertEqual(negotiate_language('en;level=1;q=0.7, ru;q=0.6', self.supported), 'en')
+        self.assertEqual(negotiate_language('en;level=1', self.supported), 'en')
+    
+    def test_long_headers_are_cut(self):
+        """Test headers over MAX_HEADER_LENGTH are cut, even without a comma to cut at"""
+        self.assertEqual(parse_accept_language('ru;q=0.5, ' + 'x' * 10000), ['ru'])
+        ranges = parse_accept_language('x' * 10000)
+        self.assertEqual([len(language_range) for language_range in ranges], [MAX_HEADER_LENGTH])
+    
+    def test_negotiation_is_memoized(self):
+        """Test the same header is parsed once"""
+        negotiate_language.cache_clear()
+        for _ in range(3):
+            negotiate_language('ru-RU,ru;q=0.9', self.supported)
+        self.assertEqual(negotiate_language.cache_info().hits, 2)
+    
+    def test_middleware_activates_negotiated_language(self):
+        """Test API responses use the negotiated language"""
+        response = self.client.get('/api/unknown/', HTTP_ACCEPT_LANGUAGE='en;q=0.3, ru-RU;q=0.8')
+        self.assertEqual(response['Content-Language'], 'ru')
+
+
+class AppConfigSnapshotTestCase(TestCase):
+    def setUp(self):
+        bump_snapshot_stamp()
+        self.config = AppConfig(key='platform_name', value='SteamUp')
+        self.config.set_current_language('en')
+        self.config.value_translated = 'SteamUp'
+        self.config.set_current_language('ru')
+        self.config.value_translated = 'СтимАп'
+        self.config.save()
+        AppConfig.objects.create(key='primary_color', value='#12D18E')
+    
+    def test_lookups_are_served_from_memory(self):
+        """Test the snapshot is loaded in one query and then read without queries"""
+        with self.assertNumQueries(1):
+            self.assertEqual(get_config('platform_name', 'ru'), 'СтимАп')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_config('platform_name', 'en'), 'SteamUp')
+            # Missing translations fall back to English, then to the plain value
+            self.assertEqual(get_config('platform_name', 'uz'), 'SteamUp')
+            self.assertEqual(get_config('primary_color', 'ru'), '#12D18E')
+            self.assertEqual(get_config('missing', 'en', default='x'), 'x')
+    
+    def test_saving_a_row_refreshes_the_snapshot(self):
+        """Test admin saves are picked up once committed"""
+        get_config('platform_name', 'ru')
+        
+        self.config.set_current_language('ru')
+        self.config.value_translated = 'СтимАп Платформа'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.save()
+        self.assertEqual(get_config('platform_name', 'ru'), 'СтимАп Платформа')
+    
+    @override_settings(APP_CONFIG_SNAPSHOT_INTERVAL=0)
+    def test_other_workers_reload_on_a_new_stamp(self):
+        """Test a stamp bumped elsewhere makes the snapshot reload"""
+        get_config('platform_name', 'ru')
+        with self.assertNumQueries(0):
+            get_config('platform_name', 'ru')
+        
+        # Another worker changed a row and bumped the shared stamp
+        AppConfig.objects.filter(key='primary_color').update(value='#000000')
+        cache.set(STAMP_KEY, 'another-worker')
+        with self.assertNumQueries(1):
+            self.assertEqual(get_config('primary_color'), '#000000')
+    
+    @override_settings(APP_CONFIG_SNAPSHOT_INTERVAL=0)
+    def test_local_cache_stamps_expire(self):
+        """Test with a per-process cache, workers that missed a bump catch up once stamps expire"""
+        get_config('primary_color')
+        catalog_version = get_catalog_version('onboarding')
+        
+        # Changed by another worker, which bumped only its own cache
+        AppConfig.objects.filter(key='primary_color').update(value='#000000')
+        self.assertEqual(get_config('primary_color'), '#12D18E')
+        
+        later = time.time() + LOCAL_INVALIDATION_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(get_config('primary_color'), '#000000')
+            self.assertNotEqual(get_catalog_version('onboarding'), catalog_version)
+        
+        with mock.patch('core.cache.is_shared_cache', return_value=True):
+            self.assertIsNone(bounded_timeout(caches['default']))
+            self.assertEqual(bounded_timeout(caches['default'], 60), 60)
+        self.assertEqual(bounded_timeout(caches['default'], 3600), LOCAL_INVALIDATION_TIMEOUT)
+
+
+class PrecomputedSchemaTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema_dir = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(DEBUG=False, OPENAPI_SCHEMA_DIR=cls.schema_dir.name))
+        list(build_schema_artifacts(['en', 'ru']))
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.schema_dir.cleanup()
+    
+    def setUp(self):
+        clear_schema_artifacts()
+        self.addCleanup(clear_schema_artifacts)
+    
+    def test_artifact_is_served_with_etag(self):
+        """Test the prebuilt artifact is served as is and revalidates with 304"""
+        response = self.client.get('/api/schema/?format=json&lang=ru')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with open(get_schema_path('ru', 'json'), 'rb') as f:
+            self.assertEqual(response.content, f.read())
+        
+        response = self.client.get('/api/schema/?format=json&lang=ru', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_unbuilt_language_falls_back_to_default(self):
+        """Test a language without an artifact gets the default language schema"""
+        response = self.client.get('/api/schema/?lang=uz')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], load_schema_artifact('en', 'yaml')[1])
+    
+    def test_unknown_language_is_not_looked_up(self):
+        """Test arbitrary lang values fall back to a known language without reading any file"""
+        with mock.patch('core.openapi.get_schema_path', wraps=get_schema_path) as get_path:
+            for lang in ('xx', 'en.json/..', '../../etc/passwd'):
+                response = self.client.get('/api/schema/', {'lang': lang, 'format': 'json'}, HTTP_ACCEPT_LANGUAGE='ru')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response['ETag'], load_schema_artifact('ru', 'json')[1])
+        self.assertEqual({call.args for call in get_path.call_args_list}, {('ru', 'json')})
+    
+    def test_missing_artifact_is_read_once_built(self):
+        """Test a worker started before the build picks the artifact up"""
+        with tempfile.TemporaryDirectory() as schema_dir, override_settings(OPENAPI_SCHEMA_DIR=schema_dir):
+            self.assertIsNone(load_schema_artifact('en', 'json'))
+            list(build_schema_artifacts(['en']))
+            self.assertIsNotNone(load_schema_artifact('en', 'json'))
+    
+    def test_missing_artifact_returns_503(self):
+        """Test the schema endpoint reports an unbuilt schema instead of generating it"""
+        with tempfile.TemporaryDirectory() as empty_dir, override_settings(OPENAPI_SCHEMA_DIR=empty_dir):
+            with self.assertLogs('core.openapi', 'ERROR'):
+                response = self.client.get('/api/schema/')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class PathDispatchHandlerTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.handler = PathDispatchWSGIHandler()
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def test_api_requests_skip_admin_middleware(self):
+        """Test /api/ requests run API_MIDDLEWARE only"""
+        request = self.factory.get('/api/config/theme/', HTTP_ACCEPT_LANGUAGE='ru')
+        response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Language'], 'ru')
+        self.assertIn('data', json.loads(response.content))
+        self.assertFalse(hasattr(request, 'session'))
+        self.assertFalse(response.has_header('X-Frame-Options'))
+    
+    def test_admin_requests_run_full_middleware(self):
+        """Test the admin still gets sessions, CSRF and clickjacking protection"""
+        request = self.factory.get('/admin/login/')
+        response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(hasattr(request, 'session'))
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+    
+    def test_unsupported_language_resets_to_default(self):
+        """Test the previous request's language does not leak without LocaleMiddleware"""
+        self.handler.get_response(self.factory.get('/api/config/theme/', HTTP_ACCEPT_LANGUAGE='ru'))
+        response = self.handler.get_response(self.factory.get('/api/config/theme/', HTTP_ACCEPT_LANGUAGE='de'))
+        self.assertEqual(response['Content-Language'], 'en')
+
+
+class APIMiddlewareChainTestCase(TestCase):
+    """
+    API flows through the handler production serves, with the API_MIDDLEWARE chain.
+    
+    The test client runs the full MIDDLEWARE chain instead, so the other
+    API tests do not cover the instrumentation and routing middleware.
+    """
+    def setUp(self):
+        cache.clear()
+        profiling_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profiling_dir.cleanup)
+        settings_override = override_settings(
+            SERVER_TIMING_SAMPLE_RATE=1.0, PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0,
+            PROFILING_INTERVAL=0.001, PROFILING_DIR=profiling_dir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.handler = PathDispatchWSGIHandler()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123', is_verified=True, is_staff=True
+        )
+    
+    def post(self, path, data, **extra):
+        request = self.factory.post(path, data=json.dumps(data), content_type='application/json', **extra)
+        return self.handler.get_response(request)
+    
+    def test_login_runs_every_api_middleware(self):
+        """Test a login is measured, timed, profiled and enveloped"""
+        labels = {'route': 'api/auth/login/', 'method': 'POST', 'status': '200'}
+        requests = metrics_registry.get_sample_value('steamup_http_requests_total', labels) or 0
+        
+        response = self.post(
+            '/api/auth/login/', {'email': 'test@example.com', 'password': 'testpassword123'},
+            HTTP_X_PROFILE=make_profiling_token(self.user), HTTP_ACCEPT_LANGUAGE='ru',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', json.loads(response.content)['data'])
+        self.assertEqual(response['Content-Language'], 'ru')
+        self.assertIn('password_hash', response['Server-Timing'])
+        self.assertTrue(response['X-Profile-Id'].startswith('api_auth_login'))
+        self.assertEqual(metrics_registry.get_sample_value('steamup_http_requests_total', labels), requests + 1)
+    
+    @override_settings(DATABASE_REPLICAS=[DEFAULT_DB_ALIAS])
+    def test_profile_write_pins_the_user(self):
+        """Test ReplicaRoutingMiddleware pins a user whose request wrote"""
+        UserProfile.objects.create(user=self.user, full_name='John Doe', age=25)
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        request = self.factory.patch(
+            '/api/profile/me/', data=json.dumps({'full_name': 'Jane Doe', 'age': 30}),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['data']['full_name'], 'Jane Doe')
+        self.assertIsNotNone(cache.get(pin_cache_key(str(self.user.pk))))
+    
+    def test_theme_revalidates_with_etag(self):
+        """Test conditional requests are answered by the API chain without queries"""
+        response = self.handler.get_response(self.factory.get('/api/config/theme/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        request = self.factory.get('/api/config/theme/', HTTP_IF_NONE_MATCH=response['ETag'])
+        with self.assertNumQueries(0):
+            response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_missing_trailing_slash_is_not_redirected(self):
+        """Test API paths without their trailing slash are 404s, CommonMiddleware only runs for the admin"""
+        response = self.handler.get_response(self.factory.get('/api/config/theme'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        response = self.handler.get_response(self.factory.get('/admin'))
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(response['Location'], '/admin/')
+
+
+class DatabasePoolStatsTestCase(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.url = reverse('db_pool_stats')
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword123')
+        self.user = User.objects.create_user(email='user@example.com', password='userpassword123', is_verified=True)
+    
+    def test_stats_are_admin_only(self):
+        """Test only staff can read the pool stats"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['data'], get_pool_stats())
+    
+    def test_unpooled_database_has_no_stats(self):
+        """Test databases without a pool report None"""
+        with mock.patch.dict(connection.settings_dict, {'OPTIONS': {}}):
+            self.assertIsNone(get_pool_stats())
+    
+    def test_broken_connections_are_replaced(self):
+        """Test pooled connections killed by a restart or failover are not handed out"""
+        if get_pool_stats() is None:
+            self.skipTest("The database is not pooled")
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+        with connection.pool.connection() as pooled:
+            self.assertEqual(pooled.execute("SELECT 1").fetchone(), (1,))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+    
+    def test_reads_outside_requests_use_primary(self):
+        """Test management commands, workers and the admin read from the primary"""
+        self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+    
+    def test_reads_go_to_replicas_until_the_request_writes(self):
+        """Test reads after a write in the same request stay on the primary"""
+        with replica_reads() as routing:
+            self.assertIn(self.router.db_for_read(AppConfig), ['replica1', 'replica2'])
+            self.assertEqual(self.router.db_for_write(AppConfig), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+        self.assertTrue(routing.wrote)
+    
+    def test_pinned_users_read_from_primary(self):
+        """Test a user who wrote recently reads their own writes"""
+        pin_users(['user-1'])
+        with replica_reads('user-1'):
+            self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+        with replica_reads('user-2'):
+            self.assertNotEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+    
+    def test_transactions_read_from_primary(self):
+        """Test reads inside atomic blocks see the transaction's writes"""
+        with replica_reads(), mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+    
+    def test_primary_reads_inside_requests(self):
+        """Test cache fills read from the primary and their writes still pin the request"""
+        with replica_reads() as routing:
+            with primary_reads():
+                self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+            self.assertNotEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+            
+            with primary_reads():
+                self.router.db_for_write(AppConfig)
+            self.assertTrue(routing.wrote)
+            self.assertEqual(self.router.db_for_read(AppConfig), DEFAULT_DB_ALIAS)
+    
+    def test_replicas_are_never_migrated(self):
+        """Test migrations only run on the primary"""
+        self.assertFalse(self.router.allow_migrate('replica1', 'core'))
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core'))
+    
+    def test_pins_need_a_shared_cache(self):
+        """Test the system check rejects replicas with a per-process cache"""
+        self.assertEqual([error.id for error in check_replica_pins(None)], ['core.E001'])
+        with mock.patch('core.checks.is_shared_cache', return_value=True):
+            self.assertEqual(check_replica_pins(None), [])
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(check_replica_pins(None), [])
+
+
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    Requests through the API handler with a primary and a replica that lags behind.
+    
+    The replica is a second local test database. It never receives the
+    primary's writes by itself, catch_up() copies rows like replication would.
+    """
+    # The replica alias only exists once setUpClass has added it
+    databases = '__all__'
+    replica = 'replica_lag'
+    
+    @classmethod
+    def setUpClass(cls):
+        primary = connections.settings[DEFAULT_DB_ALIAS]
+        connections.settings[cls.replica] = {
+            **primary,
+            'NAME': f"{primary['NAME']}_replica",
+            'TEST': {'CHARSET': None, 'COLLATION': None, 'MIGRATE': True, 'MIRROR': None, 'NAME': None},
+        }
+        cls.replica_name = connections.settings[cls.replica]['NAME']
+        connections[cls.replica].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cls.enterClassContext(override_settings(DATABASE_REPLICAS=[cls.replica]))
+        super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        replica = connections[cls.replica]
+        replica.close()
+        if hasattr(replica, 'close_pool'):
+            # Pooled connections would keep the test database open
+            replica.close_pool()
+        replica.creation.destroy_test_db(cls.replica_name, verbosity=0)
+        del connections[cls.replica]
+        del connections.settings[cls.replica]
+    
+    def setUp(self):
+        cache.clear()
+        bump_snapshot_stamp()
+        self.handler = PathDispatchWSGIHandler()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123', is_verified=True
+        )
+        self.profile = UserProfile.objects.create(user=self.user, full_name='John Doe', age=25)
+        self.other_user = get_user_model().objects.create_user(
+            email='other@example.com', password='testpassword123', is_verified=True
+        )
+        self.other_profile = UserProfile.objects.create(user=self.other_user, full_name='Other Doe', age=30)
+        self.catch_up()
+    
+    def catch_up(self):
+        """
+        Copy the rows the tests use from the primary to the replica.
+        
+        Flushing skips the replica, as nothing migrates it, so this also
+        drops the rows the previous test left there.
+        """
+        models = (
+            get_user_model(), UserProfile, OTPCode,
+            AppConfig, AppConfig._parler_meta.root_model,
+            LearningDomain, LearningDomain._parler_meta.root_model,
+            LearningMotivation, LearningMotivation._parler_meta.root_model,
+            LearningPeriodTarget, LearningPeriodTarget._parler_meta.root_model,
+        )
+        for model in reversed(models):
+            model._base_manager.using(self.replica).all().delete()
+        for model in models:
+            model._base_manager.using(self.replica).bulk_create(model._base_manager.using(DEFAULT_DB_ALIAS).all())
+    
+    def get_auth(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+    
+    def get(self, path, **extra):
+        response = self.handler.get_response(self.factory.get(path, **extra))
+        return response.status_code, json.loads(response.content)['data']
+    
+    def get_config_keys(self, **extra):
+        status_code, data = self.get('/api/config/', **extra)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        return {config['key'] for config in data}
+    
+    def test_reads_use_the_replica(self):
+        """Test API reads see the replica, not changes it has not caught up with"""
+        AppConfig.objects.create(key='primary_color', value='#000000')
+        self.assertEqual(self.get_config_keys(), set())
+        
+        self.catch_up()
+        self.assertEqual(self.get_config_keys(), {'primary_color'})
+    
+    def test_writes_pin_the_user_to_the_primary(self):
+        """Test a user reads from the primary for REPLICA_PIN_SECONDS while the replica lags"""
+        request = self.factory.patch(
+            '/api/profile/me/', data=json.dumps({'full_name': 'Jane Doe'}),
+            content_type='application/json', **self.get_auth(self.user)
+        )
+        self.assertEqual(self.handler.get_response(request).status_code, status.HTTP_200_OK)
+        self.assertEqual(UserProfile.objects.using(self.replica).get(pk=self.profile.pk).full_name, 'John Doe')
+        
+        AppConfig.objects.create(key='primary_color', value='#000000')
+        self.assertEqual(self.get_config_keys(**self.get_auth(self.user)), {'primary_color'})
+        
+        # Other users are not pinned
+        self.assertEqual(self.get_config_keys(**self.get_auth(self.other_user)), set())
+        
+        # Once the window has passed the user reads from the replica again
+        cache.delete(pin_cache_key(str(self.user.pk)))
+        self.assertEqual(self.get_config_keys(**self.get_auth(self.user)), set())
+    
+    def test_signup_reads_its_own_writes(self):
+        """Test register, verify and login follow each other before the replica caught up"""
+        domain = LearningDomain.objects.create(title='Physics')
+        motivation = LearningMotivation.objects.create(title='Career')
+        goal = LearningPeriodTarget.objects.create(repeat_count=1)
+        self.catch_up()
+        email = 'new@example.com'
+        
+        def post(path, data):
+            request = self.factory.post(path, data=json.dumps(data), content_type='application/json')
+            response = self.handler.get_response(request)
+            self.assertEqual(response.status_code // 100, 2, response.content)
+            return json.loads(response.content)['data']
+        
+        post('/api/auth/register/', {
+            'email': email, 'password': 'newpassword123', 'confirm_password': 'newpassword123',
+            'full_name': 'New User', 'age': 20, 'interests': [domain.pk], 'motivation': motivation.pk, 'daily_goal': goal.pk,
+        })
+        post('/api/auth/request-otp/', {'email': email, 'purpose': 'verify'})
+        code = OTPCode.objects.get(user__email=email, purpose='verify').code
+        post('/api/auth/verify-otp/', {'email': email, 'code': code, 'purpose': 'verify'})
+        data = post('/api/auth/login/', {'email': email, 'password': 'newpassword123'})
+        self.assertIn('access', data)
+        self.assertFalse(get_user_model().objects.using(self.replica).filter(email=email).exists())
+    
+    def test_cache_fills_read_the_primary(self):
+        """Test long-lived caches are never filled from the lagging replica"""
+        AppConfig.objects.create(key='primary_color', value='#000000')
+        LearningDomain.objects.language('en').create(title='Physics', name_translated='Physics')
+        get_user_model().objects.filter(pk=self.user.pk).update(token_version=1)
+        
+        status_code, data = self.get('/api/config/theme/')
+        self.assertEqual(data['primary_color'], '#000000')
+        status_code, data = self.get('/api/onboarding/options/')
+        self.assertEqual([domain['title'] for domain in data['learning_domains']], ['Physics'])
+        
+        # The replica still has the version of the revoked token
+        status_code, data = self.get('/api/profile/', **self.get_auth(get_user_model().objects.using(self.replica).get(pk=self.user.pk)))
+        self.assertEqual(status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ServerTimingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        get_user_model().objects.create_user(email='test@example.com', password='testpassword123', is_verified=True)
+    
+    def get_handler(self, sample_rate):
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=sample_rate):
+            return PathDispatchWSGIHandler()
+    
+    def test_sampled_requests_report_timings(self):
+        """Test sampled API responses carry Server-Timing and are logged"""
+        request = self.factory.post(
+            '/api/auth/login/', data=json.dumps({'email': 'test@example.com', 'password': 'testpassword123'}),
+            content_type='application/json'
+        )
+        with self.assertLogs('core.middlewares.ServerTimingMiddleware', 'INFO') as logs:
+            response = self.get_handler(1.0).get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        metrics = {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+        self.assertIn('queries"', metrics['db'])
+        self.assertIn('misses=', metrics['cache'])
+        self.assertIn('password_hash', metrics)
+        self.assertIn('total', metrics)
+        self.assertEqual(logs.records[0].timings['password_hash_count'], 1)
+        self.assertIn('POST /api/auth/login/ 200', logs.output[0])
+    
+    def test_timing_lines_reach_the_console(self):
+        """Test the LOGGING config emits the INFO timing lines"""
+        logger = logging.getLogger('core.middlewares.ServerTimingMiddleware')
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        stream = io.StringIO()
+        handler = next(handler for handler in logging.getLogger('core').handlers if handler.name == 'console')
+        with mock.patch.object(handler, 'stream', stream):
+            logger.info("GET /api/config/ 200")
+        self.assertIn('INFO core.middlewares.ServerTimingMiddleware GET /api/config/ 200', stream.getvalue())
+    
+    def test_unsampled_requests_are_not_timed(self):
+        """Test requests outside the sample have no header"""
+        response = self.get_handler(0.0).get_response(self.factory.get('/api/config/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Server-Timing'))
+    
+    def test_nested_blocks_are_counted_once(self):
+        """Test recursive code such as nested serializers is not double counted"""
+        token = start_timings()
+        with timed('serializer'):
+            with timed('serializer'):
+                cache.get_many(['a', 'b'])
+        timings = stop_timings(token)
+        self.assertEqual(timings.counts['serializer'], 1)
+        self.assertEqual(timings.counts['cache_miss'], 2)
+        self.assertEqual(timings.counts['cache_hit'], 0)
+
+
+class MetricsTestCase(TestCase):
+    def get_sample(self, name, **labels):
+        return metrics_registry.get_sample_value(name, labels) or 0
+    
+    def test_api_requests_are_measured_per_route(self):
+        """Test requests, latency and queries are recorded under the URL pattern"""
+        labels = {'route': 'api/config/', 'method': 'GET'}
+        requests = self.get_sample('steamup_http_requests_total', status='200', **labels)
+        latency = self.get_sample('steamup_http_request_duration_seconds_count', **labels)
+        queries = self.get_sample('steamup_db_queries_total', route='api/config/')
+        
+        response = PathDispatchWSGIHandler().get_response(RequestFactory().get('/api/config/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_sample('steamup_http_requests_total', status='200', **labels), requests + 1)
+        self.assertEqual(self.get_sample('steamup_http_request_duration_seconds_count', **labels), latency + 1)
+        self.assertGreater(self.get_sample('steamup_db_queries_total', route='api/config/'), queries)
+    
+    def test_unknown_methods_share_a_label(self):
+        """Test arbitrary verbs sent by clients do not create new series"""
+        labels = {'route': 'api/config/', 'method': 'other'}
+        requests = self.get_sample('steamup_http_requests_total', status='405', **labels)
+        
+        request = RequestFactory().generic('BREW', '/api/config/')
+        response = PathDispatchWSGIHandler().get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(self.get_sample('steamup_http_requests_total', status='405', **labels), requests + 1)
+        self.assertEqual(self.get_sample('steamup_http_requests_total', route='api/config/', method='BREW', status='405'), 0)
+    
+    def test_cache_reads_are_counted(self):
+        """Test hits and misses of the instrumented cache backend"""
+        hits = self.get_sample('steamup_cache_reads_total', result='hit')
+        misses = self.get_sample('steamup_cache_reads_total', result='miss')
+        cache.set('present', 1)
+        cache.get('present')
+        cache.get_many(['present', 'absent'])
+        self.assertEqual(self.get_sample('steamup_cache_reads_total', result='hit'), hits + 2)
+        self.assertEqual(self.get_sample('steamup_cache_reads_total', result='miss'), misses + 1)
+    
+    @override_settings(DEBUG=False, METRICS_TOKEN='secret')
+    def test_scrape_requires_token(self):
+        """Test /metrics needs the bearer token and reports the outbox depth"""
+        enqueue_email('Subject', 'Body', 'user@example.com')
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'steamup_email_outbox_messages{status="pending"} 1.0', response.content)
+        self.assertIn(b'# TYPE steamup_http_request_duration_seconds histogram', response.content)
+    
+    @override_settings(DEBUG=False, METRICS_TOKEN='')
+    def test_scrape_is_hidden_without_token(self):
+        """Test /metrics is not exposed in production unless a token is configured"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        profiling_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profiling_dir.cleanup)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0, PROFILING_INTERVAL=0.001, PROFILING_DIR=profiling_dir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.admin = get_user_model().objects.create_superuser(email='admin@example.com', password='adminpassword123')
+        self.factory = RequestFactory()
+    
+    def slow_view(self, request):
+        request.resolver_match = resolve('/api/config/')
+        time.sleep(0.05)
+        return Response()
+    
+    def test_signed_header_profiles_request(self):
+        """Test a request with a valid X-Profile token is written to its route's directory"""
+        request = self.factory.get('/api/config/', HTTP_X_PROFILE=make_profiling_token(self.admin))
+        response = ProfilingMiddleware(self.slow_view)(request)
+        
+        self.assertEqual(response['X-Profile-Id'].split(os.sep)[0], 'api_config')
+        route, stacks = read_profile(os.path.join(settings.PROFILING_DIR, response['X-Profile-Id']))
+        self.assertEqual(route, 'api/config/')
+        self.assertTrue(any('ProfilingTestCase.slow_view' in stack for stack in stacks))
+    
+    def test_requests_are_not_profiled_by_default(self):
+        """Test unsampled requests and forged tokens are not profiled"""
+        for headers in ({}, {'HTTP_X_PROFILE': 'forged:token'}):
+            response = ProfilingMiddleware(self.slow_view)(self.factory.get('/api/config/', **headers))
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(list_profiles(), {})
+    
+    def test_token_needs_active_staff_user(self):
+        """Test a token stops working once its user loses staff status or is deactivated"""
+        token = make_profiling_token(self.admin)
+        for changes in ({'is_staff': False}, {'is_active': False}):
+            get_user_model().objects.filter(pk=self.admin.pk).update(**{'is_staff': True, 'is_active': True, **changes})
+            response = ProfilingMiddleware(self.slow_view)(self.factory.get('/api/config/', HTTP_X_PROFILE=token))
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(list_profiles(), {})
+    
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_is_not_loaded(self):
+        """Test the middleware drops out of the chain unless enabled"""
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(self.slow_view)
+    
+    def test_profiles_are_rotated(self):
+        """Test the oldest profiles are deleted over the per route and total limits"""
+        stacks = {'app:main;app:handler': 3}
+        with override_settings(PROFILING_MAX_FILES_PER_ROUTE=2):
+            paths = [write_profile('api/config/', Counter(stacks)) for _ in range(3)]
+        self.assertEqual(list_profiles()['api_config'], paths[1:])
+        
+        # Room for the newest profile of each route, not for a third one
+        with override_settings(PROFILING_MAX_BYTES=os.path.getsize(paths[2]) * 2 + 10):
+            path = write_profile('api/auth/login/', Counter(stacks))
+        self.assertEqual(list_profiles(), {'api_config': paths[2:], 'api_auth_login': [path]})
+    
+    def test_merge_profiles_per_route(self):
+        """Test merge_profiles adds up the samples of every profile of a route"""
+        write_profile('api/auth/login/', Counter({'app:main;app:login': 2, 'app:main;app:hash': 5}))
+        write_profile('api/auth/login/', Counter({'app:main;app:hash': 3}))
+        out = io.StringIO()
+        call_command('merge_profiles', stdout=out)
+        
+        route, stacks = read_profile(os.path.join(settings.PROFILING_DIR, 'merged', 'api_auth_login.folded'))
+        self.assertEqual(stacks, {'app:main;app:login': 2, 'app:main;app:hash': 8})
+        self.assertIn('api/auth/login/: 2 profiles, 10 samples', out.getvalue())
+
+
+class SeedTestCase(TestCase):
+    def get_spec(self, physics='Physics'):
+        return {
+            'core.AppConfig': {
+                'key': ['key'],
+                'catalog': 'config',
+                'rows': [{'key': 'primary_color', 'value': '#12D18E'}],
+            },
+            'users.LearningDomain': {
+                'key': ['title'],
+                'catalog': 'onboarding',
+                'rows': [
+                    {'title': 'Physics', 'translations': {'en': {'name_translated': physics}, 'ru': {'name_translated': 'Физика'}}},
+                    {'title': 'Biology'},
+                ],
+            },
+        }
+    
+    def test_seed_creates_rows_and_translations(self):
+        """Test the first run creates rows, translations and their translations_cache"""
+        version = get_catalog_version('onboarding')
+        with self.captureOnCommitCallbacks(execute=True):
+            results = seed(self.get_spec())
+        
+        self.assertEqual([changes.created for changes in results], [1, 2])
+        self.assertEqual(results[1].translations_created, 2)
+        physics = LearningDomain.objects.get(title='Physics')
+        self.assertEqual(physics.translations_cache['ru'], {'name_translated': 'Физика'})
+        self.assertEqual(LearningDomain.objects.get(title='Biology').translations_cache, {})
+        self.assertNotEqual(get_catalog_version('onboarding'), version)
+    
+    def test_unchanged_spec_is_skipped(self):
+        """Test applying the same spec again only reads its hash"""
+        seed(self.get_spec())
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNone(seed(self.get_spec()))
+        self.assertFalse([query for query in queries if 'learningdomain' in query['sql'].lower()])
+    
+    def test_changes_are_applied(self):
+        """Test missing rows and translations are added, and admin edits are only overwritten with force"""
+        seed(self.get_spec())
+        AppConfig.objects.filter(key='primary_color').update(value='#000000')
+        
+        spec = self.get_spec(physics='Physics!')
+        spec['core.AppConfig']['rows'].append({'key': 'platform_name', 'value': 'SteamUp'})
+        spec['users.LearningDomain']['rows'][1]['translations'] = {'ru': {'name_translated': 'Биология'}}
+        results = seed(spec)
+        self.assertEqual([changes.created for changes in results], [1, 0])
+        self.assertEqual((results[1].translations_created, results[1].translations_updated), (1, 0))
+        self.assertEqual(AppConfig.objects.get(key='primary_color').value, '#000000')
+        self.assertEqual(LearningDomain.objects.get(title='Physics').translations_cache['en'], {'name_translated': 'Physics'})
+        
+        self.assertIsNone(seed(spec))
+        results = seed(spec, force=True)
+        self.assertEqual((results[0].updated, results[1].translations_updated), (1, 1))
+        self.assertEqual(AppConfig.objects.get(key='primary_color').value, '#12D18E')
+        self.assertEqual(LearningDomain.objects.get(title='Physics').translations_cache['en'], {'name_translated': 'Physics!'})
+    
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run reports the changes and rolls them back"""
+        results = seed(self.get_spec(), dry_run=True)
+        self.assertEqual(results[1].created, 2)
+        self.assertFalse(LearningDomain.objects.exists())
+        self.assertEqual(seed(self.get_spec())[1].created, 2)
+    
+    def test_invalid_spec_raises(self):
+        """Test fields and models missing from the schema are reported"""
+        spec = self.get_spec()
+        spec['users.LearningDomain']['rows'][1]['name'] = 'Biology'
+        with self.assertRaisesMessage(SeedError, "users.LearningDomain has no field 'name'"):
+            seed(spec)
+        with self.assertRaises(SeedError):
+            seed({'users.Unknown': {'key': ['title'], 'rows': []}})
+    
+    def test_project_seed_spec_applies(self):
+        """Test seed.yaml matches the models"""
+        out = io.StringIO()
+        call_command('seed', stdout=out)
+        self.assertIn('users.LearningPeriodTarget: 4 created', out.getvalue())
+        call_command('seed', stdout=out)
+        self.assertIn('Seed spec unchanged', out.getvalue())
@@ -0,0 +1,133 @@
+import functools
+import time
+from contextvars import ContextVar
+
+_timings = ContextVar('request_timings', default=None)
+
+# Recorded as counts only, they are shown in the description of their metric
+COUNTERS = frozenset({'cache_hit', 'cache_miss'})
+
+
+class RequestTimings:
+    """
+    Durations and counts recorded while serving one sampled request.
+    """
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self.active = set()
+
+    def add(self, name, seconds=0.0, count=1):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def as_dict(self):
+        """
+        Flatten the timings for structured logs, e.g. {'db_ms': 3.1, 'db_count': 2}.
+        """
+        fields = {}
+        for name, seconds in self.durations.items():
+            if name not in COUNTERS:
+                fields[f'{name}_ms'] = round(seconds * 1000, 2)
+            fields[f'{name}_count'] = self.counts[name]
+        return fields
+
+    def server_timing(self):
+        """
+        Format the timings as a Server-Timing header value.
+        """
+        metrics = []
+        for name, seconds in self.durations.items():
+            if name in COUNTERS:
+                continue
+            metric = f'{name};dur={seconds * 1000:.2f}'
+            if name == 'db':
+                metric += f';desc="{self.counts[name]} queries"'
+            elif name == 'cache':
+                metric += f';desc="hits={self.counts.get("cache_hit", 0)} misses={self.counts.get("cache_miss", 0)}"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+def get_timings():
+    """
+    Return the RequestTimings of the current request, or None if it is not sampled.
+    """
+    return _timings.get()
+
+
+def start_timings():
+    """
+    Start recording for the current request.
+
+    Returns:
+        A token for stop_timings()
+    """
+    return _timings.set(RequestTimings())
+
+
+def stop_timings(token):
+    """
+    Stop recording and return what was recorded.
+    """
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+def record(name, seconds=0.0, count=1):
+    """
+    Add a duration or an event count to the current request, if it is sampled.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(name, seconds, count)
+
+
+class timed:
+    """
+    Time a block (or a function, as a decorator) under a name.
+
+    Nested blocks with the same name are only counted once, so recursive
+    code such as nested serializers is not double counted.
+
+    Usage:
+        with timed('password_hash'):
+            ...
+    """
+    __slots__ = ('name', 'timings', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = None
+
+    def __enter__(self):
+        timings = _timings.get()
+        if timings is not None and self.name not in timings.active:
+            timings.active.add(self.name)
+            self.timings = timings
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.start)
+            self.timings.active.discard(self.name)
+            self.timings = None
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class TimedSerializerMixin:
+    """
+    Record the time spent in to_representation as 'serializer'.
+    """
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
@@ -0,0 +1,97 @@
+from django.db.models.signals import post_delete, post_save
+
+# Name of the denormalized column holding {language: {field: value}}
+TRANSLATIONS_CACHE_FIELD = 'translations_cache'
+
+
+def has_translations_cache(model):
+    """
+    Return True if the translatable model has a translations_cache column.
+    """
+    return any(field.name == TRANSLATIONS_CACHE_FIELD for field in model._meta.concrete_fields)
+
+
+def build_translations_cache(model, pks):
+    """
+    Read the translations of the given rows in the translations_cache format.
+
+    Returns:
+        A dict mapping each pk to {language: {field: value}}, in the same
+        order parler returns the translation rows
+    """
+    meta = model._parler_meta.root
+    fields = meta.get_translated_fields(include_m2m=False)
+    caches = {pk: {} for pk in pks}
+
+    rows = (
+        meta.model.objects
+        .filter(master_id__in=pks)
+        .order_by('pk')
+        .values_list('master_id', 'language_code', *fields)
+    )
+    for master_id, language_code, *values in rows:
+        caches[master_id][language_code] = dict(zip(fields, values))
+    return caches
+
+
+def sync_translations_cache(model, pk, instance=None):
+    """
+    Rewrite the translations_cache column of one row from its translations.
+
+    Args:
+        model: The translatable model
+        pk: Primary key of the row
+        instance: Loaded copy of the row to keep in sync, so a later save() does not write stale data
+    """
+    translations = build_translations_cache(model, [pk])[pk]
+    model._base_manager.filter(pk=pk).update(**{TRANSLATIONS_CACHE_FIELD: translations})
+    if instance is not None:
+        setattr(instance, TRANSLATIONS_CACHE_FIELD, translations)
+
+
+def rebuild_translations_cache(model, batch_size=500):
+    """
+    Rebuild the translations_cache column of every row in batches.
+
+    Yields:
+        The number of rows updated per batch
+    """
+    last_pk = None
+    while True:
+        queryset = model._base_manager.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+
+        caches = build_translations_cache(model, pks)
+        model._base_manager.bulk_update(
+            [model(pk=pk, **{TRANSLATIONS_CACHE_FIELD: caches[pk]}) for pk in pks],
+            [TRANSLATIONS_CACHE_FIELD],
+        )
+        last_pk = pks[-1]
+        yield len(pks)
+
+
+def connect_translations_cache(model):
+    """
+    Keep the translations_cache column of a model in sync on every write.
+
+    Master rows are synced as well, because saving a loaded row writes
+    back whatever translations_cache value it was loaded with.
+    """
+    translation_model = model._parler_meta.root_model
+
+    def sync_master(sender, instance, **kwargs):
+        sync_translations_cache(model, instance.pk, instance)
+
+    def sync_translation(sender, instance, **kwargs):
+        # Update the master in memory too if the translation came from it
+        master = instance._state.fields_cache.get('master')
+        sync_translations_cache(model, instance.master_id, master)
+
+    uid = f"translations_cache:{model._meta.label}"
+    post_save.connect(sync_master, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(sync_translation, sender=translation_model, weak=False, dispatch_uid=uid)
+    post_delete.connect(sync_translation, sender=translation_model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+# Distinct Accept-Language headers remembered per process
+CACHE_SIZE = 1024
+
+# Longer headers are cut at the last complete range, like Django does
+MAX_HEADER_LENGTH = 500
+
+
+def get_quality(params):
+    """
+    Return the q-value among the ';' separated parameters of a range.
+
+    Other parameters are ignored, a range without q weighs 1.
+
+    Returns:
+        The q-value, or None if it is not a number
+    """
+    for param in params.split(';'):
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return 1.0
+
+
+def parse_accept_language(header):
+    """
+    Parse an Accept-Language header into language ranges ordered by preference.
+
+    Ranges with q=0 or an invalid q-value are dropped, other parameters are
+    ignored. Ranges with the same weight keep their order in the header.
+
+    Returns:
+        A list of lowercase language ranges, e.g. ['ru-ru', 'ru', 'en']
+    """
+    if len(header) > MAX_HEADER_LENGTH:
+        cut = header.rfind(',', 0, MAX_HEADER_LENGTH)
+        # Without a complete range in reach, keep what fits
+        header = header[:cut if cut != -1 else MAX_HEADER_LENGTH]
+
+    weighted = []
+    for item in header.split(','):
+        language_range, _, params = item.partition(';')
+        language_range = language_range.strip().lower()
+        if not language_range:
+            continue
+
+        quality = get_quality(params)
+        if quality is None or not 0 < quality <= 1:
+            continue
+        weighted.append((quality, language_range))
+
+    weighted.sort(key=lambda pair: pair[0], reverse=True)
+    return [language_range for _, language_range in weighted]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def negotiate_language(header, supported):
+    """
+    Pick the best supported language for an Accept-Language header.
+
+    Uses RFC 4647 lookup: each range, from the highest q-value down, is
+    shortened one subtag at a time (zh-hant-tw, zh-hant, zh) until it
+    matches a supported code. Results are memoized by the raw header.
+
+    Args:
+        header: Raw Accept-Language header value
+        supported: frozenset of lowercase supported language codes
+
+    Returns:
+        The matching language code, or None if nothing matches
+    """
+    for language_range in parse_accept_language(header):
+        if language_range == '*':
+            continue
+        while language_range:
+            if language_range in supported:
+                return language_range
+            language_range = language_range.rpartition('-')[0]
+            # Single letter subtags (e.g. the x in x-private) are never a match
+            if len(language_range) > 1 and language_range[-2] == '-':
+                language_range = language_range[:-2]
+    return None
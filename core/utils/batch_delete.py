@@ -0,0 +1,35 @@
+import time
+
+
+def delete_in_batches(queryset, batch_size=1000, pause=0):
+    """
+    Delete the rows of a queryset in small batches.
+
+    Every batch is a separate short statement, so the table is never
+    locked for long and replicas do not fall behind.
+
+    Args:
+        queryset: The rows to delete
+        batch_size: Maximum number of rows deleted per statement
+        pause: Seconds to sleep between batches
+
+    Yields:
+        A tuple of (deleted rows, seconds taken) per batch
+    """
+    model = queryset.model
+    # Ordering is not needed to pick a batch and only makes the query slower
+    queryset = queryset.order_by()
+
+    while True:
+        start = time.perf_counter()
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+
+        deleted, _ = model._base_manager.filter(pk__in=pks).delete()
+        yield deleted, time.perf_counter() - start
+
+        if len(pks) < batch_size:
+            return
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import EmailOutbox
+from core.timing import timed
+from core.utils.batch_delete import delete_in_batches
+
+# How long a worker may hold claimed messages before another worker retries them
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+@timed('email')
+def enqueue_email(subject, body, recipient, from_email=None):
+    """
+    Store an email in the outbox instead of sending it right away.
+
+    Call it inside the transaction that creates the data the email is
+    about, so both are committed together. The send_queued_emails
+    management command delivers the message.
+
+    Returns:
+        The created EmailOutbox row
+    """
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or '',
+    )
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff delay after the given number of failed attempts.
+    """
+    base = settings.EMAIL_OUTBOX_RETRY_DELAY
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_due_emails(batch_size):
+    """
+    Lock and lease a batch of due messages so that concurrent workers skip them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=[message.pk for message in messages]).update(
+            next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return messages
+
+
+def record_failure(message, error):
+    """
+    Count a failed attempt, and reschedule the message or give up on it.
+    """
+    message.attempts += 1
+    message.last_error = str(error)
+    if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = 'failed'
+        # Never sent again, and it may hold an OTP
+        message.body = ''
+    else:
+        message.next_attempt_at = timezone.now() + get_retry_delay(message.attempts)
+    message.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'body'])
+
+
+def send_queued_emails(connection=None, batch_size=None):
+    """
+    Send one batch of due messages over a single, reused mail connection.
+
+    Failed messages are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached, then marked as failed. When the
+    mail server cannot be reached, the attempt is counted against every
+    message left in the batch.
+
+    Args:
+        connection: An open mail connection to reuse, a new one is opened if not given
+        batch_size: Maximum number of messages to send (defaults to EMAIL_OUTBOX_BATCH_SIZE)
+
+    Returns:
+        A tuple of (sent, failed) message counts
+    """
+    messages = claim_due_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0, 0
+
+    owns_connection = connection is None
+    if owns_connection:
+        connection = get_connection()
+
+    sent = failed = 0
+    try:
+        for index, message in enumerate(messages):
+            try:
+                # A no-op when the connection is open already
+                connection.open()
+            except Exception as e:
+                for unsent in messages[index:]:
+                    record_failure(unsent, e)
+                failed += len(messages) - index
+                break
+
+            email = EmailMessage(
+                message.subject,
+                message.body,
+                message.from_email or settings.DEFAULT_FROM_EMAIL,
+                [message.recipient],
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as e:
+                failed += 1
+                record_failure(message, e)
+                # The server may have dropped us, start over with a fresh session
+                connection.close()
+            else:
+                sent += 1
+                message.attempts += 1
+                message.status = 'sent'
+                message.sent_at = timezone.now()
+                # Bodies carry OTPs, only keep what was sent to whom and when
+                message.body = ''
+                message.save(update_fields=['attempts', 'status', 'sent_at', 'body'])
+    finally:
+        if owns_connection:
+            connection.close()
+
+    return sent, failed
+
+
+def prune_outbox(batch_size=1000):
+    """
+    Delete sent and failed messages older than EMAIL_OUTBOX_RETENTION_DAYS in batches.
+
+    Returns:
+        The number of deleted messages
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    old = EmailOutbox.objects.filter(status__in=['sent', 'failed'], created_at__lt=cutoff)
+    return sum(deleted for deleted, _ in delete_in_batches(old, batch_size=batch_size))
@@ -1,12 +1,14 @@
+from core.config import get_config, snapshot_etag
 from core.models import AppConfig
 from core.response import APIResponse
 from core.serializers.AppConfigSerializer import AppConfigSerializer
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
+from django.utils.decorators import method_decorator
 from django.utils.translation import get_language
 
 class AppConfigViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AppConfig.objects.all()
+    queryset = AppConfig.objects.with_translations()
     serializer_class = AppConfigSerializer
     permission_classes = [permissions.AllowAny]
     
@@ -17,36 +19,15 @@ class AppConfigViewSet(viewsets.ReadOnlyModelViewSet):
         return context
     
     @action(detail=False, methods=['get'])
+    @method_decorator(snapshot_etag())
     def theme(self, request):
         # Get current language
         current_language = get_language() or 'en'
         
-        # Get primary color and platform name
-        primary_color = AppConfig.objects.filter(key='primary_color').first()
-        platform_name = AppConfig.objects.filter(key='platform_name').first()
-        
-        # Get translated values
-        if primary_color:
-            try:
-                primary_color.set_current_language(current_language)
-                primary_color_value = primary_color.value
-            except:
-                primary_color_value = primary_color.safe_translation_getter('value', any_language=True) or '#12D18E'
-        else:
-            primary_color_value = '#12D18E'
-            
-        if platform_name:
-            try:
-                platform_name.set_current_language(current_language)
-                platform_name_value = platform_name.value
-            except:
-                platform_name_value = platform_name.safe_translation_getter('value', any_language=True) or 'SteamUp'
-        else:
-            platform_name_value = 'SteamUp'
-        
+        # Served from the in-process config snapshot, no queries
         data = {
-            'primary_color': primary_color_value,
-            'platform_name': platform_name_value
+            'primary_color': get_config('primary_color', current_language, default='#12D18E'),
+            'platform_name': get_config('platform_name', current_language, default='SteamUp')
         }
         
         return APIResponse(data=data)
@@ -56,6 +37,7 @@ from parler_rest.serializers import TranslatedFieldsField
 
 class TranslatedFieldsFieldExtension(OpenApiSerializerFieldExtension):
     target_class = TranslatedFieldsField
+    match_subclasses = True
 
     def map_serializer_field(self, auto_schema, direction):
         return {
@@ -0,0 +1,21 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db import get_pool_stats
+
+
+class DatabasePoolView(APIView):
+    """
+    Connection pool stats of the worker process that serves the request.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        description="Database connection pool stats of the worker that serves the request, null if pooling is off",
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request):
+        return Response(get_pool_stats())
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from core.metrics import generate_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>`. Without a token
+    configured it is only available with DEBUG.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(generate_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -5,20 +5,48 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+from core.ratelimit import RateLimiter, get_client_ip
 from core.response import APIResponse
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom TokenObtainPairView that returns a standardized response format
     """
+    # Only failed attempts are counted, so a victim's email cannot be locked
+    # out by logging in as them, and credential stuffing is limited per client
+    rate_limiters = {
+        'email': RateLimiter.from_settings('login'),
+        'ip': RateLimiter.from_settings('login_ip'),
+    }
+    
+    def get_identities(self, request, email):
+        return {'email': str(email).lower(), 'ip': get_client_ip(request)}
+    
+    def record_failure(self, identities):
+        for scope, limiter in self.rate_limiters.items():
+            limiter.hit(identities[scope])
+    
     def post(self, request, *args, **kwargs):
         # check is user is verified
         # if not, return error
         # if user is verified, return token
         # and user details
-        email = request.data.get('email')
+        email = request.data.get('email') if isinstance(request.data, dict) else None
+        
+        # Throttle password guessing before touching the database
+        identities = self.get_identities(request, email)
+        for scope, limiter in self.rate_limiters.items():
+            allowed, retry_after = limiter.check(identities[scope])
+            if not allowed:
+                return APIResponse(
+                    error=f"Too many login attempts. Try again in {retry_after} seconds.",
+                    code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={'Retry-After': str(retry_after)}
+                )
+        
         user = User.objects.filter(email=email).first()
         if not user:
+            self.record_failure(identities)
             return APIResponse(error="Email is required", code=status.HTTP_400_BAD_REQUEST)
         if not user.is_verified:
             return APIResponse(error="User is not verified", code=status.HTTP_401_UNAUTHORIZED)
@@ -29,6 +57,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             serializer.is_valid(raise_exception=True)
         except TokenError as e:
             return APIResponse(error=str(e), code=status.HTTP_401_UNAUTHORIZED)
+        except Exception:
+            # A wrong password, the serializer re-raises its errors as plain exceptions
+            self.record_failure(identities)
+            raise
         
         return APIResponse(data=serializer.validated_data)
 
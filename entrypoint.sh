@@ -6,9 +6,18 @@ set -e
 # Check for environment variables
 FLUSH_DATABASE=${FLUSH_DATABASE:-false}
 RUN_MIGRATIONS=${RUN_MIGRATIONS:-true}
+RUN_SETUP=${RUN_SETUP:-true}
 export DB_HOST=${DB_HOST:-localhost}
 export DB_PORT=${DB_PORT:-5432}
 
+# Metrics files of the previous run would be added to the new counts. Done
+# first: every manage.py call below imports core.metrics, which opens its
+# files in this directory
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Wait for the database to be ready
 echo "Waiting for PostgreSQL..."
 while ! nc -z $DB_HOST $DB_PORT; do
@@ -16,6 +25,13 @@ while ! nc -z $DB_HOST $DB_PORT; do
 done
 echo "PostgreSQL started"
 
+# Containers sharing the image, like the email worker, leave the setup below
+# to the web container
+if [ "$RUN_SETUP" = "false" ]; then
+  echo "Skipping setup as per configuration"
+  exec "$@"
+fi
+
 # Clear migrations if requested on users and core apps
 if [ "$FLUSH_DATABASE" = "true" ]; then
   echo "Clearing migrations..."
@@ -37,6 +53,9 @@ if [ "$RUN_MIGRATIONS" = "true" ]; then
   echo "Applying database migrations..."
   python manage.py makemigrations
   python manage.py migrate
+  # Load the catalog, a no-op unless seed.yaml changed
+  echo "Seeding catalog..."
+  python manage.py seed
 else
   echo "Skipping database migrations as per configuration"
 fi
@@ -88,6 +107,10 @@ django-admin makemessages -l uz -l ru -l en
 echo "Compileing message files"
 django-admin compilemessages
 
+# Generate the OpenAPI schema once instead of on every /api/schema/ request
+echo "Building OpenAPI schema..."
+python manage.py build_openapi_schema
+
 # Start the server
 echo "Starting server..."
 exec "$@"
@@ -0,0 +1,9 @@
+import os
+
+
+def child_exit(server, worker):
+    # Let the metrics of a stopped worker be merged, see core.metrics
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
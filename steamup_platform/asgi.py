@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'steamup_platform.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+# Like get_asgi_application(), but /api/ requests skip the admin-only middleware
+from core.handlers import PathDispatchASGIHandler  # noqa: E402
+
+application = PathDispatchASGIHandler()
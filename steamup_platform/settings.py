@@ -6,7 +6,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 import certifi
-from decouple import config
+from decouple import Csv, config
 from django.utils.translation import gettext_lazy as _
 
 os.environ['SSL_CERT_FILE'] = certifi.where()
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     # Local apps
     'core',
     'users',
+    'benchmarks',  # `manage.py loadtest`
 ]
 
 MIDDLEWARE = [
@@ -58,6 +59,21 @@ MIDDLEWARE = [
     'core.middlewares.LanguageMiddleware.LanguageMiddleware',  # Add Language middleware for API requests
 ]
 
+# Middleware for /api/ requests, see core.handlers. JWT authenticated, so no
+# sessions, CSRF, messages or LocaleMiddleware (LanguageMiddleware picks the language).
+# Without CommonMiddleware APPEND_SLASH does not apply: API paths missing their
+# trailing slash are 404s instead of redirects.
+API_MIDDLEWARE = [
+    'core.middlewares.MetricsMiddleware.MetricsMiddleware',  # First, so they time the whole request
+    'core.middlewares.ServerTimingMiddleware.ServerTimingMiddleware',
+    'core.middlewares.ProfilingMiddleware.ProfilingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'core.middlewares.StandardResponseMiddleware.StandardResponseMiddleware',
+    'core.middlewares.LanguageMiddleware.LanguageMiddleware',
+    'core.middlewares.ReplicaRoutingMiddleware.ReplicaRoutingMiddleware',
+]
+
 ROOT_URLCONF = 'steamup_platform.urls'
 
 TEMPLATES = [
@@ -88,6 +104,92 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Check connections before use, broken ones are replaced instead of failing the request.
+        # With DB_POOL this becomes the pool's check=ConnectionPool.check_connection on checkout
+        # (Django 5.1+ passes it itself, setting 'check' in the pool options as well is an error)
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Connection pool per worker process (psycopg 3), stats at /api/system/db-pool/.
+# With DB_POOL=False connections are reused for DB_CONN_MAX_AGE seconds instead.
+if config('DB_POOL', default=True, cast=bool):
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),  # seconds to wait for a connection
+            'max_idle': config('DB_POOL_MAX_IDLE', default=600.0, cast=float),  # seconds before idle connections close
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica1.internal,replica2.internal.
+# API reads go to a random replica, see core.routers. Tests use the primary.
+DATABASE_REPLICAS = []
+for number, host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Seconds a user reads from the primary after writing, to see their own changes
+REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Bearer token Prometheus sends to /metrics, see core.metrics. Without it /metrics only works with DEBUG
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Share of API requests that get a Server-Timing header and a timing log line, see core.timing
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float)
+
+# Sampling profiler for API requests, see core.profiling. With PROFILING_ENABLED, a
+# PROFILING_SAMPLE_RATE share of requests and those with a signed X-Profile header are profiled
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_INTERVAL = config('PROFILING_INTERVAL', default=0.002, cast=float)  # seconds between stack samples
+PROFILING_DIR = config('PROFILING_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES_PER_ROUTE = config('PROFILING_MAX_FILES_PER_ROUTE', default=200, cast=int)
+PROFILING_MAX_BYTES = config('PROFILING_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=3600, cast=int)  # seconds
+
+# Logging
+# INFO records of the project's loggers (Server-Timing lines, OTP pruning) go to
+# stderr, where the container runtime collects them. Django's own loggers keep
+# their defaults.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': LOG_LEVEL},
+        'users': {'handlers': ['console'], 'level': LOG_LEVEL},
+    },
+}
+
+# Cache
+# Rate limits, catalog and config stamps and token versions live here. Use a cache
+# shared by all workers in production (e.g. core.cache.RedisCache). With a per-process
+# cache other workers miss invalidations, so token versions are only cached briefly
+# (see users.authentication) and stamps expire after 30s (see core.cache.bounded_timeout).
+# The core.cache backends report hits and misses to the Server-Timing header.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='core.cache.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='steamup'),
     }
 }
 
@@ -158,7 +260,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.VersionedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -166,17 +268,36 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'core.schema.StandardResponseAutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.StandardJSONRenderer',  # Wraps data in the standard response format
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.FastJSONParser',  # orjson when installed, stdlib otherwise
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# How often each worker checks whether its AppConfig snapshot is stale, see core.config
+APP_CONFIG_SNAPSHOT_INTERVAL = config('APP_CONFIG_SNAPSHOT_INTERVAL', default=1.0, cast=float)  # seconds
+
+# Rate limits as (requests, seconds) per scope, see core.ratelimit
+RATE_LIMITS = {
+    'otp': (1, 60),  # Per email and purpose
+    'login': (10, 300),  # Failed attempts per email
+    'login_ip': (50, 300),  # Failed attempts per client IP
+    'has_profile': (30, 60),  # Per client IP
+}
+
+# Reverse proxies in front of the app, whose X-Forwarded-For entries are trusted
+# to find the client IP (1 behind the nginx of steamup.conf), see core.ratelimit
+NUM_PROXIES = config('NUM_PROXIES', default=0, cast=int)
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # In production, specify exact origins
 CORS_ALLOW_CREDENTIALS = True
-CORS_EXPOSE_HEADERS = ['Content-Language']  # Expose Content-Language header
+CORS_EXPOSE_HEADERS = ['Content-Language', 'ETag']  # Expose Content-Language and ETag headers
 
 # JWT settings
 SIMPLE_JWT = {
@@ -191,7 +312,11 @@ SIMPLE_JWT = {
 
 # Email configuration
 if DEBUG:
-    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+    # Set EMAIL_BACKEND to the SMTP backend to test against a local debugging server
+    EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+    EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+    EMAIL_PORT = config('EMAIL_PORT', default=1025, cast=int)
+    EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 else:
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = 'smtp.gmail.com'
@@ -202,7 +327,27 @@ else:
     EMAIL_USE_SSL = False
     EMAIL_TIMEOUT = 60
 
+# Outgoing emails are queued in the database and sent by `manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=30, cast=int)  # seconds, doubled on each retry
+EMAIL_OUTBOX_MAX_RETRY_DELAY = config('EMAIL_OUTBOX_MAX_RETRY_DELAY', default=3600, cast=int)
+# Days sent and failed messages are kept (without their body) before the worker deletes them
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', default=30, cast=int)
+
+# OTP retention: used and expired codes are deleted by `manage.py prune_otp_codes`,
+# run from cron or as a worker that prunes every OTP_RETENTION_INTERVAL seconds
+OTP_RETENTION_INTERVAL = config('OTP_RETENTION_INTERVAL', default=0, cast=int)  # seconds, 0 prunes once
+OTP_RETENTION_BATCH_SIZE = config('OTP_RETENTION_BATCH_SIZE', default=1000, cast=int)
+OTP_RETENTION_PAUSE = config('OTP_RETENTION_PAUSE', default=0.1, cast=float)  # seconds between batches
+
+# Catalog rows applied by `manage.py seed`, see core.seed
+SEED_SPEC = config('SEED_SPEC', default=os.path.join(BASE_DIR, 'seed.yaml'))
+
 # API Documentation
+# Prebuilt OpenAPI schema served at /api/schema/, see `manage.py build_openapi_schema`
+OPENAPI_SCHEMA_DIR = config('OPENAPI_SCHEMA_DIR', default=os.path.join(BASE_DIR, 'openapi'))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'SteamUp API',
     'DESCRIPTION': 'API for SteamUp Platform',
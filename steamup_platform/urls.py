@@ -1,16 +1,22 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.openapi import PrecomputedSchemaView
+from core.views.MetricsView import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
     
     # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', PrecomputedSchemaView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # setup static urls
@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'steamup_platform.settings')
+django.setup(set_prefix=False)
 
-application = get_wsgi_application()
+# Like get_wsgi_application(), but /api/ requests skip the admin-only middleware
+from core.handlers import PathDispatchWSGIHandler  # noqa: E402
+
+application = PathDispatchWSGIHandler()
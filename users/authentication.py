@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import is_shared_cache
+from core.routers import primary_reads
+from users.models.User import token_version_cache_key
+
+User = get_user_model()
+
+# Claims copied from the user into every token, see CustomTokenObtainPairSerializer.get_token
+USER_CLAIMS = ('is_active', 'is_verified', 'token_version')
+
+# How long a token version stays cached, revoke_tokens() drops it right away.
+# With a per-process cache the other workers cannot see that, so their entry
+# must expire soon: a revoked token works there until it does.
+TOKEN_VERSION_TIMEOUT = 60 * 60 * 24
+LOCAL_TOKEN_VERSION_TIMEOUT = 10
+
+
+def get_token_version_timeout():
+    if is_shared_cache(caches['default']):
+        return TOKEN_VERSION_TIMEOUT
+    return LOCAL_TOKEN_VERSION_TIMEOUT
+
+
+def get_token_version(user_id):
+    """
+    Return the current token version of a user, read through the cache.
+
+    Returns:
+        The version number, or None if the user does not exist
+    """
+    key = token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A lagging replica would cache the version of a token that was just revoked
+        with primary_reads():
+            version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.add(key, version, timeout=get_token_version_timeout())
+    return version
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that also rejects tokens revoked with User.revoke_tokens().
+
+    Tokens issued before the token_version claim existed count as version 0.
+    """
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if validated_token.get('token_version', 0) != user.token_version:
+            raise InvalidToken(_("Token has been revoked"))
+        return user
+
+
+class ClaimsJWTAuthentication(VersionedJWTAuthentication):
+    """
+    Authenticate from the signed token claims without loading the user row.
+
+    request.user is a User instance built from the claims, with every other
+    field deferred, so it works in queries and foreign keys as usual. Reading
+    a field that is not a claim (email, is_staff, ...) loads it on access.
+    Only the token version is checked, through the cache.
+
+    Opt in per view:
+        authentication_classes = [ClaimsJWTAuthentication]
+    """
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            # Issued before the claims were added
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        claims['id'] = User._meta.pk.to_python(user_id)
+
+        if not claims['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        version = get_token_version(claims['id'])
+        if version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if claims['token_version'] != version:
+            raise InvalidToken(_("Token has been revoked"))
+
+        fields = [field.attname for field in User._meta.concrete_fields]
+        return User.from_db(User.objects.db, fields, [claims.get(field, DEFERRED) for field in fields])
+
+
+class VersionedJWTScheme(SimpleJWTScheme):
+    target_class = VersionedJWTAuthentication
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    # The schema needs a distinct name per authentication class
+    target_class = ClaimsJWTAuthentication
+    name = 'jwtClaimsAuth'
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.tasks import prune_otp_codes
+
+
+class Command(BaseCommand):
+    help = "Delete used and expired OTP codes in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OTP_RETENTION_BATCH_SIZE,
+            help="Maximum number of codes deleted per statement",
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.OTP_RETENTION_PAUSE,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.OTP_RETENTION_INTERVAL,
+            help="Keep running and prune every this many seconds, 0 prunes once and exits",
+        )
+
+    def prune(self, options):
+        start = time.perf_counter()
+        total = 0
+
+        for number, (deleted, seconds) in enumerate(prune_otp_codes(options['batch_size'], options['pause']), 1):
+            total += deleted
+            self.stdout.write(f"Batch {number}: deleted {deleted} codes in {seconds:.3f}s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {total} codes in {time.perf_counter() - start:.3f}s"
+        ))
+
+    def handle(self, *args, **options):
+        if not options['interval']:
+            self.prune(options)
+            return
+
+        while True:
+            try:
+                self.prune(options)
+            except Exception as e:
+                # Keep the worker alive, the next run starts over
+                self.stderr.write(f"Pruning failed: {e}")
+            # Idle for a long time, so drop a connection the server may have closed
+            close_old_connections()
+            time.sleep(options['interval'])
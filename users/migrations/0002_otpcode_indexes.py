@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user', 'purpose', '-created_at'], name='otpcode_unused_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user', 'code', 'purpose', '-created_at'], name='otpcode_unused_code_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_otpcode_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='otpcode',
+            name='otpcode_unused_recent_idx',
+        ),
+    ]
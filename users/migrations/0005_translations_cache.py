@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningdomain',
+            name='translations_cache',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='learningmotivation',
+            name='translations_cache',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='learningperiodtarget',
+            name='translations_cache',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
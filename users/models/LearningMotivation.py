@@ -2,6 +2,8 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from parler.models import TranslatableModel, TranslatedFields
 
+from core.managers import TranslatedManager
+
 
 class LearningMotivation(TranslatableModel):
     icon = models.ImageField(upload_to='icon/', null=True, blank=True)
@@ -10,6 +12,10 @@ class LearningMotivation(TranslatableModel):
     translations = TranslatedFields(
         tr_title=models.CharField(_("Translated title"), max_length=100, null=True, blank=True), 
     )
+    # All translations as {language: {field: value}}, kept in sync by core.translations
+    translations_cache = models.JSONField(null=True, blank=True, editable=False)
+
+    objects = TranslatedManager()
 
     def __str__(self):
         translated_name = self.safe_translation_getter('tr_title', any_language=True)
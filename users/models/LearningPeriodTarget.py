@@ -2,6 +2,8 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from parler.models import TranslatableModel, TranslatedFields
 
+from core.managers import TranslatedManager
+
 class LearningPeriodTarget(TranslatableModel):
     PERIOD_CHOICES = [
         ('daily', _('Day')),
@@ -18,6 +20,10 @@ class LearningPeriodTarget(TranslatableModel):
     translations = TranslatedFields(
         tr_complement=models.CharField(_("Translated complement"), max_length=100, null=True, blank=True), 
     )
+    # All translations as {language: {field: value}}, kept in sync by core.translations
+    translations_cache = models.JSONField(null=True, blank=True, editable=False)
+
+    objects = TranslatedManager()
 
     def __str__(self):
         translated_complement = self.safe_translation_getter('tr_complement', any_language=True)
@@ -1,10 +1,39 @@
 from users.models.User import User
 
 
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+# How long an OTP code can be used after it was sent
+OTP_VALIDITY = timedelta(minutes=5)
+
+
+class OTPCodeQuerySet(models.QuerySet):
+    def unused(self, user, purpose, max_age=OTP_VALIDITY):
+        """
+        Unused codes of a user for the given purpose, created within max_age.
+        Lookups by code are served by the partial index on unused codes.
+        """
+        return self.filter(
+            user=user,
+            purpose=purpose,
+            is_used=False,
+            created_at__gte=timezone.now() - max_age
+        )
+
+    def prunable(self):
+        """
+        Codes that can no longer be used: already used or expired.
+        """
+        return self.filter(
+            models.Q(is_used=True) | models.Q(created_at__lt=timezone.now() - OTP_VALIDITY)
+        )
+
+
 class OTPCode(models.Model):
     PURPOSE_CHOICES = [
         ('verify', _('Verify')),
@@ -17,8 +46,18 @@ class OTPCode(models.Model):
     is_used = models.BooleanField(_('Is Used'), default=False)
     created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
 
+    objects = OTPCodeQuerySet.as_manager()
+
     def __str__(self):
         return f"OTP for {self.user.email} ({self.purpose})"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Verification and password reset: unused code lookup
+            models.Index(
+                fields=['user', 'code', 'purpose', '-created_at'],
+                condition=models.Q(is_used=False),
+                name='otpcode_unused_code_idx',
+            ),
+        ]
@@ -1,10 +1,18 @@
 from users.models.UserManager import UserManager
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils import timezone
 
 import uuid
 
+from core.timing import timed
+
+
+def token_version_cache_key(user_id):
+    return f"user:{user_id}:token_version"
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True)
@@ -12,6 +20,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_verified = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Bumped to invalidate every token issued so far
+    token_version = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -19,4 +29,35 @@ class User(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = []
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+    @timed('password_hash')
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+
+    @timed('password_hash')
+    def check_password(self, raw_password):
+        return super().check_password(raw_password)
+
+    def save(self, *args, **kwargs):
+        # Tokens carry is_active as a claim, so a deactivated user's tokens
+        # would keep working until they expire
+        deactivated = (
+            not self.is_active
+            and not self._state.adding
+            and User.objects.filter(pk=self.pk, is_active=True).exists()
+        )
+        super().save(*args, **kwargs)
+        if deactivated:
+            self.revoke_tokens()
+
+    def revoke_tokens(self):
+        """
+        Invalidate every JWT issued to the user so far.
+
+        The cached version is dropped once the transaction commits, so
+        authentication never caches the old value again.
+        """
+        User.objects.filter(pk=self.pk).update(token_version=models.F('token_version') + 1)
+        self.refresh_from_db(fields=['token_version'])
+        transaction.on_commit(lambda: cache.delete(token_version_cache_key(self.pk)))
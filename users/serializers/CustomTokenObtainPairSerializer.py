@@ -1,6 +1,8 @@
 from jsonschema import ValidationError
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings
+from django.contrib.auth.models import update_last_login
 from django.utils.translation import gettext as _  
 
 from datetime import timedelta
@@ -9,33 +11,51 @@ from datetime import timedelta
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     remember_me = serializers.BooleanField(required=False, default=False)
 
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Claims trusted by ClaimsJWTAuthentication instead of loading the user
+        token['is_active'] = user.is_active
+        token['is_verified'] = user.is_verified
+        token['token_version'] = user.token_version
+        return token
+
+    @classmethod
+    def get_creds(cls, user, remember_me=False):
+        """
+        Build the credentials payload for a user whose identity is already known.
+
+        Registration uses this directly for the user it just created, so the
+        password is hashed once instead of being verified a second time.
+        Unverified users only get their identity, without tokens.
+        """
+        data = {}
+        if user.is_verified:
+            refresh = cls.get_token(user)
+            # Adjust token lifetime based on remember_me flag
+            if remember_me:
+                refresh.set_exp(lifetime=timedelta(days=30))
+            data['refresh'] = str(refresh)
+            data['access'] = str(refresh.access_token)
+
+        # Add custom claims
+        data['user_id'] = str(user.id)
+        data['email'] = user.email
+        data['is_verified'] = user.is_verified
+        return data
+
     def validate(self, attrs):
         # Remove remember_me from attrs to avoid validation error
         remember_me = attrs.pop('remember_me', False)
 
         try:
-            data = super().validate(attrs)
-
-            # Check if user is verified
-            user = self.user
-                
-            # Add custom claims
-            data['user_id'] = str(user.id)
-            data['email'] = user.email
-            data['is_verified'] = user.is_verified
-            
-            if not user.is_verified:
-                # pop the refresh token if user is not verified
-                data.pop('refresh', None)
-                data.pop('access', None)
+            # Authenticate only, the tokens are minted by get_creds
+            TokenObtainSerializer.validate(self, attrs)
 
-            # Adjust token lifetime based on remember_me flag
-            if remember_me and user.is_verified:
-                refresh = self.get_token(user)
-                refresh.set_exp(lifetime=timedelta(days=30))
-                data['refresh'] = str(refresh)
+            if api_settings.UPDATE_LAST_LOGIN:
+                update_last_login(None, self.user)
 
-            return data
+            return self.get_creds(self.user, remember_me)
         except Exception as e:
             # Convert any exception to a simple string error
-            raise Exception(str(e))
\ No newline at end of file
+            raise Exception(str(e))
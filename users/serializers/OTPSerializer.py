@@ -1,8 +1,6 @@
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
 from rest_framework import serializers
 import random
-from datetime import timedelta
 
 from users.models.OTPCode import OTPCode
 from django.contrib.auth import get_user_model
@@ -20,7 +18,6 @@ class OTPSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         email = attrs.pop('email')
-        purpose = attrs.get('purpose')
 
         try:
             user = User.objects.get(email=email)
@@ -31,22 +28,6 @@ class OTPSerializer(serializers.Serializer):
                 code='user_not_found'
             )
 
-        # Check for throttling (no OTP within 60 seconds)
-        recent_otp = OTPCode.objects.filter(
-            user=user,
-            purpose=purpose,
-            created_at__gte=timezone.now() - timedelta(seconds=60),
-            is_used=False
-        ).first()
-
-        if recent_otp:
-            time_passed = timezone.now() - recent_otp.created_at
-            time_left = 60 - time_passed.seconds
-            raise serializers.ValidationError(
-                _("Please wait {seconds} seconds before requesting another OTP.").format(seconds=time_left),
-                code='throttled'
-            )
-
         attrs['user'] = user
         return attrs
     
@@ -1,8 +1,6 @@
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
 from jsonschema import ValidationError
 from rest_framework import serializers
-from datetime import timedelta
 
 from users.models.OTPCode import OTPCode
 from django.contrib.auth import get_user_model
@@ -25,13 +23,7 @@ class OTPVerificationSerializer(serializers.Serializer):
             raise serializers.ValidationError(_("User with this email does not exist."))
 
         # Check for valid OTP
-        otp = OTPCode.objects.filter(
-            user=user,
-            code=code,
-            purpose=purpose,
-            is_used=False,
-            created_at__gte=timezone.now() - timedelta(minutes=5)
-        ).first()
+        otp = OTPCode.objects.unused(user, purpose).filter(code=code).first()
 
         if not otp:
             raise Exception(_("Invalid or expired OTP code."))
@@ -1,8 +1,6 @@
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
 from jsonschema import ValidationError
 from rest_framework import serializers
-from datetime import timedelta
 
 from users.models.OTPCode import OTPCode
 from django.contrib.auth import get_user_model
@@ -30,13 +28,7 @@ class PasswordResetSerializer(serializers.Serializer):
             raise Exception(_("User with this email does not exist."))
 
         # Check for valid OTP
-        otp = OTPCode.objects.filter(
-            user=user,
-            code=code,
-            purpose='reset',
-            is_used=False,
-            created_at__gte=timezone.now() - timedelta(minutes=5)
-        ).first()
+        otp = OTPCode.objects.unused(user, 'reset').filter(code=code).first()
 
         if not otp:
             raise Exception(_("Invalid or expired OTP code."))
@@ -52,6 +44,7 @@ class PasswordResetSerializer(serializers.Serializer):
         # Update password
         user.set_password(self.validated_data['new_password'])
         user.save()
+        user.revoke_tokens()
 
         # Mark OTP as used
         otp.is_used = True
@@ -6,8 +6,10 @@ from users.models.UserProfile import UserProfile
 
 from rest_framework import serializers
 
+from core.timing import TimedSerializerMixin
 
-class UserProfileSerializer(serializers.ModelSerializer):
+
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     interests = serializers.PrimaryKeyRelatedField(queryset=LearningDomain.objects.all(), many=True)
     motivation = serializers.PrimaryKeyRelatedField(queryset=LearningMotivation.objects.all(), many=False)
     daily_goal = serializers.PrimaryKeyRelatedField(queryset=LearningPeriodTarget.objects.all(), many=False)
@@ -22,8 +24,6 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         interests = validated_data.pop('interests')
-        motivation = validated_data.pop('motivation', None)
-        daily_goal = validated_data.pop('daily_goal', None)
         user = self.context['request'].user
 
         # Create profile
@@ -31,24 +31,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
         # Add interests
         profile.interests.set(interests)
-        profile.motivation.set(motivation)
-        profile.daily_goal.set(daily_goal)
         return profile
 
     def update(self, instance, validated_data):
         interests = validated_data.pop('interests', None)
-        motivation = validated_data.pop('motivation', None)
         
-        # Update other fields
+        # Update other fields, motivation and daily_goal included
         for key, value in validated_data.items():
             setattr(instance, key, value)
 
         # Update interests if provided
         if interests is not None:
             instance.interests.set(interests)
-            
-        if motivation is not None:
-            instance.motivation.set(motivation)
 
         instance.save()
         return instance
\ No newline at end of file
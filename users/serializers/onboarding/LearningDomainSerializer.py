@@ -1,9 +1,12 @@
 from users.models.LearningDomain import LearningDomain
 from rest_framework import serializers
-from parler_rest.serializers import TranslatableModelSerializer, TranslatedFieldsField
+from parler_rest.serializers import TranslatableModelSerializer
 
-class LearningDomainSerializer(TranslatableModelSerializer):
-    translations = TranslatedFieldsField(shared_model=LearningDomain)
+from core.serializers.serializers import CachedTranslatedFieldsField
+from core.timing import TimedSerializerMixin
+
+class LearningDomainSerializer(TimedSerializerMixin, TranslatableModelSerializer):
+    translations = CachedTranslatedFieldsField(shared_model=LearningDomain)
     
     class Meta:
         model = LearningDomain
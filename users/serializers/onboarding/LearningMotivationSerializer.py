@@ -1,9 +1,12 @@
 from users.models.LearningMotivation import LearningMotivation
 from rest_framework import serializers
-from parler_rest.serializers import TranslatableModelSerializer, TranslatedFieldsField
+from parler_rest.serializers import TranslatableModelSerializer
 
-class LearningMotivationSerializer(TranslatableModelSerializer):
-    translations = TranslatedFieldsField(shared_model=LearningMotivation)
+from core.serializers.serializers import CachedTranslatedFieldsField
+from core.timing import TimedSerializerMixin
+
+class LearningMotivationSerializer(TimedSerializerMixin, TranslatableModelSerializer):
+    translations = CachedTranslatedFieldsField(shared_model=LearningMotivation)
     
     class Meta:
         model = LearningMotivation
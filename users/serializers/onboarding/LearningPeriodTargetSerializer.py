@@ -1,10 +1,13 @@
 from users.models.LearningPeriodTarget import LearningPeriodTarget
 from rest_framework import serializers
-from parler_rest.serializers import TranslatableModelSerializer, TranslatedFieldsField
+from parler_rest.serializers import TranslatableModelSerializer
+
+from core.serializers.serializers import CachedTranslatedFieldsField
+from core.timing import TimedSerializerMixin
 from django.utils.translation import gettext_lazy as _
 
-class LearningPeriodTargetSerializer(TranslatableModelSerializer):
-    translations = TranslatedFieldsField(shared_model=LearningPeriodTarget)
+class LearningPeriodTargetSerializer(TimedSerializerMixin, TranslatableModelSerializer):
+    translations = CachedTranslatedFieldsField(shared_model=LearningPeriodTarget)
     
     class Meta:
         model = LearningPeriodTarget
@@ -0,0 +1,32 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.catalog import bump_catalog_version
+from core.translations import connect_translations_cache
+from users.models.LearningDomain import LearningDomain
+from users.models.LearningMotivation import LearningMotivation
+from users.models.LearningPeriodTarget import LearningPeriodTarget
+
+ONBOARDING_MODELS = [LearningDomain, LearningMotivation, LearningPeriodTarget]
+
+
+def invalidate_onboarding_options(sender, **kwargs):
+    """
+    Drop the cached onboarding payloads whenever the catalog changes.
+
+    The version is bumped once the change is committed. Bumped earlier, a
+    request could still read the old rows and cache them under the new version.
+    """
+    transaction.on_commit(partial(bump_catalog_version, 'onboarding'))
+
+
+# Translations are saved separately from their master rows,
+# so they have to invalidate the catalog as well. The translations_cache
+# column is synced first, so a rebuilt payload never sees stale data.
+for model in ONBOARDING_MODELS:
+    connect_translations_cache(model)
+    for sender in (model, model._parler_meta.root_model):
+        post_save.connect(invalidate_onboarding_options, sender=sender)
+        post_delete.connect(invalidate_onboarding_options, sender=sender)
@@ -0,0 +1,26 @@
+import logging
+
+from django.conf import settings
+
+from core.utils.batch_delete import delete_in_batches
+from users.models.OTPCode import OTPCode
+
+logger = logging.getLogger(__name__)
+
+
+def prune_otp_codes(batch_size=None, pause=None):
+    """
+    Delete used and expired OTP codes in bounded batches.
+
+    Yields:
+        A tuple of (deleted rows, seconds taken) per batch
+    """
+    batches = delete_in_batches(
+        OTPCode.objects.prunable(),
+        batch_size=batch_size or settings.OTP_RETENTION_BATCH_SIZE,
+        pause=settings.OTP_RETENTION_PAUSE if pause is None else pause,
+    )
+    for deleted, seconds in batches:
+        logger.info("Pruned %d OTP codes in %.3fs", deleted, seconds)
+        yield deleted, seconds
+
@@ -1,18 +1,43 @@
+import io
+import json
+import os
+import re
+import unittest
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
 
+from core.catalog import get_catalog_version
+from core.models import EmailOutbox
+
+from .authentication import LOCAL_TOKEN_VERSION_TIMEOUT, ClaimsJWTAuthentication, VersionedJWTAuthentication
 from .models.OTPCode import OTPCode
+from .models.User import token_version_cache_key
+from .serializers.CustomTokenObtainPairSerializer import CustomTokenObtainPairSerializer
+from .serializers.PasswordResetSerializer import PasswordResetSerializer
 
 from .models.UserProfile import UserProfile
 
 from .models.LearningDomain import LearningDomain
+from .models.LearningMotivation import LearningMotivation
+from .models.LearningPeriodTarget import LearningPeriodTarget
 
-from .models.AppConfig import AppConfig
+from core.models import AppConfig
 
 from django.urls import reverse
 from django.utils import timezone
@@ -21,12 +46,13 @@ from datetime import timedelta
 from rest_framework.test import APITestCase
 from rest_framework import status
 
-from .models.AppConfig import AppConfig
+from core.models import AppConfig
 
 User = get_user_model()
 
 class AuthTestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.register_url = reverse('register')
         self.login_url = reverse('token_obtain_pair')
         self.request_otp_url = reverse('request_otp')
@@ -419,4 +445,671 @@ class AppConfigTestCase(APITestCase):
         
         # Check if theme config is correct
         self.assertEqual(response.data['primary_color'], '#12D18E')
-        self.assertEqual(response.data['platform_name'], 'SteamUp')
\ No newline at end of file
+        self.assertEqual(response.data['platform_name'], 'SteamUp')
+
+class OnboardingOptionsCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.onboarding_options_url = reverse('onboarding_options')
+        
+        self.domain = LearningDomain.objects.create(title='Physics')
+        self.domain.set_current_language('en')
+        self.domain.name_translated = 'Physics'
+        self.domain.set_current_language('ru')
+        self.domain.name_translated = 'Физика'
+        self.domain.save()
+    
+    def get_options(self, language):
+        response = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE=language)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+    
+    def test_payload_is_cached_per_language(self):
+        """Test repeated requests are served without touching the database"""
+        english = self.get_options('en')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_options('en'), english)
+        
+        russian = self.get_options('ru')
+        self.assertEqual(russian['data']['learning_domains'][0]['title'], 'Физика')
+        self.assertEqual(english['data']['learning_domains'][0]['title'], 'Physics')
+        self.assertIsNone(english['error'])
+        self.assertEqual(english['code'], status.HTTP_200_OK)
+    
+    def test_catalog_changes_invalidate_payload(self):
+        """Test saving or deleting catalog rows and translations refreshes the payload"""
+        self.get_options('en')
+        
+        version = get_catalog_version('onboarding')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.domain.set_current_language('en')
+            self.domain.name_translated = 'Applied Physics'
+            self.domain.save_translations()
+            # Bumped before the commit, the old rows could be cached under the new version
+            self.assertEqual(get_catalog_version('onboarding'), version)
+        payload = self.get_options('en')
+        self.assertEqual(payload['data']['learning_domains'][0]['title'], 'Applied Physics')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.domain.delete()
+        payload = self.get_options('en')
+        self.assertEqual(payload['data']['learning_domains'], [])
+    
+    def test_payload_is_shared_across_hosts(self):
+        """Test the Host header changes the icon URLs but not the cached payload"""
+        LearningDomain.objects.filter(pk=self.domain.pk).update(icon='icon/physics.png')
+        response = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_HOST='a.example.com')
+        self.assertEqual(
+            json.loads(response.content)['data']['learning_domains'][0]['icon'], 'http://a.example.com/media/icon/physics.png'
+        )
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_HOST='b.example.com')
+        self.assertEqual(
+            json.loads(response.content)['data']['learning_domains'][0]['icon'], 'http://b.example.com/media/icon/physics.png'
+        )
+    
+    def test_if_none_match_returns_not_modified(self):
+        """Test clients revalidating with the catalog ETag get a 304"""
+        etag = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en')['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.onboarding_options_url,
+                HTTP_ACCEPT_LANGUAGE='en',
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_etag_survives_a_cache_flush(self):
+        """Test an ETag from before a flush never matches, the version does not start over"""
+        etag = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en')['ETag']
+        cache.clear()
+        
+        response = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_etag_depends_on_host(self):
+        """Test a response with another host's icon URLs is not revalidated as unchanged"""
+        etag = self.client.get(self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_HOST='a.example.com')['ETag']
+        response = self.client.get(
+            self.onboarding_options_url, HTTP_ACCEPT_LANGUAGE='en', HTTP_HOST='b.example.com', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class OTPEmailOutboxTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.request_otp_url = reverse('request_otp')
+        self.user = User.objects.create_user(
+            email='unverified@example.com',
+            password='testpassword123',
+            is_verified=False
+        )
+    
+    def test_request_otp_queues_email(self):
+        """Test requesting an OTP stores the email in the outbox instead of sending it"""
+        data = {
+            'email': 'unverified@example.com',
+            'purpose': 'verify'
+        }
+        
+        response = self.client.post(self.request_otp_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        
+        otp = OTPCode.objects.get(user=self.user, purpose='verify')
+        message = EmailOutbox.objects.get(recipient='unverified@example.com')
+        self.assertEqual(message.status, 'pending')
+        self.assertIn(otp.code, message.body)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "Query plans are checked on PostgreSQL only")
+class OTPCodeQueryPlanTestCase(APITestCase):
+    """
+    Seeds a large OTP table and checks the hot OTP lookups use an
+    index instead of scanning the whole table.
+    
+    The table size can be changed with the OTP_QUERY_PLAN_ROWS environment variable.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        rows = int(os.environ.get('OTP_QUERY_PLAN_ROWS', 1000000))
+        users = max(rows // 100, 1)
+        
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO users_user (id, password, is_superuser, email, is_active, is_verified, is_staff, date_joined, token_version)
+                SELECT gen_random_uuid(), '', false, 'otp' || i || '@example.com', true, true, false, now(), 0
+                FROM generate_series(1, %s) AS i
+            """, [users])
+            cursor.execute("""
+                INSERT INTO users_otpcode (user_id, code, purpose, is_used, created_at)
+                SELECT u.id,
+                       lpad((random() * 999999)::int::text, 6, '0'),
+                       CASE WHEN random() < 0.7 THEN 'verify' ELSE 'reset' END,
+                       random() < 0.95,
+                       now() - random() * interval '90 days'
+                FROM users_user AS u CROSS JOIN generate_series(1, %s)
+            """, [rows // users])
+            cursor.execute("ANALYZE users_user")
+            cursor.execute("ANALYZE users_otpcode")
+        
+        cls.user = User.objects.order_by('email').first()
+    
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan on users_otpcode', plan, msg=f"\n{plan}")
+    
+    def test_code_verification_lookup_uses_index(self):
+        """Test the OTP verification and password reset queries do not scan the OTP table"""
+        self.assertUsesIndex(OTPCode.objects.unused(self.user, 'verify').filter(code='123456')[:1])
+        self.assertUsesIndex(OTPCode.objects.unused(self.user, 'reset').filter(code='123456')[:1])
+
+
+class OTPRetentionTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            is_verified=True
+        )
+    
+    def test_prune_deletes_used_and_expired_codes(self):
+        """Test used and expired codes are deleted in batches and valid ones are kept"""
+        valid = OTPCode.objects.create(user=self.user, code='111111', purpose='verify')
+        OTPCode.objects.create(user=self.user, code='222222', purpose='verify', is_used=True)
+        OTPCode.objects.create(user=self.user, code='333333', purpose='reset', is_used=True)
+        expired = OTPCode.objects.create(user=self.user, code='444444', purpose='reset')
+        OTPCode.objects.filter(pk=expired.pk).update(created_at=timezone.now() - timedelta(minutes=6))
+        
+        out = io.StringIO()
+        call_command('prune_otp_codes', '--batch-size', '2', '--pause', '0', stdout=out)
+        
+        self.assertEqual(list(OTPCode.objects.all()), [valid])
+        self.assertIn('Batch 2: deleted 1 codes', out.getvalue())
+        self.assertIn('Deleted 3 codes', out.getvalue())
+    
+    def test_prune_worker_runs_every_interval(self):
+        """Test the command keeps pruning every interval when run as a worker"""
+        out = io.StringIO()
+        command = 'users.management.commands.prune_otp_codes'
+        # Closing the connection would break the test transaction
+        with mock.patch(f'{command}.close_old_connections') as close_old_connections:
+            with mock.patch(f'{command}.time.sleep', side_effect=[None, KeyboardInterrupt]) as sleep:
+                with self.assertRaises(KeyboardInterrupt):
+                    call_command('prune_otp_codes', '--interval', '3600', stdout=out)
+        
+        self.assertEqual(out.getvalue().count('Deleted 0 codes'), 2)
+        sleep.assert_called_with(3600)
+        self.assertEqual(close_old_connections.call_count, 2)
+
+
+class RateLimitTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.request_otp_url = reverse('request_otp')
+        self.login_url = reverse('token_obtain_pair')
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            is_verified=True
+        )
+    
+    def test_otp_resend_is_throttled_without_queries(self):
+        """Test a second OTP request within 60 seconds is rejected before any query"""
+        data = {
+            'email': 'test@example.com',
+            'purpose': 'verify'
+        }
+        response = self.client.post(self.request_otp_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        with self.assertNumQueries(0):
+            response = self.client.post(self.request_otp_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Please wait', response.data['error'])
+        self.assertIn('Retry-After', response)
+        
+        # Other purposes have their own limit
+        data['purpose'] = 'reset'
+        response = self.client.post(self.request_otp_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_login_is_throttled_per_email(self):
+        """Test login attempts over the limit are rejected without queries"""
+        limit, _ = settings.RATE_LIMITS['login']
+        data = {
+            'email': 'test@example.com',
+            'password': 'wrongpassword'
+        }
+        for _ in range(limit):
+            self.client.post(self.login_url, data, format='json')
+        
+        with self.assertNumQueries(0):
+            response = self.client.post(self.login_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_successful_logins_are_not_counted(self):
+        """Test only failed attempts count, so nobody can lock a user out by logging in as them"""
+        limit, _ = settings.RATE_LIMITS['login']
+        data = {
+            'email': 'test@example.com',
+            'password': 'testpassword123'
+        }
+        for _ in range(limit + 1):
+            response = self.client.post(self.login_url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_login_is_throttled_per_client(self):
+        """Test failed attempts over many emails from one client are rejected"""
+        limit, _ = settings.RATE_LIMITS['login_ip']
+        for number in range(limit):
+            data = {'email': f'user{number}@example.com', 'password': 'wrongpassword'}
+            self.client.post(self.login_url, data, format='json', REMOTE_ADDR='10.0.0.1')
+        
+        data = {'email': 'test@example.com', 'password': 'testpassword123'}
+        response = self.client.post(self.login_url, data, format='json', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(self.login_url, data, format='json', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    @override_settings(NUM_PROXIES=1)
+    def test_has_profile_is_limited_per_forwarded_client(self):
+        """Test clients behind the proxy get their own limit, whatever they forward themselves"""
+        has_profile_url = reverse('has_profile')
+        limit, _ = settings.RATE_LIMITS['has_profile']
+        for _ in range(limit):
+            self.client.post(has_profile_url, {'email': 'test@example.com'}, format='json',
+                             REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.1')
+        
+        # A forged entry before the proxy's own is ignored
+        response = self.client.post(has_profile_url, {'email': 'test@example.com'}, format='json',
+                                    REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.9, 203.0.113.1')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(has_profile_url, {'email': 'test@example.com'}, format='json',
+                                    REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_bodies_that_are_not_objects_are_rejected(self):
+        """Test a JSON list or string body is a 400 on the rate limited endpoints, not a 500"""
+        urls = [self.request_otp_url, self.login_url, reverse('has_profile'), reverse('forgot_password')]
+        for url in urls:
+            for body in ([], 'test@example.com'):
+                with self.subTest(url=url, body=body):
+                    response = self.client.post(url, body, format='json')
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RegistrationCredsTestCase(APITestCase):
+    def setUp(self):
+        self.register_url = reverse('register')
+        self.domain = LearningDomain.objects.create(title='Physics')
+        self.motivation = LearningMotivation.objects.create(title='Career')
+        self.daily_goal = LearningPeriodTarget.objects.create(repeat_count=1)
+    
+    def test_registration_does_not_reauthenticate(self):
+        """Test registration mints credentials without verifying the password again"""
+        data = {
+            'email': 'newuser@example.com',
+            'password': 'newpassword123',
+            'confirm_password': 'newpassword123',
+            'full_name': 'John Doe',
+            'age': 25,
+            'interests': [self.domain.id],
+            'motivation': self.motivation.id,
+            'daily_goal': self.daily_goal.id
+        }
+        
+        with mock.patch('django.contrib.auth.base_user.check_password') as check_password:
+            response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        check_password.assert_not_called()
+        
+        user = User.objects.get(email='newuser@example.com')
+        self.assertIsNone(user.last_login)
+        self.assertEqual(json.loads(response.content)['data']['creds'], {
+            'user_id': str(user.id),
+            'email': 'newuser@example.com',
+            'is_verified': False
+        })
+    
+    def test_verified_user_creds_include_tokens(self):
+        """Test verified users get a token pair carrying their id"""
+        user = User.objects.create_user(email='test@example.com', password='testpassword123', is_verified=True)
+        creds = CustomTokenObtainPairSerializer.get_creds(user)
+        
+        self.assertEqual(creds['user_id'], str(user.id))
+        self.assertTrue(creds['is_verified'])
+        self.assertEqual(str(AccessToken(creds['access'])['user_id']), str(user.id))
+        self.assertIn('refresh', creds)
+
+
+class ClaimsJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile_url = reverse('profile-list')
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            is_verified=True
+        )
+        UserProfile.objects.create(user=self.user, full_name='John Doe', age=25)
+        self.token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+    
+    def get_user_queries(self, queries):
+        return [query['sql'] for query in queries if f'FROM "{User._meta.db_table}"' in query['sql']]
+    
+    def test_profile_is_served_without_loading_the_user(self):
+        """Test the user row is not queried once the token version is cached"""
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['data']['full_name'], 'John Doe')
+        self.assertEqual(self.get_user_queries(queries), [])
+    
+    def test_non_claim_fields_are_loaded_on_access(self):
+        """Test the claims user is a real User that loads other fields lazily"""
+        request = APIRequestFactory().get(self.profile_url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        user, _ = ClaimsJWTAuthentication().authenticate(request)
+        
+        self.assertIsInstance(user, User)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertTrue(user.is_verified)
+            self.assertTrue(user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'test@example.com')
+    
+    def test_password_reset_revokes_tokens(self):
+        """Test tokens issued before a password reset are rejected"""
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+        
+        otp = OTPCode.objects.create(user=self.user, code='123456', purpose='reset')
+        serializer = PasswordResetSerializer(data={
+            'email': 'test@example.com',
+            'code': otp.code,
+            'new_password': 'newpassword123',
+            'confirm_password': 'newpassword123'
+        })
+        self.assertTrue(serializer.is_valid())
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        # The default authentication checks the version as well
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        with self.assertRaises(InvalidToken):
+            VersionedJWTAuthentication().authenticate(request)
+        
+        self.user.refresh_from_db()
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+    
+    def test_deactivation_revokes_tokens(self):
+        """Test a user deactivated in the admin cannot use the is_active claim of old tokens"""
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+        
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        # Saving an inactive user again does not revoke anything new
+        self.user.save()
+        self.assertEqual(self.user.token_version, 1)
+    
+    def test_local_cache_keeps_token_versions_briefly(self):
+        """Test other workers cannot miss a revocation for long when the cache is per process"""
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            self.client.get(self.profile_url)
+        add.assert_any_call(token_version_cache_key(self.user.pk), 0, timeout=LOCAL_TOKEN_VERSION_TIMEOUT)
+
+
+def sql_shape(sql):
+    """
+    Reduce a query to its shape by replacing literal values with placeholders.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return re.sub(r'IN \([^)]*\)', 'IN (?)', sql)
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Query budgets for every API endpoint.
+
+    Each endpoint runs against catalogs of growing size and must stay within
+    its maximum number of queries and distinct query shapes, with the same
+    query count at every size. A per-endpoint report is printed at the end.
+    """
+    CATALOG_SIZES = (10, 100, 1000)
+    report = []
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.report:
+            print("\nQuery budget report")
+            for name, size, queries, shapes in cls.report:
+                print(f"  {name:<28} {size:>5} items  {queries:>5} queries  {shapes:>3} shapes")
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            is_verified=True
+        )
+        self.profile = UserProfile.objects.create(user=self.user, full_name='John Doe', age=25)
+        for key, value in (('primary_color', '#12D18E'), ('platform_name', 'SteamUp')):
+            config = AppConfig(key=key, value=value)
+            config.set_current_language('en')
+            config.value_translated = value
+            config.save()
+    
+    def grow_catalog(self, size):
+        """
+        Add catalog rows, with translations in two languages, until each catalog has size items.
+        """
+        catalogs = (
+            (LearningDomain, 'name_translated', lambda i: LearningDomain(title=f'Domain {i}')),
+            (LearningMotivation, 'tr_title', lambda i: LearningMotivation(title=f'Motivation {i}')),
+            (LearningPeriodTarget, 'tr_complement', lambda i: LearningPeriodTarget(repeat_count=i)),
+            (AppConfig, 'value_translated', lambda i: AppConfig(key=f'key_{i}', value=str(i))),
+        )
+        for model, field, build in catalogs:
+            start = model.objects.count()
+            objects = model.objects.bulk_create([build(i) for i in range(start, size)])
+            translation_model = model._parler_meta.root_model
+            translation_model.objects.bulk_create([
+                translation_model(master=obj, language_code=language, **{field: f'{obj.pk} {language}'})
+                for obj in objects
+                for language in ('en', 'ru')
+            ])
+        self.profile.interests.set(LearningDomain.objects.all())
+    
+    def assertQueryBudget(self, name, request, max_queries, max_shapes, prepare=None):
+        """
+        Run a request at every catalog size and check its query budget.
+        
+        Args:
+            name: Endpoint name used in the report
+            request: Callable taking the catalog size and returning a response
+            max_queries: Maximum number of queries per request
+            max_shapes: Maximum number of distinct query shapes per request
+            prepare: Optional callable taking the catalog size, run before measuring
+        """
+        counts = {}
+        for size in self.CATALOG_SIZES:
+            self.grow_catalog(size)
+            cache.clear()
+            if prepare:
+                prepare(size)
+            with CaptureQueriesContext(connection) as context:
+                response = request(size)
+            self.assertLess(response.status_code, 400, f"{name}: {response.content[:200]}")
+            
+            queries = len(context.captured_queries)
+            shapes = len({sql_shape(query['sql']) for query in context.captured_queries})
+            self.report.append((name, size, queries, shapes))
+            counts[size] = queries
+            
+            self.assertLessEqual(queries, max_queries, f"{name} made {queries} queries with {size} items")
+            self.assertLessEqual(shapes, max_shapes, f"{name} made {shapes} distinct queries with {size} items")
+        
+        self.assertEqual(len(set(counts.values())), 1, f"{name} query count grows with the catalog: {counts}")
+    
+    def authenticate(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_onboarding_options_cold(self):
+        url = reverse('onboarding_options')
+        self.assertQueryBudget('onboarding options (cold)', lambda size: self.client.get(url), 6, 6)
+    
+    def test_onboarding_options_denormalized(self):
+        url = reverse('onboarding_options')
+        self.assertQueryBudget(
+            'onboarding options (denorm)', lambda size: self.client.get(url), 3, 3,
+            prepare=lambda size: call_command('rebuild_translations_cache', stdout=io.StringIO())
+        )
+    
+    def test_onboarding_options_cached(self):
+        url = reverse('onboarding_options')
+        self.assertQueryBudget(
+            'onboarding options (cached)', lambda size: self.client.get(url), 0, 0,
+            prepare=lambda size: self.client.get(url)
+        )
+    
+    def test_config_list(self):
+        url = reverse('config-list')
+        self.assertQueryBudget('config list', lambda size: self.client.get(url), 2, 2)
+    
+    def test_config_detail(self):
+        url = reverse('config-detail', args=[AppConfig.objects.get(key='primary_color').pk])
+        self.assertQueryBudget('config detail', lambda size: self.client.get(url), 1, 1)
+    
+    def test_config_theme(self):
+        url = reverse('config-theme')
+        self.assertQueryBudget(
+            'config theme', lambda size: self.client.get(url), 0, 0,
+            prepare=lambda size: self.client.get(url)
+        )
+    
+    def test_register(self):
+        url = reverse('register')
+        data = {}
+        
+        def prepare(size):
+            data.update({
+                'email': f'user{size}@example.com',
+                'password': 'newpassword123',
+                'confirm_password': 'newpassword123',
+                'full_name': 'John Doe',
+                'age': 25,
+                'interests': list(LearningDomain.objects.values_list('pk', flat=True)[:3]),
+                'motivation': LearningMotivation.objects.first().pk,
+                'daily_goal': LearningPeriodTarget.objects.first().pk
+            })
+        
+        self.assertQueryBudget('register', lambda size: self.client.post(url, data, format='json'), 11, 9, prepare=prepare)
+    
+    def test_login(self):
+        url = reverse('token_obtain_pair')
+        data = {'email': 'test@example.com', 'password': 'testpassword123'}
+        self.assertQueryBudget('login', lambda size: self.client.post(url, data, format='json'), 3, 3)
+    
+    def test_request_otp(self):
+        url = reverse('request_otp')
+        data = {'email': 'test@example.com', 'purpose': 'verify'}
+        self.assertQueryBudget('request otp', lambda size: self.client.post(url, data, format='json'), 5, 5)
+    
+    def test_forgot_password(self):
+        url = reverse('forgot_password')
+        data = {'email': 'test@example.com'}
+        self.assertQueryBudget('forgot password', lambda size: self.client.post(url, data, format='json'), 5, 5)
+    
+    def test_verify_reset_otp(self):
+        url = reverse('verify_reset_otp')
+        data = {'email': 'test@example.com', 'code': '123456'}
+        self.assertQueryBudget(
+            'verify reset otp', lambda size: self.client.post(url, data, format='json'), 3, 3,
+            prepare=lambda size: OTPCode.objects.create(user=self.user, code='123456', purpose='reset')
+        )
+    
+    def test_verify_otp(self):
+        url = reverse('verify_otp')
+        data = {'email': 'test@example.com', 'code': '123456', 'purpose': 'verify'}
+        self.assertQueryBudget(
+            'verify otp', lambda size: self.client.post(url, data, format='json'), 4, 4,
+            prepare=lambda size: OTPCode.objects.create(user=self.user, code='123456', purpose='verify')
+        )
+    
+    def test_reset_password(self):
+        url = reverse('reset_password')
+        data = {
+            'email': 'test@example.com',
+            'code': '123456',
+            'new_password': 'newpassword123',
+            'confirm_password': 'newpassword123'
+        }
+        self.assertQueryBudget(
+            'reset password', lambda size: self.client.post(url, data, format='json'), 6, 6,
+            prepare=lambda size: OTPCode.objects.create(user=self.user, code='123456', purpose='reset')
+        )
+    
+    def test_token_refresh(self):
+        url = reverse('token_refresh')
+        data = {'refresh': str(CustomTokenObtainPairSerializer.get_token(self.user))}
+        self.assertQueryBudget('token refresh', lambda size: self.client.post(url, data, format='json'), 1, 1)
+    
+    def test_has_profile(self):
+        url = reverse('has_profile')
+        data = {'email': 'test@example.com'}
+        self.assertQueryBudget('has profile', lambda size: self.client.post(url, data, format='json'), 1, 1)
+    
+    def test_profile(self):
+        url = reverse('profile-list')
+        self.authenticate()
+        self.assertQueryBudget('profile', lambda size: self.client.get(url), 3, 3)
+    
+    def test_db_pool_stats(self):
+        url = reverse('db_pool_stats')
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.authenticate()
+        self.assertQueryBudget('db pool stats', lambda size: self.client.get(url), 1, 1)
+    
+    def get_profile_data(self):
+        return {
+            'full_name': 'Jane Doe',
+            'age': 30,
+            'interests': list(LearningDomain.objects.values_list('pk', flat=True)[:3]),
+            'motivation': LearningMotivation.objects.first().pk,
+            'daily_goal': LearningPeriodTarget.objects.first().pk
+        }
+    
+    def test_profile_create(self):
+        url = reverse('profile-list')
+        self.authenticate()
+        data = {}
+        self.assertQueryBudget(
+            'profile create', lambda size: self.client.post(url, data, format='json'), 11, 9,
+            prepare=lambda size: data.update(self.get_profile_data())
+        )
+    
+    def test_profile_update(self):
+        url = reverse('profile-detail', args=[self.profile.pk])
+        self.authenticate()
+        data = {}
+        self.assertQueryBudget(
+            'profile update', lambda size: self.client.patch(url, data, format='json'), 11, 9,
+            prepare=lambda size: data.update(self.get_profile_data())
+        )
@@ -5,6 +5,7 @@ from core.views.token_views import CustomTokenObtainPairView, CustomTokenRefresh
 from users.views import LanguageView
 
 from core.views.AppConfigViewSet import AppConfigViewSet
+from core.views.DatabasePoolView import DatabasePoolView
 from users.views.AuthViewSet import ForgotPasswordView, HasProfileView, RegisterView, OTPRequestView, OTPVerificationView, PasswordResetView, VerifyResetOTPView
 from users.views.OnboardingOptionsView import OnboardingOptionsView
 from users.views.UserProfileViewSet import (
@@ -38,6 +39,9 @@ urlpatterns = [
     # Onboarding options
     path('onboarding/options/', OnboardingOptionsView.as_view(), name='onboarding_options'),
     
+    # Operations
+    path('system/db-pool/', DatabasePoolView.as_view(), name='db_pool_stats'),
+    
     # Language settings
     # path('language/', LanguageView.as_view(), name='language'),
 
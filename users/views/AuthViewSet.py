@@ -1,11 +1,13 @@
 # users/views/auth/RegisterView.py
-from django.core.mail import EmailMessage
 from django.conf import settings
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework import status, permissions
 from drf_spectacular.utils import extend_schema, OpenApiResponse
+from core.ratelimit import RateLimiter, get_client_ip
 from core.response import APIResponse
 from core.schema import get_standard_response_schema
+from core.utils.email_outbox import enqueue_email
 from core.utils.get_email_templates import get_email_templates
 from core.utils.swagger_helper import api_schema
 from users.serializers.HasProfileSerializer import HasProfileSerializer
@@ -50,17 +52,12 @@ class RegisterView(APIView):
         if serializer.is_valid():
             user = serializer.save()
             
-            # Generate JWT token
-            token_serializer = CustomTokenObtainPairSerializer(data={
-                'email': request.data['email'],
-                'password': request.data['password']
-            })
-            token_serializer.is_valid(raise_exception=True)
-            
+            # The user was just created, so there is no need to check the
+            # password again before minting its credentials
             return APIResponse(
                 data={
                     'user': serializer.data,
-                    'creds': token_serializer.validated_data
+                    'creds': CustomTokenObtainPairSerializer.get_creds(user)
                 },
                 code=status.HTTP_201_CREATED
             )
@@ -68,6 +65,7 @@ class RegisterView(APIView):
     
 class OTPRequestView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limiter = RateLimiter.from_settings('otp')
     
     @api_schema(
         request=OTPSerializer,
@@ -77,23 +75,32 @@ class OTPRequestView(APIView):
         tags=["auth"],
     )
     def post(self, request):
+        # Throttle resends before touching the database. Bodies that are not
+        # objects are rejected by the serializer
+        email = request.data.get('email') if isinstance(request.data, dict) else None
+        if email:
+            allowed, retry_after = self.rate_limiter.hit(f"{str(email).lower()}:{request.data.get('purpose')}")
+            if not allowed:
+                return APIResponse(
+                    error=_("Please wait {seconds} seconds before requesting another OTP.").format(seconds=retry_after),
+                    code=status.HTTP_400_BAD_REQUEST,
+                    headers={'Retry-After': str(retry_after)}
+                )
+        
         serializer = OTPSerializer(data=request.data)
         if serializer.is_valid():
-            otp = serializer.save()
-            purpose = otp.purpose
-            email_subject, email_body = get_email_templates(purpose, otp.code)
-            
-            try:
-                email = EmailMessage(
+            # The OTP and its email are committed together, the email
+            # itself is delivered by the send_queued_emails worker
+            with transaction.atomic():
+                otp = serializer.save()
+                email_subject, email_body = get_email_templates(otp.purpose, otp.code)
+                enqueue_email(
                     email_subject,
                     email_body,
-                    settings.EMAIL_HOST_USER,
-                    [otp.user.email]
+                    otp.user.email,
+                    from_email=settings.EMAIL_HOST_USER
                 )
-                email.send()
-                return APIResponse(data={"message": f"OTP sent to {otp.user.email}"})
-            except Exception as e:
-                return APIResponse(error=str(e), code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return APIResponse(data={"message": f"OTP sent to {otp.user.email}"})
         
         return APIResponse(error=serializer.errors, code=status.HTTP_400_BAD_REQUEST)
 
@@ -137,8 +144,9 @@ class VerifyResetOTPView(APIView):
         tags=["auth"],
     )
     def post(self, request):
-        # Add reset purpose to request data
-        request.data['purpose'] = 'reset'
+        # Add reset purpose to request data, the serializer rejects other bodies
+        if isinstance(request.data, dict):
+            request.data['purpose'] = 'reset'
         # Delegate to OTPVerificationView
         return OTPVerificationView().post(request)
 
@@ -151,21 +159,32 @@ class ForgotPasswordView(APIView):
         tags=["auth"],
     )
     def post(self, request):
-        # Add reset purpose to request data
-        request.data['purpose'] = 'reset'
+        # Add reset purpose to request data, the serializer rejects other bodies
+        if isinstance(request.data, dict):
+            request.data['purpose'] = 'reset'
         # Delegate to OTPRequestView
         return OTPRequestView().post(request)
 
 # method to check profile exists or not
 class HasProfileView(APIView):
     permission_classes = [permissions.AllowAny]
+    rate_limiter = RateLimiter.from_settings('has_profile')
     
     @api_schema(
         request=HasProfileSerializer,
         success_data={"exists": "boolean"},
     )
     def post(self, request):
-        email = request.data.get('email')
+        # Limit account enumeration per client
+        allowed, retry_after = self.rate_limiter.hit(get_client_ip(request))
+        if not allowed:
+            return APIResponse(
+                error=_("Too many requests. Try again in {seconds} seconds.").format(seconds=retry_after),
+                code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)}
+            )
+        
+        email = request.data.get('email') if isinstance(request.data, dict) else None
         if not email:
             return APIResponse(error="Email is required", code=status.HTTP_400_BAD_REQUEST)
         
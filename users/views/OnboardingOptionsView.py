@@ -1,4 +1,8 @@
-from core.response import APIResponse
+import json
+
+from core.catalog import catalog_etag, get_cached_payload
+from core.renderers import FastJSONRenderer
+from core.response import api_response
 from users.models.LearningDomain import LearningDomain
 from users.models.LearningMotivation import LearningMotivation
 from users.models.LearningPeriodTarget import LearningPeriodTarget
@@ -7,11 +11,33 @@ from users.serializers.onboarding.LearningMotivationSerializer import LearningMo
 from users.serializers.onboarding.LearningPeriodTargetSerializer import LearningPeriodTargetSerializer
 from users.serializers.onboarding.OnboardingOptionsSerializer import OnboardingOptionsOutputSerializer, OnboardingOptionsSerializer
 from users.serializers.onboarding.LearningDomainSerializer import LearningDomainSerializer
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from django.utils.translation import get_language
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+# How icon paths start in the encoded payload
+ICON_PATH = b'"icon":"/'
+
+
+def absolute_icon_urls(payload, request):
+    """
+    Prefix the icon paths of an encoded payload with the request's scheme and host.
+    """
+    base = json.dumps(request.build_absolute_uri('/')).encode()
+    # The base URL ends with the slash the path started with
+    return payload.replace(ICON_PATH, b'"icon":' + base[:-1])
+
+
+def get_etag_variant(request):
+    """
+    The response depends on the language and, through the icon URLs, on the host.
+    """
+    return f"{get_language() or 'en'}-{request.get_host()}"
+
+
 class OnboardingOptionsView(APIView):
     serializer_class = OnboardingOptionsOutputSerializer
     
@@ -29,28 +55,43 @@ class OnboardingOptionsView(APIView):
         ],
         responses=OnboardingOptionsOutputSerializer
     )
-   
+    @method_decorator(catalog_etag('onboarding', get_variant=get_etag_variant))
     def get(self, request):
         # Get current language
         current_language = get_language() or 'en'
         
-        learning_domains = LearningDomain.objects.all()
+        # Cached per language only: the Host header is up to the client, so the
+        # icon URLs are made absolute after the cache
+        payload = get_cached_payload(
+            'onboarding',
+            current_language,
+            lambda: self.build_payload(current_language)
+        )
+        return HttpResponse(absolute_icon_urls(payload, request), content_type='application/json')
+    
+    def build_payload(self, current_language):
+        """
+        Serialize the onboarding catalog and encode it in the standard response format.
+
+        Without a request in the serializer context, icons are MEDIA_URL paths.
+        """
+        learning_domains = LearningDomain.objects.with_translations()
         learning_domains_serializer = LearningDomainSerializer(
             learning_domains, 
             many=True, 
-            context={'request': request, 'language': current_language}
+            context={'language': current_language}
         )
         
-        motivations = LearningMotivation.objects.all()
+        motivations = LearningMotivation.objects.with_translations()
         motivations_serializer = LearningMotivationSerializer(
             motivations, 
             many=True, 
-            context={'request': request, 'language': current_language}
+            context={'language': current_language}
         )
         daily_goals = LearningPeriodTargetSerializer(
-            LearningPeriodTarget.objects.all(), 
+            LearningPeriodTarget.objects.with_translations(), 
             many=True, 
-            context={'request': request, 'language': current_language}
+            context={'language': current_language}
         ).data
         
         data = {
@@ -60,7 +101,7 @@ class OnboardingOptionsView(APIView):
         }
         
         serializer = OnboardingOptionsSerializer(data)
-        return APIResponse(data=serializer.data)
+        return FastJSONRenderer().render(api_response(data=serializer.data))
     
     def get_discovery_source(self, choice, request):
         """
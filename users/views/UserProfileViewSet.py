@@ -1,4 +1,5 @@
 from core.response import APIResponse
+from users.authentication import ClaimsJWTAuthentication
 from users.models.UserProfile import UserProfile
 from users.serializers.UserProfileSerializer import UserProfileSerializer
 from rest_framework import permissions, status, viewsets
@@ -27,6 +28,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 )
 class UserProfileViewSet(viewsets.ModelViewSet):
     serializer_class = UserProfileSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'post', 'put', 'patch']
 